@@ -0,0 +1,35 @@
+from src.board import ConnectFourBoard
+from src.types.piece_enum import PieceEnum
+from src.types.solver_type import SolverType
+from src.utils import get_solver
+
+from api.schemas.position_analysis import PositionAnalysis
+from api.stopping import search_stopped
+
+# positions analyzed per call in a search process; they share the solver's
+# tables, and their results are sent together
+POSITIONS_PER_CALL = 16
+
+
+# runs in a search process
+def analyze_positions(
+    solver_type: SolverType,
+    positions: list[tuple[int, list[list[PieceEnum]], PieceEnum]],
+    time_budget_ms: int | None,
+) -> list[PositionAnalysis]:
+    solver = get_solver(solver_type, time_budget_ms=time_budget_ms)
+    solver.stop_event = search_stopped
+    analyses = []
+    for index, board_state, piece in positions:
+        try:
+            board = ConnectFourBoard(initial_state=board_state)
+            if board.has_won(PieceEnum.HUMAN) or board.has_won(PieceEnum.CPU):
+                raise ValueError("The game is over")
+            best_move, scores = solver.analyze(board, piece)
+        except ValueError as e:
+            analyses.append(PositionAnalysis(index=index, error=str(e)))
+        else:
+            analyses.append(
+                PositionAnalysis(index=index, best_move=best_move, scores=scores)
+            )
+    return analyses
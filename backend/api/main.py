@@ -1,42 +1,93 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
-from typing import get_args
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import Annotated, get_args
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from src.board import ConnectFourBoard
-from src.game import Game
-from src.heuristic.count_pieces_heuristic import CountPiecesHeuristic
-from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
-from src.heuristic.heuristic_factory import HeuristicFactory
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from src.model import MistralModelProvider, ModelProviderFactory
+from src.solver.minimax_alpha_beta_solver import shutdown_process_pools
 from src.types.heuristic_name import HeuristicName
+from src.types.mcts_solver_name import MCTSSolverName
 from src.types.model_provider_name import ModelProviderName
 from src.types.move import Move
-from src.types.piece_enum import PieceEnum
-from src.types.solver_type import HeuristicSolverType, LLMSolverType, SolverType
+from src.types.perfect_solver_name import PerfectSolverName
+from src.types.search_progress import SearchProgress
+from src.types.solver_type import (
+    HeuristicSolverType,
+    LLMSolverType,
+    MCTSSolverType,
+    NegamaxSolverType,
+    PerfectSolverType,
+    SolverType,
+)
 from src.utils import get_solver, validate_solver_type
 
+from api.analysis import POSITIONS_PER_CALL, analyze_positions
+from api.move_executor import MoveExecutor, Overloaded, Unavailable
+from api.moves import play_move
+from api.registry import register_heuristics
+from api.schemas.analyze_request import AnalyzeRequest
 from api.schemas.api_response import ApiResponse
 from api.schemas.move_request import MoveRequest
 from api.schemas.move_response import MoveResponse
+from api.schemas.position_analysis import PositionAnalysis
+from api.schemas.session_move_request import SessionMoveRequest
+from api.schemas.session_response import SessionResponse
 from api.schemas.settings import Settings
+from api.sessions import (
+    SessionNotFound,
+    SessionRoute,
+    SessionStore,
+    end_game,
+    play_game_move,
+    ponder_game,
+    start_game,
+)
+from api.streaming import stream_move
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     settings = Settings()
+    app.state.settings = settings
     logging.basicConfig(
         level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
     )
-    HeuristicFactory.register("pieces", CountPiecesHeuristic)
-    HeuristicFactory.register("positions", CountPositionsHeuristic)
+    register_heuristics()
     ModelProviderFactory.register(
         "mistral",
         MistralModelProvider,
         api_key=settings.MISTRAL_API_KEY,
     )
+    app.state.move_executor = MoveExecutor(
+        processes=settings.SOLVER_PROCESSES,
+        threads=settings.LLM_THREADS,
+        max_queued=settings.MAX_QUEUED_MOVES,
+        timeout_s=settings.MOVE_TIMEOUT_S,
+        session_ttl_s=settings.SESSION_TTL_S,
+        max_sessions=settings.MAX_SESSIONS,
+    )
+    # the solver of every session, kept as long as the process holding its game
+    # keeps it; LLM sessions are held by this process
+    app.state.sessions = SessionStore[SessionRoute](
+        ttl_s=settings.SESSION_TTL_S,
+        max_sessions=settings.MAX_SESSIONS * (settings.SOLVER_PROCESSES + 1),
+    )
     yield
+    app.state.move_executor.shutdown()
+    shutdown_process_pools()
 
 
 app = FastAPI(
@@ -65,6 +116,15 @@ async def get_solvers():
     # heuristic solvers
     for name in get_args(HeuristicName):
         solvers.append(HeuristicSolverType(type="heuristic", name=name))
+        solvers.append(NegamaxSolverType(type="negamax", name=name))
+
+    # exact solvers
+    for name in get_args(PerfectSolverName):
+        solvers.append(PerfectSolverType(type="perfect", name=name))
+
+    # Monte Carlo tree search solvers
+    for name in get_args(MCTSSolverName):
+        solvers.append(MCTSSolverType(type="mcts", name=name))
 
     # llm solvers
     for provider in get_args(ModelProviderName):
@@ -87,40 +147,272 @@ async def get_first_move(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+async def run_move(
+    request: Request,
+    solver_type: SolverType,
+    fn,
+    *args,
+    time_budget_ms: int | None = None,
+    session_id: str | None = None,
+):
+    # runs fn(*args) in the move executor, answering its errors over HTTP
+    with solver_errors(request.app, session_id):
+        return await request.app.state.move_executor.run(
+            solver_type,
+            fn,
+            *args,
+            time_budget_ms=time_budget_ms,
+            session_id=session_id,
+        )
+
+
+@contextmanager
+def solver_errors(app: FastAPI, session_id: str | None = None):
+    # turns the errors of the move executor and the game into HTTP errors
+    retry_after = {"Retry-After": str(app.state.settings.RETRY_AFTER_S)}
+    try:
+        yield
+    except Overloaded:
+        raise HTTPException(
+            status_code=429, detail="Too many moves waiting", headers=retry_after
+        )
+    except (Unavailable, TimeoutError):
+        raise HTTPException(
+            status_code=503, detail="The solver did not answer", headers=retry_after
+        )
+    except SessionNotFound:
+        app.state.sessions.remove(session_id)
+        raise HTTPException(status_code=404, detail="Session not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def ponder(request: Request, solver_type: SolverType, session_id: str) -> None:
+    # the player is to move; the solver searches its replies in the meantime
+    if request.app.state.settings.PONDER:
+        request.app.state.move_executor.ponder(
+            solver_type, ponder_game, session_id, session_id=session_id
+        )
+
+
 @app.post("/move/{solver}/{name}", response_model=ApiResponse[MoveResponse])
 async def move(
+    request: Request,
     data: MoveRequest,
     solver_type: SolverType = Depends(validate_solver_type),
+    time_budget_ms: Annotated[int | None, Query(gt=0, le=60_000)] = None,
+):
+    response = await run_move(
+        request,
+        solver_type,
+        play_move,
+        solver_type,
+        data.board,
+        data.player_move,
+        time_budget_ms,
+        request.app.state.settings.SEARCH_WORKERS,
+        time_budget_ms=time_budget_ms,
+    )
+    return ApiResponse(data=response)
+
+
+@app.websocket("/move/{solver}/{name}")
+async def stream_move_over_websocket(
+    websocket: WebSocket,
+    solver_type: SolverType = Depends(validate_solver_type),
+    time_budget_ms: Annotated[int | None, Query(gt=0, le=60_000)] = None,
 ):
+    # the client sends a MoveRequest and may then send {"type": "stop"}; the
+    # server sends the progress of every depth searched, then the result
+    await websocket.accept()
     try:
-        solver = get_solver(solver_type)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        data = MoveRequest.model_validate(await websocket.receive_json())
+    except (ValidationError, ValueError) as e:
+        await close_websocket(
+            websocket, {"type": "error", "status": 422, "detail": str(e)}
+        )
+        return
+    if solver_type.type in get_args(ModelProviderName):
+        message = "LLM solvers do not search, so there is no progress to stream."
+        await close_websocket(
+            websocket, {"type": "error", "status": 400, "detail": message}
+        )
+        return
 
-    board = ConnectFourBoard(initial_state=data.board)
+    progress: asyncio.Queue[SearchProgress | None] = asyncio.Queue()
+    stop = asyncio.Event()
 
-    game = Game(
-        board=board,
-        solver=solver,
-    )
+    async def send_progress():
+        while (report := await progress.get()) is not None:
+            await websocket.send_json(
+                {"type": "progress", "data": report.model_dump(mode="json")}
+            )
 
+    async def receive_stop():
+        # other messages are ignored; a client leaving stops the search as well
+        while True:
+            try:
+                if await websocket.receive_json() == {"type": "stop"}:
+                    break
+            except ValueError:
+                continue
+            except WebSocketDisconnect:
+                break
+        stop.set()
+
+    sender = asyncio.create_task(send_progress())
+    receiver = asyncio.create_task(receive_stop())
     try:
-        # play the player's move first
-        game.make_move(move=data.player_move, piece=PieceEnum.HUMAN)
-
-        best_move = None
-        if not game.is_over():
-            best_move = game.get_solver_move(piece=PieceEnum.CPU)
-            if best_move is not None:
-                game.make_move(move=best_move, piece=PieceEnum.CPU)
-
-        return ApiResponse(
-            data=MoveResponse(
-                state=game.state,
-                solver_move=best_move,
-                winning_sequence=game.get_winning_sequence(),
+        with solver_errors(websocket.app):
+            response = await websocket.app.state.move_executor.stream(
+                stream_move,
+                solver_type,
+                data.board,
+                data.player_move,
+                time_budget_ms,
+                websocket.app.state.settings.SEARCH_WORKERS,
+                time_budget_ms=time_budget_ms,
+                on_progress=progress.put_nowait,
+                stop=stop,
             )
+        message = {"type": "result", "data": response.model_dump(mode="json")}
+    except HTTPException as e:
+        message = {"type": "error", "status": e.status_code, "detail": e.detail}
+    finally:
+        receiver.cancel()
+        progress.put_nowait(None)
+    try:
+        await sender
+        await close_websocket(websocket, message)
+    except WebSocketDisconnect:
+        # the client left before the search ended
+        pass
+
+
+async def close_websocket(websocket: WebSocket, message: dict) -> None:
+    await websocket.send_json(message)
+    await websocket.close()
+
+
+@app.post("/analyze/{solver}/{name}")
+async def analyze(
+    request: Request,
+    data: AnalyzeRequest,
+    solver_type: SolverType = Depends(validate_solver_type),
+    time_budget_ms: Annotated[int | None, Query(gt=0, le=60_000)] = None,
+):
+    # one PositionAnalysis per line, in the order the positions are analyzed
+    if solver_type.type in get_args(ModelProviderName):
+        raise HTTPException(
+            status_code=400,
+            detail="LLM solvers do not search, so they cannot analyze positions.",
         )
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    positions = [
+        (index, position.board, position.piece)
+        for index, position in enumerate(data.positions)
+    ]
+    calls = [
+        (solver_type, positions[start : start + POSITIONS_PER_CALL], time_budget_ms)
+        for start in range(0, len(positions), POSITIONS_PER_CALL)
+    ]
+
+    async def lines():
+        async for (_, call_positions, _), task in request.app.state.move_executor.map(
+            analyze_positions,
+            calls,
+            # the timeout covers the budget of every position in a call
+            time_budget_ms=time_budget_ms and time_budget_ms * POSITIONS_PER_CALL,
+        ):
+            try:
+                with solver_errors(request.app):
+                    analyses = await task
+            except HTTPException as e:
+                analyses = [
+                    PositionAnalysis(index=index, error=e.detail)
+                    for index, _, _ in call_positions
+                ]
+            for analysis in analyses:
+                yield analysis.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/sessions/{solver}/{name}", response_model=ApiResponse[SessionResponse])
+async def create_session(
+    request: Request,
+    solver_type: SolverType = Depends(validate_solver_type),
+    time_budget_ms: Annotated[int | None, Query(gt=0, le=60_000)] = None,
+    cpu_first: bool = False,
+):
+    # sessions live in the memory of this uvicorn worker, so their moves must
+    # reach it again: run one worker, or balance sessions by their id
+    session_id = uuid.uuid4().hex
+    first_move = await run_move(
+        request,
+        solver_type,
+        start_game,
+        session_id,
+        solver_type,
+        time_budget_ms,
+        request.app.state.settings.SEARCH_WORKERS,
+        cpu_first,
+        session_id=session_id,
+    )
+    request.app.state.sessions.add(
+        session_id, SessionRoute(solver_type, time_budget_ms)
+    )
+    ponder(request, solver_type, session_id)
+    return ApiResponse(
+        data=SessionResponse(session_id=session_id, solver_move=first_move)
+    )
+
+
+@app.post("/sessions/{session_id}", response_model=ApiResponse[MoveResponse])
+async def session_move(request: Request, session_id: str, data: SessionMoveRequest):
+    sessions = request.app.state.sessions
+    try:
+        route = sessions.get(session_id)
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if route.busy:
+        raise HTTPException(
+            status_code=409, detail="The last move of the session is still playing"
+        )
+
+    route.busy = True
+    try:
+        response = await run_move(
+            request,
+            route.solver_type,
+            play_game_move,
+            session_id,
+            data.col,
+            time_budget_ms=route.time_budget_ms,
+            session_id=session_id,
+        )
+    finally:
+        route.busy = False
+    if response.state != "CONTINUE":
+        sessions.remove(session_id)
+    else:
+        ponder(request, route.solver_type, session_id)
+    return ApiResponse(data=response)
+
+
+@app.delete("/sessions/{session_id}", response_model=ApiResponse[dict])
+async def delete_session(request: Request, session_id: str):
+    sessions = request.app.state.sessions
+    try:
+        route = sessions.get(session_id)
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Session not found")
+    sessions.remove(session_id)
+    try:
+        await request.app.state.move_executor.run(
+            route.solver_type, end_game, session_id, session_id=session_id
+        )
+    except (Overloaded, Unavailable, TimeoutError):
+        # the process holding the game drops it once it expires
+        pass
+    return ApiResponse(data={"message": "Session ended"})
@@ -0,0 +1,329 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import threading
+import zlib
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.queues import Queue
+from multiprocessing.sharedctypes import Synchronized
+from typing import AsyncIterator, Callable, Iterable, get_args
+
+from src.solver.deadline import StopEvent
+from src.types.model_provider_name import ModelProviderName
+from src.types.search_progress import SearchProgress
+from src.types.solver_type import SolverType
+
+from api.registry import register_heuristics
+from api.sessions import configure_sessions
+from api.stopping import configure_stopping, run_search
+from api.streaming import configure_streaming
+
+
+class Overloaded(Exception):
+    pass
+
+
+class Unavailable(Exception):
+    pass
+
+
+def _init_search_process(
+    session_ttl_s: float,
+    max_sessions: int,
+    stop_pondering: StopEvent,
+    progress: Queue,
+    stop_search: Synchronized,
+) -> None:
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    register_heuristics()
+    configure_sessions(
+        ttl_s=session_ttl_s,
+        max_sessions=max_sessions,
+        stop_pondering=stop_pondering,
+    )
+    configure_stopping(stop_search=stop_search)
+    configure_streaming(progress=progress)
+
+
+def _log_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logging.error("Pondering failed", exc_info=future.exception())
+
+
+class _BoundedPool:
+    # an executor refusing work once `capacity` calls are running or queued
+    def __init__(self, make_executor: Callable[[], Executor], capacity: int):
+        self._make_executor = make_executor
+        self.executor = make_executor()
+        self.capacity = capacity
+        self.pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.capacity:
+                raise Overloaded()
+            self.pending += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # a call that timed out keeps its slot until it really ends
+        future.add_done_callback(self._release)
+        return future
+
+    def restart(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self._make_executor()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, _: Future | None = None) -> None:
+        with self._lock:
+            self.pending -= 1
+
+
+class _SearchProcess(_BoundedPool):
+    # a single search process, which ponders while it has nothing else to do
+    def __init__(self, capacity: int, session_ttl_s: float, max_sessions: int):
+        # forking a threaded server can deadlock, so start fresh interpreters
+        context = multiprocessing.get_context("spawn")
+        self.stop_pondering = context.Event()
+        self._pondering: Future | None = None
+        # the progress searches report, passed on to their listeners by id, and
+        # the id of a search to stop
+        self.progress = context.Queue()
+        self.stop_search = context.Value("q", 0)
+        self._listeners: dict[int, Callable[[SearchProgress], None]] = {}
+        threading.Thread(target=self._read_progress, daemon=True).start()
+        super().__init__(
+            lambda: ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_search_process,
+                initargs=(
+                    session_ttl_s,
+                    max_sessions,
+                    self.stop_pondering,
+                    self.progress,
+                    self.stop_search,
+                ),
+            ),
+            capacity,
+        )
+
+    def submit(self, fn: Callable, *args) -> Future:
+        # pondering gives way to any other work
+        self.stop_pondering.set()
+        if self._pondering is not None:
+            self._pondering.cancel()
+        return super().submit(fn, *args)
+
+    def ponder(self, fn: Callable, *args) -> None:
+        # fn(*args) unless other work is running or queued; it takes no slot, and
+        # must return soon after stop_pondering is set
+        with self._lock:
+            if self.pending:
+                return
+        self.stop_pondering.clear()
+        try:
+            self._pondering = self.executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # the next move restarts the process
+            return
+        self._pondering.add_done_callback(_log_failure)
+
+    def listen(
+        self, search_id: int, listener: Callable[[SearchProgress], None]
+    ) -> None:
+        self._listeners[search_id] = listener
+
+    def unlisten(self, search_id: int) -> None:
+        self._listeners.pop(search_id, None)
+
+    def stop(self, search_id: int) -> None:
+        self.stop_search.value = search_id
+
+    def shutdown(self) -> None:
+        self.stop_pondering.set()
+        self.progress.put(None)
+        super().shutdown()
+
+    def _read_progress(self) -> None:
+        while (report := self.progress.get()) is not None:
+            search_id, progress = report
+            listener = self._listeners.get(search_id)
+            if listener is not None:
+                listener(progress)
+
+
+# Runs solver calls off the event loop: searches in processes, since they hold
+# the GIL, and LLM calls, which mostly wait on HTTP, in threads. Every search
+# process has a pool of its own, so that the moves of a game session always
+# reach the process keeping its game.
+class MoveExecutor:
+    def __init__(
+        self,
+        processes: int,
+        threads: int,
+        max_queued: int,
+        timeout_s: float,
+        session_ttl_s: float,
+        max_sessions: int,
+    ):
+        self.timeout_s = timeout_s
+        self._search = [
+            _SearchProcess(
+                capacity=1 + max_queued,
+                session_ttl_s=session_ttl_s,
+                max_sessions=max_sessions,
+            )
+            for _ in range(processes)
+        ]
+        self._llm = _BoundedPool(
+            lambda: ThreadPoolExecutor(max_workers=threads, thread_name_prefix="llm"),
+            capacity=threads + max_queued,
+        )
+        # sessions of LLM solvers are kept by the API process itself
+        configure_sessions(ttl_s=session_ttl_s, max_sessions=max_sessions)
+        self._search_ids = itertools.count(1)
+
+    async def run(
+        self,
+        solver_type: SolverType,
+        fn: Callable,
+        *args,
+        time_budget_ms: int | None = None,
+        session_id: str | None = None,
+    ):
+        # fn(*args) in the pool for the solver type, given the time budget plus
+        # timeout_s to answer; raises Overloaded, Unavailable or TimeoutError
+        if solver_type.type in get_args(ModelProviderName):
+            pool = self._llm
+        elif session_id is not None:
+            pool = self._session_process(session_id)
+        else:
+            pool = self._idle_process()
+        return await self._run_in(pool, fn, *args, time_budget_ms=time_budget_ms)
+
+    async def stream(
+        self,
+        fn: Callable,
+        *args,
+        time_budget_ms: int | None,
+        on_progress: Callable[[SearchProgress], None],
+        stop: asyncio.Event,
+    ):
+        # like run for a search, passing the progress fn reports to on_progress
+        # on the event loop, and stopping the search once `stop` is set
+        process = self._idle_process()
+        search_id = next(self._search_ids)
+        loop = asyncio.get_running_loop()
+        process.listen(
+            search_id,
+            lambda progress: loop.call_soon_threadsafe(on_progress, progress),
+        )
+        stopper = asyncio.create_task(self._stop_search(process, search_id, stop))
+        try:
+            return await self._run_in(
+                process, fn, *args, time_budget_ms=time_budget_ms, search_id=search_id
+            )
+        finally:
+            stopper.cancel()
+            process.unlisten(search_id)
+
+    async def map(
+        self, fn: Callable, calls: Iterable[tuple], time_budget_ms: int | None
+    ) -> AsyncIterator[tuple[tuple, asyncio.Task]]:
+        # fn(*args) for all args in the search processes, yielding each args
+        # with its finished task in the order they finish; only as many calls
+        # as there are processes run at a time, so that moves still get their share
+        pending: dict[asyncio.Task, tuple] = {}
+        calls = iter(calls)
+        try:
+            while True:
+                while len(pending) < len(self._search):
+                    args = next(calls, None)
+                    if args is None:
+                        break
+                    task = asyncio.create_task(
+                        self._run_in(
+                            self._idle_process(),
+                            fn,
+                            *args,
+                            time_budget_ms=time_budget_ms,
+                        )
+                    )
+                    pending[task] = args
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield pending.pop(task), task
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def ponder(
+        self, solver_type: SolverType, fn: Callable, *args, session_id: str
+    ) -> None:
+        # fn(*args) in the background in the session's search process, if it is
+        # idle; LLM solvers do not ponder
+        if solver_type.type not in get_args(ModelProviderName):
+            self._session_process(session_id).ponder(fn, *args)
+
+    def _session_process(self, session_id: str) -> _SearchProcess:
+        return self._search[zlib.crc32(session_id.encode()) % len(self._search)]
+
+    def _idle_process(self) -> _SearchProcess:
+        return min(self._search, key=lambda pool: pool.pending)
+
+    async def _run_in(
+        self,
+        pool: _BoundedPool,
+        fn: Callable,
+        *args,
+        time_budget_ms: int | None,
+        search_id: int | None = None,
+    ):
+        timeout_s = self.timeout_s + (time_budget_ms or 0) / 1000
+        if isinstance(pool, _SearchProcess):
+            # searches get an id, by which they are stopped
+            if search_id is None:
+                search_id = next(self._search_ids)
+            fn, args = run_search, (search_id, fn, *args)
+        try:
+            future = pool.submit(fn, *args)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout_s)
+        except (TimeoutError, asyncio.CancelledError):
+            # nobody waits for the search anymore, so it ends soon and frees its
+            # process; LLM calls cannot be stopped and keep their thread
+            if isinstance(pool, _SearchProcess):
+                pool.stop(search_id)
+            raise
+        except BrokenProcessPool:
+            # a search process died, e.g. out of memory, with the games it kept;
+            # start a new one
+            logging.exception("Search process pool broken, restarting it")
+            pool.restart()
+            raise Unavailable()
+
+    @staticmethod
+    async def _stop_search(
+        process: _SearchProcess, search_id: int, stop: asyncio.Event
+    ) -> None:
+        await stop.wait()
+        process.stop(search_id)
+
+    def shutdown(self) -> None:
+        for pool in self._search:
+            pool.shutdown()
+        self._llm.shutdown()
@@ -0,0 +1,59 @@
+from typing import NamedTuple
+
+from src.board import ConnectFourBoard
+from src.game import Game
+from src.types.evaluation import Evaluation
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+from src.types.search_info import SearchInfo
+from src.types.solver_type import SolverType
+from src.utils import get_solver
+
+from api.schemas.move_response import MoveResponse
+from api.stopping import search_stopped
+
+
+# the solver's reply to the player's move, and what it knows about it
+class Reply(NamedTuple):
+    move: Move | None
+    evaluation: Evaluation | None
+    search_info: SearchInfo | None
+
+
+# plays a turn on the posted board; runs in a search process or an LLM thread,
+# never on the event loop
+def play_move(
+    solver_type: SolverType,
+    board_state: list[list[PieceEnum]],
+    player_move: Move,
+    time_budget_ms: int | None,
+    workers: int,
+) -> MoveResponse:
+    solver = get_solver(solver_type, time_budget_ms=time_budget_ms, workers=workers)
+    solver.stop_event = search_stopped
+    game = Game(board=ConnectFourBoard(initial_state=board_state), solver=solver)
+    return play_turn(game, player_move)
+
+
+# plays the player's move and the solver's reply, which is searched unless
+# it is given
+def play_turn(
+    game: Game, player_move: Move, reply: Reply | None = None
+) -> MoveResponse:
+    game.make_move(move=player_move, piece=PieceEnum.HUMAN)
+
+    if game.is_over():
+        reply = Reply(None, None, None)
+    elif reply is None:
+        best_move = game.get_solver_move(piece=PieceEnum.CPU)
+        reply = Reply(best_move, game.solver.evaluation, game.solver.search_info)
+    if reply.move is not None:
+        game.make_move(move=reply.move, piece=PieceEnum.CPU)
+
+    return MoveResponse(
+        state=game.state,
+        solver_move=reply.move,
+        winning_sequence=game.get_winning_sequence(),
+        evaluation=reply.evaluation,
+        search=reply.search_info,
+    )
@@ -0,0 +1,11 @@
+from src.heuristic.count_pieces_heuristic import CountPiecesHeuristic
+from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
+from src.heuristic.heuristic_factory import HeuristicFactory
+from src.heuristic.ntuple_heuristic import NTupleHeuristic
+
+
+# run by the API and by every search process it starts
+def register_heuristics() -> None:
+    HeuristicFactory.register("pieces", CountPiecesHeuristic)
+    HeuristicFactory.register("positions", CountPositionsHeuristic)
+    HeuristicFactory.register("ntuple", NTupleHeuristic)
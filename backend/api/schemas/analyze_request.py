@@ -0,0 +1,14 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+from src.types.piece_enum import PieceEnum
+
+
+class AnalyzedPosition(BaseModel):
+    board: list[list[PieceEnum]]
+    # the side to move, the CPU by default as in /move
+    piece: Literal[PieceEnum.HUMAN, PieceEnum.CPU] = PieceEnum.CPU
+
+
+class AnalyzeRequest(BaseModel):
+    positions: list[AnalyzedPosition] = Field(max_length=10_000)
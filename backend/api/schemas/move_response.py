@@ -1,9 +1,15 @@
 from pydantic import BaseModel
 from src.game.game_state import GameState
+from src.types.evaluation import Evaluation
 from src.types.move import Move
+from src.types.search_info import SearchInfo
 
 
 class MoveResponse(BaseModel):
     state: GameState
     solver_move: Move | None
     winning_sequence: list[Move] | None
+    # outcome for the solver under perfect play, only known to exact solvers
+    evaluation: Evaluation | None = None
+    # how the solver chose its move, unknown for LLM solvers
+    search: SearchInfo | None = None
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from src.types.move import Move
+
+
+class PositionAnalysis(BaseModel):
+    # index of the position in the request
+    index: int
+    best_move: Move | None = None
+    # the score of every column for the side to move in the solver's own units,
+    # null for full columns and those it could not score in time
+    scores: list[float | None] | None = None
+    # why the position was not analyzed
+    error: str | None = None
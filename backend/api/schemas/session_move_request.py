@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from src.board.layout import COLS
+
+
+class SessionMoveRequest(BaseModel):
+    # the stone drops to the lowest empty cell of the column
+    col: int = Field(ge=0, lt=COLS)
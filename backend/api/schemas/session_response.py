@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from src.types.move import Move
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+    # the solver's first move when it plays first
+    solver_move: Move | None
@@ -3,6 +3,23 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     MISTRAL_API_KEY: str
+    # processes searching the root moves of the minimax solver in parallel
+    SEARCH_WORKERS: int = 1
+    # processes running searches off the event loop, and threads waiting on LLMs
+    SOLVER_PROCESSES: int = 1
+    LLM_THREADS: int = 8
+    # moves each search process and the LLM thread pool queue behind the running
+    # ones before answering 429
+    MAX_QUEUED_MOVES: int = 8
+    # seconds a move may take on top of its time budget before answering 503
+    MOVE_TIMEOUT_S: float = 30
+    RETRY_AFTER_S: int = 1
+    # game sessions each search process keeps, with solver tables of up to 8 MB
+    # (16 MB for the perfect solver), and seconds they are kept unused
+    MAX_SESSIONS: int = 64
+    SESSION_TTL_S: float = 600
+    # search the replies to a session's possible moves while the player thinks
+    PONDER: bool = True
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+from src.board import ConnectFourBoard
+from src.game import Game
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+from src.solver.deadline import StopEvent
+from src.types.solver_type import SolverType
+from src.utils import get_solver
+
+from api.moves import Reply, play_turn
+from api.schemas.move_response import MoveResponse
+from api.stopping import search_stopped
+
+T = TypeVar("T")
+
+
+class SessionNotFound(Exception):
+    pass
+
+
+class SessionStore(Generic[T]):
+    # sessions by id, dropped `ttl_s` seconds after their last use, or least
+    # recently used first once there are more than `max_sessions`
+    def __init__(self, ttl_s: float, max_sessions: int):
+        self.ttl_s = ttl_s
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, tuple[float, T]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, session: T) -> None:
+        with self._lock:
+            self._expire()
+            self._sessions[session_id] = (time.monotonic(), session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get(self, session_id: str) -> T:
+        with self._lock:
+            self._expire()
+            if session_id not in self._sessions:
+                raise SessionNotFound()
+            _, session = self._sessions.pop(session_id)
+            self._sessions[session_id] = (time.monotonic(), session)
+            return session
+
+    def remove(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._sessions)
+
+    def _expire(self) -> None:
+        # the least recently used sessions come first
+        now = time.monotonic()
+        while self._sessions:
+            last_used, _ = next(iter(self._sessions.values()))
+            if now - last_used < self.ttl_s:
+                break
+            self._sessions.popitem(last=False)
+
+
+# what the API needs to send a session's moves to the process holding it
+class SessionRoute:
+    def __init__(self, solver_type: SolverType, time_budget_ms: int | None):
+        self.solver_type = solver_type
+        self.time_budget_ms = time_budget_ms
+        # a move is being played, so another one must wait for its answer
+        self.busy = False
+
+
+class GameSession:
+    def __init__(self, game: Game):
+        self.game = game
+        # the solver's replies to the player's next moves by column, searched
+        # while the player thinks
+        self.replies: dict[int, Reply] = {}
+
+
+# the games of the sessions held by this process, with their warm solvers
+_games: SessionStore[GameSession] | None = None
+# set by the API when a move arrives, so that pondering gives way to it
+_stop_pondering: StopEvent | None = None
+
+
+# run by the API for the sessions of LLM solvers, which play in its threads,
+# and by every search process it starts
+def configure_sessions(
+    ttl_s: float, max_sessions: int, stop_pondering: StopEvent | None = None
+) -> None:
+    global _games, _stop_pondering
+    _games = SessionStore(ttl_s=ttl_s, max_sessions=max_sessions)
+    _stop_pondering = stop_pondering
+
+
+def start_game(
+    session_id: str,
+    solver_type: SolverType,
+    time_budget_ms: int | None,
+    workers: int,
+    cpu_first: bool,
+) -> Move | None:
+    solver = get_solver(solver_type, time_budget_ms=time_budget_ms, workers=workers)
+    solver.stop_event = search_stopped
+    game = Game(board=ConnectFourBoard(), solver=solver)
+    first_move = None
+    if cpu_first:
+        first_move = solver.first_move()
+        game.make_move(move=first_move, piece=PieceEnum.CPU)
+    _games.add(session_id, GameSession(game))
+    return first_move
+
+
+def play_game_move(session_id: str, col: int) -> MoveResponse:
+    session = _games.get(session_id)
+    game = session.game
+    player_move = game.board.get_move_from_col(col)
+    if player_move is None:
+        raise ValueError("Invalid move")
+
+    reply = session.replies.get(col)
+    session.replies = {}
+    if reply is not None:
+        logging.info(f"Answering {player_move} with the pondered {reply.move}")
+    moves = len(game.board.moves)
+    response = play_turn(game, player_move, reply)
+    if search_stopped.is_set():
+        # the API gave up on the move, so the player may play it again
+        while len(game.board.moves) > moves:
+            game.board.undo_move()
+        game.state = "CONTINUE"
+        return response
+    # a finished game takes no more moves
+    if game.is_over():
+        _games.remove(session_id)
+    return response
+
+
+# searches the solver's replies to the player's possible moves, one after the
+# other, until they are all known or the API stops pondering
+def ponder_game(session_id: str) -> None:
+    try:
+        session = _games.get(session_id)
+    except SessionNotFound:
+        return
+    board, solver = session.game.board, session.game.solver
+    solver.stop_event = _stop_pondering
+    try:
+        for move in board.get_possible_moves():
+            if _stop_pondering.is_set():
+                return
+            # moves ending the game need no reply
+            if move.col in session.replies or board.is_winning_move(
+                move, PieceEnum.HUMAN
+            ):
+                continue
+
+            board.make_move(move=move, piece=PieceEnum.HUMAN)
+            try:
+                best_move = solver.solve(board, PieceEnum.CPU)
+            finally:
+                board.undo_move()
+            # a search cut short found a weaker reply than a full one would; its
+            # transposition table entries still speed up the search for the move
+            if best_move is None or _stop_pondering.is_set():
+                return
+            session.replies[move.col] = Reply(
+                best_move, solver.evaluation, solver.search_info
+            )
+    finally:
+        solver.stop_event = search_stopped
+
+
+def end_game(session_id: str) -> None:
+    _games.remove(session_id)
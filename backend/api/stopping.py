@@ -0,0 +1,37 @@
+from multiprocessing.sharedctypes import Synchronized
+from typing import Callable
+
+# id of the search the API asked to stop, shared with every search process
+_stop_search: Synchronized | None = None
+# id of the search this process is running, 0 between searches
+_search_id = 0
+
+
+# run by every search process the API starts
+def configure_stopping(stop_search: Synchronized) -> None:
+    global _stop_search
+    _stop_search = stop_search
+
+
+# runs fn(*args) as the search with this id, which the API can stop by its id
+def run_search(search_id: int, fn: Callable, *args):
+    global _search_id
+    _search_id = search_id
+    try:
+        return fn(*args)
+    finally:
+        _search_id = 0
+
+
+def current_search() -> int:
+    return _search_id
+
+
+class _SearchStopped:
+    # a StopEvent set once the API stops the search this process is running
+    def is_set(self) -> bool:
+        return _search_id != 0 and _stop_search.value == _search_id
+
+
+# the stop event of every solver a search process runs
+search_stopped = _SearchStopped()
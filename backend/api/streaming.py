@@ -0,0 +1,47 @@
+from multiprocessing.queues import Queue
+
+from src.board import ConnectFourBoard
+from src.game import Game
+from src.solver import MinimaxAlphaBetaPruningSolver
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+from src.types.search_progress import SearchProgress
+from src.types.solver_type import SolverType
+from src.utils import get_solver
+
+from api.moves import play_turn
+from api.schemas.move_response import MoveResponse
+from api.stopping import current_search, search_stopped
+
+# (search id, progress) of the searches of this process, read by the API
+_progress: Queue | None = None
+
+
+# run by every search process the API starts
+def configure_streaming(progress: Queue) -> None:
+    global _progress
+    _progress = progress
+
+
+# like play_move, reporting every depth searched to the API; the minimax
+# solvers deepen one ply at a time even without a time budget, so that there
+# is progress to report and a search to stop
+def stream_move(
+    solver_type: SolverType,
+    board_state: list[list[PieceEnum]],
+    player_move: Move,
+    time_budget_ms: int | None,
+    workers: int,
+) -> MoveResponse:
+    solver = get_solver(solver_type, time_budget_ms=time_budget_ms, workers=workers)
+    if isinstance(solver, MinimaxAlphaBetaPruningSolver):
+        solver.always_deepen = True
+    solver.stop_event = search_stopped
+    search_id = current_search()
+
+    def report(progress: SearchProgress) -> None:
+        _progress.put((search_id, progress))
+
+    solver.on_iteration = report
+    game = Game(board=ConnectFourBoard(initial_state=board_state), solver=solver)
+    return play_turn(game, player_move)
@@ -0,0 +1,125 @@
+import argparse
+import logging
+import random
+import time
+
+from src.board import ConnectFourBoard
+from src.heuristic.count_pieces_heuristic import CountPiecesHeuristic
+from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
+from src.heuristic.ntuple_heuristic import NTupleHeuristic
+from src.heuristic.cached_heuristic import CachedHeuristic
+from src.solver import MinimaxAlphaBetaPruningSolver
+from src.solver.move_ordering import MoveOrdering
+from src.types.piece_enum import PieceEnum
+
+HEURISTICS = {
+    "pieces": CountPiecesHeuristic,
+    "positions": CountPositionsHeuristic,
+    "ntuple": NTupleHeuristic,
+}
+ORDERING_LAYERS = ("center", "pv", "tt", "killers", "history")
+
+
+def benchmark_positions(
+    count: int, seed: int = 0, min_plies: int = 4, max_plies: int = 16
+) -> list[tuple[ConnectFourBoard, PieceEnum]]:
+    # random but reproducible midgame positions where nobody has won yet
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = ConnectFourBoard()
+        piece = PieceEnum.HUMAN
+        for _ in range(rng.randint(min_plies, max_plies)):
+            move = rng.choice(board.get_possible_moves())
+            if board.is_winning_move(move, piece):
+                break
+            board.make_move(move, piece)
+            piece = PieceEnum(3 - piece.value)
+        else:
+            positions.append((ConnectFourBoard(initial_state=board.state), piece))
+    return positions
+
+
+def parse_ordering(layers: str) -> MoveOrdering | None:
+    if layers == "none":
+        return None
+
+    enabled = set(layers.split(","))
+    unknown = enabled - set(ORDERING_LAYERS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown ordering layers: {unknown}")
+    return MoveOrdering(
+        center_first="center" in enabled,
+        pv_move="pv" in enabled,
+        tt_move="tt" in enabled,
+        killers="killers" in enabled,
+        history="history" in enabled,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure nodes and time per move of the minimax solver."
+    )
+    parser.add_argument("--heuristic", choices=HEURISTICS, default="positions")
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--tt-mb", type=float, default=4, help="0 disables the transposition table"
+    )
+    parser.add_argument(
+        "--ordering",
+        default=",".join(ORDERING_LAYERS),
+        help=f"comma-separated subset of {ORDERING_LAYERS}, or 'none'",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="processes searching the root moves"
+    )
+    parser.add_argument(
+        "--no-incremental",
+        action="store_true",
+        help="evaluate every leaf from scratch instead of keeping a running score",
+    )
+    parser.add_argument(
+        "--eval-cache",
+        type=int,
+        default=0,
+        help="entries of an LRU cache of leaf scores shared by all positions, 0 for none",
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    heuristic = HEURISTICS[args.heuristic]()
+    if args.eval_cache:
+        heuristic = CachedHeuristic(heuristic, max_entries=args.eval_cache)
+    total_nodes = 0
+    start = time.perf_counter()
+    for board, piece in benchmark_positions(args.positions, seed=args.seed):
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=heuristic,
+            depth=args.depth,
+            tt_size_mb=args.tt_mb or None,
+            move_ordering=parse_ordering(args.ordering),
+            workers=args.workers,
+            incremental_evaluation=not args.no_incremental,
+        )
+        solver.solve(board=board, piece=piece)
+        total_nodes += solver.nodes
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{args.positions} positions at depth {args.depth}: "
+        f"{total_nodes / args.positions:.0f} nodes/move, "
+        f"{1000 * elapsed / args.positions:.1f} ms/move, "
+        f"{total_nodes / elapsed:.0f} nodes/s"
+        + (
+            f", evaluation cache hit rate {heuristic.hit_rate():.1%}"
+            if args.eval_cache
+            else ""
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
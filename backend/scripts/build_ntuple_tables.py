@@ -0,0 +1,202 @@
+import argparse
+import logging
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src.board import ConnectFourBoard
+from src.board.layout import COLS, COLUMN_BITS
+from src.heuristic.ntuple_tables import (
+    TABLES_PATH,
+    TUPLES,
+    pattern_index,
+    write_ntuple_tables,
+)
+from src.solver import PerfectSolver
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+# weight units per unit of the label, where a win is 1 and a loss -1
+SCALE = 1000
+_COLUMN = (1 << COLUMN_BITS) - 1
+
+
+def play_game(rng: random.Random) -> tuple[list[Move], int]:
+    # random moves, except that a win is always taken and a single threat
+    # always blocked; returns the moves and the winner, 0 on a draw
+    board, piece = ConnectFourBoard(), PieceEnum.HUMAN
+    moves = []
+    while not board.is_full():
+        possible = board.get_possible_moves()
+        opponent = PieceEnum(3 - piece)
+        move = next(
+            (move for move in possible if board.is_winning_move(move, piece)),
+            None,
+        ) or next(
+            (move for move in possible if board.is_winning_move(move, opponent)),
+            rng.choice(possible),
+        )
+        if board.is_winning_move(move, piece):
+            return moves, piece
+        board.make_move(move, piece)
+        moves.append(move)
+        piece = opponent
+    return moves, 0
+
+
+def label_games(
+    labels: str, games: int, min_stones: int, time_budget_ms: float, seed: int
+) -> list[tuple[int, int, float]]:
+    # (own, opponent, value) samples for the side to move
+    logging.disable(logging.INFO)
+    rng = random.Random(seed)
+    solver = PerfectSolver(weak=True, time_budget_ms=time_budget_ms)
+    samples = []
+    for _ in range(games):
+        moves, winner = play_game(rng)
+        if labels == "selfplay":
+            # every position, valued by the final result
+            stones = len(moves)
+        elif len(moves) > min_stones:
+            # one position per game, solved exactly if the solver is fast enough
+            stones = rng.randrange(min_stones, len(moves))
+        else:
+            continue
+
+        board, piece = ConnectFourBoard(), PieceEnum.HUMAN
+        for ply, move in enumerate(moves[: stones + 1]):
+            own, opponent = board.bitboards[piece], board.bitboards[3 - piece]
+            if labels == "selfplay":
+                result = 0 if not winner else 1 if piece == winner else -1
+                samples.append((own, opponent, result))
+            elif ply == stones:
+                solver.solve(board, piece)
+                if solver.score is not None:
+                    samples.append((own, opponent, solver.score))
+                break
+            board.make_move(move, piece)
+            piece = PieceEnum(3 - piece)
+    return samples
+
+
+def mirror(bitboard: int) -> int:
+    return sum(
+        (bitboard >> (col * COLUMN_BITS) & _COLUMN) << ((COLS - 1 - col) * COLUMN_BITS)
+        for col in range(COLS)
+    )
+
+
+def features(samples: list[tuple[int, int, float]]) -> np.ndarray:
+    # one row per sample, holding the weight index of every tuple's pattern
+    offsets = np.cumsum([0] + [3 ** len(cells) for cells in TUPLES])
+    return np.array(
+        [
+            [
+                offset + pattern_index(own, opponent, cells)
+                for offset, cells in zip(offsets, TUPLES)
+            ]
+            for own, opponent, _ in samples
+        ],
+        dtype=np.int64,
+    )
+
+
+def fit(
+    rows: np.ndarray, targets: np.ndarray, epochs: int, rng: np.random.Generator
+) -> np.ndarray:
+    # least squares by mini-batch gradient descent, one weight per pattern
+    weights = np.zeros(sum(3 ** len(cells) for cells in TUPLES))
+    # all tuples moving together correct about half of the error
+    rate = 0.5 / len(TUPLES)
+    for _ in range(epochs):
+        order = rng.permutation(len(rows))
+        for batch in np.array_split(order, max(1, len(rows) // 256)):
+            errors = weights[rows[batch]].sum(axis=1) - targets[batch]
+            gradient = np.zeros_like(weights)
+            np.add.at(gradient, rows[batch], errors[:, None])
+            # averaged per weight, so common patterns do not take huge steps
+            counts = np.bincount(rows[batch].ravel(), minlength=len(weights))
+            weights -= rate * gradient / np.maximum(counts, 1)
+    return weights
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Learn the n-tuple heuristic's lookup tables."
+    )
+    parser.add_argument("--labels", choices=("solver", "selfplay"), default="solver")
+    parser.add_argument("--games", type=int, default=20_000)
+    parser.add_argument(
+        "--min-stones",
+        type=int,
+        default=14,
+        help="solver labels only: earliest position sampled from a game",
+    )
+    parser.add_argument(
+        "--time-budget-ms",
+        type=float,
+        default=100,
+        help="solver labels only: positions taking longer are skipped",
+    )
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument(
+        "--output", type=Path, help="defaults to the tables the API loads"
+    )
+    args = parser.parse_args()
+    output = args.output or TABLES_PATH
+
+    start = time.perf_counter()
+    chunks = [
+        args.games // args.jobs + (i < args.games % args.jobs) for i in range(args.jobs)
+    ]
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        samples = [
+            sample
+            for chunk in pool.map(
+                label_games,
+                [args.labels] * args.jobs,
+                chunks,
+                [args.min_stones] * args.jobs,
+                [args.time_budget_ms] * args.jobs,
+                [args.seed + i for i in range(args.jobs)],
+            )
+            for sample in chunk
+        ]
+    labelled = time.perf_counter()
+    # the mirror image of every position has the same value
+    samples += [(mirror(own), mirror(opponent), y) for own, opponent, y in samples]
+    rows = features(samples)
+    targets = np.array([target for _, _, target in samples], dtype=np.float64)
+
+    # hold out a tenth of the positions, together with their mirror images
+    rng = np.random.default_rng(args.seed)
+    test = np.tile(rng.random(len(samples) // 2) < 0.1, 2)
+    weights = fit(rows[~test], targets[~test], args.epochs, rng)
+    predictions = weights[rows[test]].sum(axis=1)
+    decided = targets[test] != 0
+    agreement = np.mean(np.sign(predictions[decided]) == targets[test][decided])
+
+    # refit on every position for the tables that are written
+    weights = fit(rows, targets, args.epochs, rng)
+    quantized = np.clip(np.rint(weights * SCALE), -(1 << 15), (1 << 15) - 1)
+    offsets = np.cumsum([0] + [3 ** len(cells) for cells in TUPLES])
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_ntuple_tables(
+        output,
+        TUPLES,
+        [quantized[low:high] for low, high in zip(offsets, offsets[1:])],
+    )
+    print(
+        f"{len(samples)} positions labelled in {labelled - start:.0f} s, "
+        f"held-out sign agreement on decided positions {agreement:.1%}; "
+        f"tables written to {output} in {time.perf_counter() - start:.0f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from src.board import ConnectFourBoard
+from src.book.opening_book import (
+    BOOKS_DIR,
+    BookEntry,
+    book_key,
+    write_opening_book,
+)
+from src.board.layout import COLS
+from src.heuristic.count_pieces_heuristic import CountPiecesHeuristic
+from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
+from src.heuristic.ntuple_heuristic import NTupleHeuristic
+from src.solver import MinimaxAlphaBetaPruningSolver
+from src.solver.move_ordering import MoveOrdering
+from src.types.piece_enum import PieceEnum
+
+HEURISTICS = {
+    "pieces": CountPiecesHeuristic,
+    "positions": CountPositionsHeuristic,
+    "ntuple": NTupleHeuristic,
+}
+
+
+def opening_positions(max_plies: int) -> list[tuple[ConnectFourBoard, PieceEnum]]:
+    # every position up to max_plies where nobody has won yet, once per mirror pair
+    positions = [(ConnectFourBoard(), PieceEnum.HUMAN)]
+    seen = {book_key(*positions[0])[0]}
+    frontier = positions[:]
+    for _ in range(max_plies):
+        next_frontier = []
+        for board, piece in frontier:
+            for move in board.get_possible_moves():
+                if board.is_winning_move(move, piece):
+                    continue
+
+                child = ConnectFourBoard(initial_state=board.state)
+                child.make_move(move, piece)
+                child_piece = PieceEnum(3 - piece.value)
+                key, _ = book_key(child, child_piece)
+                if key not in seen:
+                    seen.add(key)
+                    next_frontier.append((child, child_piece))
+        positions.extend(next_frontier)
+        frontier = next_frontier
+    return positions
+
+
+def label_position(
+    heuristic: str, depth: int, board: ConnectFourBoard, piece: PieceEnum
+) -> BookEntry:
+    logging.disable(logging.INFO)
+    solver = MinimaxAlphaBetaPruningSolver(
+        heuristic=HEURISTICS[heuristic](),
+        depth=depth,
+        move_ordering=MoveOrdering(),
+    )
+    move = solver.solve(board=board, piece=piece)
+    key, mirrored = book_key(board, piece)
+    # entries are stored for the smaller of the two mirrored keys
+    col = COLS - 1 - move.col if mirrored else move.col
+    return BookEntry(key=key, value=solver.score, col=col)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Precompute minimax moves for every opening position."
+    )
+    parser.add_argument("--heuristic", choices=HEURISTICS, default="positions")
+    parser.add_argument("--plies", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument(
+        "--output", type=Path, help="defaults to the book the API loads"
+    )
+    args = parser.parse_args()
+    output = args.output or BOOKS_DIR / f"{args.heuristic}.book"
+
+    start = time.perf_counter()
+    positions = opening_positions(args.plies)
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        entries = list(
+            pool.map(
+                label_position,
+                [args.heuristic] * len(positions),
+                [args.depth] * len(positions),
+                *zip(*positions),
+            )
+        )
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_opening_book(output, entries, max_plies=args.plies, depth=args.depth)
+    print(
+        f"{len(entries)} positions up to ply {args.plies} at depth {args.depth} "
+        f"written to {output} in {time.perf_counter() - start:.0f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
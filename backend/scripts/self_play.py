@@ -0,0 +1,95 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from src.game import BatchGames, GreedyPolicy, RandomPolicy, SolverPolicy
+from src.game.batch_games import BatchPolicy
+from src.solver import MCTSSolver, MinimaxAlphaBetaPruningSolver
+from src.solver.move_ordering import MoveOrdering
+from src.types.piece_enum import PieceEnum
+
+from scripts.benchmark_solver import HEURISTICS
+
+
+def parse_policy(spec: str, seed: int) -> BatchPolicy:
+    # random, greedy:<heuristic>, minimax:<heuristic>:<depth> or mcts:<ms per move>
+    kind, *options = spec.split(":")
+    try:
+        if kind == "random" and not options:
+            return RandomPolicy(seed)
+        if kind == "greedy" and len(options) == 1:
+            return GreedyPolicy(HEURISTICS[options[0]](), seed)
+        if kind == "minimax" and len(options) == 2:
+            return SolverPolicy(
+                MinimaxAlphaBetaPruningSolver(
+                    heuristic=HEURISTICS[options[0]](),
+                    depth=int(options[1]),
+                    move_ordering=MoveOrdering(),
+                )
+            )
+        if kind == "mcts" and len(options) == 1:
+            return SolverPolicy(
+                MCTSSolver(iterations=None, time_budget_ms=float(options[0]), seed=seed)
+            )
+    except (KeyError, ValueError) as error:
+        raise argparse.ArgumentTypeError(f"Invalid policy {spec!r}: {error}")
+    raise argparse.ArgumentTypeError(f"Invalid policy {spec!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Play two policies against each other in many games at once."
+    )
+    parser.add_argument(
+        "first",
+        help="random, greedy:<heuristic>, minimax:<heuristic>:<depth> "
+        "or mcts:<ms per move>",
+    )
+    parser.add_argument("second")
+    parser.add_argument(
+        "--games", type=int, default=10_000, help="half with each side moving first"
+    )
+    parser.add_argument(
+        "--opening-plies",
+        type=int,
+        default=2,
+        help="random moves opening every game, so deterministic policies vary",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    first = parse_policy(args.first, args.seed)
+    second = parse_policy(args.second, args.seed + 1)
+    opening = RandomPolicy(args.seed + 2)
+
+    results = np.zeros(3, dtype=np.int64)
+    moves = 0
+    start = time.perf_counter()
+    for first_moves, policies in ((True, (first, second)), (False, (second, first))):
+        games = BatchGames(args.games // 2)
+        for _ in range(args.opening_plies):
+            games.step(opening(games))
+        winners = games.play(*policies)
+        # wins, draws and losses of the first policy
+        first_piece = PieceEnum.HUMAN if first_moves else PieceEnum.CPU
+        results += [
+            np.sum(winners == first_piece),
+            np.sum(winners == PieceEnum.EMPTY),
+            np.sum(winners == 3 - first_piece),
+        ]
+        moves += int(games.plies.sum())
+    elapsed = time.perf_counter() - start
+
+    wins, draws, losses = results / results.sum()
+    print(
+        f"{args.first} against {args.second} over {results.sum()} games: "
+        f"{wins:.1%} won, {draws:.1%} drawn, {losses:.1%} lost; "
+        f"{moves} moves in {elapsed:.1f} s ({moves / elapsed:.0f} moves/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,85 +1,229 @@
-import logging
 from src.types.move import Move
 from src.types.piece_enum import PieceEnum
 
+from .layout import COLS, COLUMN_BITS, DIRECTIONS, ROWS, cell_bit
+from .lines import LINES, LINES_THROUGH
+from .zobrist import MIRROR_KEYS, ZOBRIST_KEYS
+
+# Moves are frozen, so every (col, height) pair is built once and shared
+_MOVES = [
+    [Move(col=col, row=ROWS - 1 - height) for height in range(ROWS)]
+    for col in range(COLS)
+]
+
+
+def bit_move(bit: int) -> Move:
+    col, height = divmod(bit, COLUMN_BITS)
+    return _MOVES[col][height]
+
+
+# the cells of every line as moves, in last_move_wins order and sorted for has_won
+_LINE_MOVES = tuple(
+    tuple(_MOVES[col][ROWS - 1 - row] for row, col in line.cells) for line in LINES
+)
+_SORTED_LINE_MOVES = tuple(
+    sorted(moves, key=lambda move: (move.col, move.row)) for moves in _LINE_MOVES
+)
+
+# line indices by mask, to find the one find_line found
+_LINE_INDEX = {line.mask: index for index, line in enumerate(LINES)}
+
+# (mask, line index) of every 4-in-a-row through a bit
+_LINES_THROUGH = tuple(
+    tuple((LINES[index].mask, index) for index in indices) for indices in LINES_THROUGH
+)
+
+
+# (first bit, shift) of a 4-in-a-row in `bitboard`, if there is one
+def find_line(bitboard: int) -> tuple[int, int] | None:
+    for shift in DIRECTIONS:
+        pairs = bitboard & (bitboard >> shift)
+        lines = pairs & (pairs >> 2 * shift)
+        if lines:
+            return (lines & -lines).bit_length() - 1, shift
+    return None
+
 
 class ConnectFourBoard:
     def __init__(self, initial_state: list[list[PieceEnum]] | None = None):
-        self.rows = 6
-        self.cols = 7
+        self.rows = ROWS
+        self.cols = COLS
         self.winning_sequence: list[Move] | None = None
-        self.state = [
-            [PieceEnum.EMPTY for _ in range(self.cols)] for _ in range(self.rows)
-        ]
+        # one bitboard per piece, indexed by PieceEnum (the EMPTY slot stays 0)
+        self.bitboards = [0, 0, 0]
+        # lowest empty cell of each column, counted from the bottom
+        self.heights = [0] * self.cols
+        # undo stack of the bits played through make_move
+        self.moves: list[int] = []
+        # Zobrist keys of the position and of its left-right reflection
+        self.key = 0
+        self.mirror_key = 0
+        self._grid: tuple[tuple[PieceEnum, ...], ...] | None = None
         if initial_state:
-            if len(initial_state) != self.rows or len(initial_state[0]) != self.cols:
-                raise ValueError(
-                    f"Initial state shape is incorrect. Expected shape: ({self.rows}, {self.cols})"
-                )
-            else:
-                self.state = [[_ for _ in row] for row in initial_state]
+            self.state = initial_state
+
+    @property
+    def grid(self) -> tuple[tuple[PieceEnum, ...], ...]:
+        # read-only decode of the bitboards, cached until the next move
+        if self._grid is None:
+            human, cpu = self.bitboards[PieceEnum.HUMAN], self.bitboards[PieceEnum.CPU]
+            grid = []
+            for row in range(self.rows):
+                cells = []
+                for col in range(self.cols):
+                    bit = 1 << cell_bit(row, col)
+                    if human & bit:
+                        cells.append(PieceEnum.HUMAN)
+                    elif cpu & bit:
+                        cells.append(PieceEnum.CPU)
+                    else:
+                        cells.append(PieceEnum.EMPTY)
+                grid.append(tuple(cells))
+            self._grid = tuple(grid)
+        return self._grid
+
+    @property
+    def state(self) -> list[list[PieceEnum]]:
+        # a copy: the bitboards are the position, so writing into it changes nothing
+        return [list(row) for row in self.grid]
+
+    @state.setter
+    def state(self, state: list[list[PieceEnum]]) -> None:
+        if len(state) != self.rows or len(state[0]) != self.cols:
+            raise ValueError(
+                f"Initial state shape is incorrect. Expected shape: ({self.rows}, {self.cols})"
+            )
+
+        bitboards = [0, 0, 0]
+        for row, cells in enumerate(state):
+            for col, cell in enumerate(cells):
+                if cell:
+                    bitboards[PieceEnum(cell)] |= 1 << cell_bit(row, col)
+
+        self.bitboards = bitboards
+        self.heights = [self._lowest_empty(col, 0) for col in range(self.cols)]
+        self.moves = []
+        self.key = self.mirror_key = 0
+        for piece in (PieceEnum.HUMAN, PieceEnum.CPU):
+            bitboard = bitboards[piece]
+            while bitboard:
+                bit = (bitboard & -bitboard).bit_length() - 1
+                self.key ^= ZOBRIST_KEYS[piece][bit]
+                self.mirror_key ^= MIRROR_KEYS[piece][bit]
+                bitboard &= bitboard - 1
+        self.winning_sequence = None
+        self._grid = None
+
+    @property
+    def mask(self) -> int:
+        return self.bitboards[PieceEnum.HUMAN] | self.bitboards[PieceEnum.CPU]
+
+    @property
+    def canonical_key(self) -> int:
+        # a position and its reflection have the same value, so share one key
+        return min(self.key, self.mirror_key)
 
     def make_move(self, move: Move, piece: PieceEnum) -> None:
-        logging.info(f"Making move: {move} for piece: {piece}")
-        self.state[move.row][move.col] = piece
+        bit = cell_bit(move.row, move.col)
+        if self.mask >> bit & 1:
+            raise ValueError(f"Cell {move} is already occupied")
+
+        self.bitboards[piece] |= 1 << bit
+        self.key ^= ZOBRIST_KEYS[piece][bit]
+        self.mirror_key ^= MIRROR_KEYS[piece][bit]
+        height = bit - move.col * COLUMN_BITS
+        if height == self.heights[move.col]:
+            self.heights[move.col] = self._lowest_empty(move.col, height + 1)
+        self.moves.append(bit)
+        self._grid = None
+
+    def undo_move(self) -> Move:
+        if not self.moves:
+            raise ValueError("No move to undo")
+
+        bit = self.moves.pop()
+        flag = 1 << bit
+        piece = (
+            PieceEnum.HUMAN if self.bitboards[PieceEnum.HUMAN] & flag else PieceEnum.CPU
+        )
+        self.bitboards[piece] ^= flag
+        self.key ^= ZOBRIST_KEYS[piece][bit]
+        self.mirror_key ^= MIRROR_KEYS[piece][bit]
+
+        col, height = divmod(bit, COLUMN_BITS)
+        if height < self.heights[col]:
+            self.heights[col] = height
+        self.winning_sequence = None
+        self._grid = None
+        return _MOVES[col][height]
 
     def get_possible_moves(self) -> list[Move]:
-        moves: list[Move] = []
-        for col in range(self.cols):
-            for row in range(self.rows - 1, -1, -1):
-                if self.state[row][col] == 0:
-                    moves.append(Move(col=col, row=row))
-                    break
-        return moves
+        return [
+            _MOVES[col][height]
+            for col, height in enumerate(self.heights)
+            if height < self.rows
+        ]
 
     def has_won(self, piece: PieceEnum) -> bool:
-        directions = [
-            (0, 1),
-            (1, 0),
-            (1, 1),
-            (-1, 1),
-        ]  # Right, Down, Diagonal ↘, Diagonal ↗
-
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if self.state[row][col] != piece:
-                    continue
-
-                for dr, dc in directions:
-                    if all(
-                        0 <= row + dr * i < self.rows
-                        and 0 <= col + dc * i < self.cols
-                        and self.state[row + dr * i][col + dc * i] == piece
-                        for i in range(4)
-                    ):
-                        self.winning_sequence = [
-                            Move(row=row + dr * i, col=col + dc * i) for i in range(4)
-                        ]
-                        return True
+        line = find_line(self.bitboards[piece])
+        if line is None:
+            return False
 
-        return False
+        start, shift = line
+        mask = sum(1 << start + i * shift for i in range(4))
+        self.winning_sequence = list(_SORTED_LINE_MOVES[_LINE_INDEX[mask]])
+        return True
 
     def is_empty(self) -> bool:
-        return all(
-            self.state[row][col] == PieceEnum.EMPTY
-            for row in range(self.rows)
-            for col in range(self.cols)
-        )
+        return not self.mask
+
+    def is_full(self) -> bool:
+        return min(self.heights) == self.rows
+
+    def last_move_wins(self, move: Move) -> bool:
+        bit = cell_bit(move.row, move.col)
+        piece = self.get_piece(move)
+        if piece == PieceEnum.EMPTY:
+            return False
+
+        bitboard = self.bitboards[piece]
+        for mask, index in _LINES_THROUGH[bit]:
+            if bitboard & mask == mask:
+                self.winning_sequence = list(_LINE_MOVES[index])
+                return True
+        return False
 
     def is_winning_move(self, move: Move, piece: PieceEnum) -> bool:
-        temp_board = ConnectFourBoard(initial_state=self.state)
-        temp_board.make_move(move, piece)
-        return temp_board.has_won(piece)
+        bit = cell_bit(move.row, move.col)
+        bitboard = self.bitboards[piece] | 1 << bit
+        for mask, _ in _LINES_THROUGH[bit]:
+            if bitboard & mask == mask:
+                return True
+        return False
+
+    def get_piece(self, move: Move) -> PieceEnum:
+        bit = cell_bit(move.row, move.col)
+        if self.bitboards[PieceEnum.HUMAN] >> bit & 1:
+            return PieceEnum.HUMAN
+        if self.bitboards[PieceEnum.CPU] >> bit & 1:
+            return PieceEnum.CPU
+        return PieceEnum.EMPTY
 
     def get_move_from_col(self, col: int) -> Move | None:
-        for row in range(self.rows - 1, -1, -1):
-            if self.state[row][col] == PieceEnum.EMPTY:
-                return Move(col=col, row=row)
+        height = self.heights[col]
+        if height < self.rows:
+            return _MOVES[col][height]
         return None
 
+    def _lowest_empty(self, col: int, height: int) -> int:
+        column = self.mask >> (col * COLUMN_BITS)
+        while height < self.rows and column >> height & 1:
+            height += 1
+        return height
+
     def __str__(self) -> str:
         display = "  " + "   ".join(str(i) for i in range(self.cols)) + "\n"
-        for row in self.state:
+        for row in self.grid:
             display += (
                 "| "
                 + " | ".join(str(cell.value) if cell.value else "." for cell in row)
@@ -0,0 +1,16 @@
+ROWS = 6
+COLS = 7
+
+# Bitboard layout: each column owns COLUMN_BITS consecutive bits, bottom cell
+# first. The spare bit on top of every column stays empty so that shifted
+# lines never wrap from one column into the next.
+COLUMN_BITS = ROWS + 1
+BOTTOM_MASK = sum(1 << (col * COLUMN_BITS) for col in range(COLS))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROWS) - 1)
+
+# Bit shifts of the four line directions: vertical, horizontal, diagonal ↗, diagonal ↘
+DIRECTIONS = (1, COLUMN_BITS, COLUMN_BITS + 1, COLUMN_BITS - 1)
+
+
+def cell_bit(row: int, col: int) -> int:
+    return col * COLUMN_BITS + ROWS - 1 - row
@@ -0,0 +1,49 @@
+from typing import NamedTuple
+
+from .layout import COLS, COLUMN_BITS, ROWS, cell_bit
+
+# (row, col) steps of the four line directions: right, down, down-right, up-right
+_STEPS = ((0, 1), (1, 0), (1, 1), (-1, 1))
+
+
+class Line(NamedTuple):
+    # cells from one end to the other, as (row, col)
+    cells: tuple[tuple[int, int], ...]
+    # bitboard masks of all four cells, of the two inner ones and of the two ends
+    mask: int
+    inner_mask: int
+    outer_mask: int
+    vertical: bool
+
+
+def _build_lines() -> tuple[Line, ...]:
+    lines = []
+    for row in range(ROWS):
+        for col in range(COLS):
+            for dr, dc in _STEPS:
+                cells = tuple((row + dr * i, col + dc * i) for i in range(4))
+                if not all(0 <= r < ROWS and 0 <= c < COLS for r, c in cells):
+                    continue
+
+                bits = [1 << cell_bit(r, c) for r, c in cells]
+                lines.append(
+                    Line(
+                        cells=cells,
+                        mask=sum(bits),
+                        inner_mask=bits[1] | bits[2],
+                        outer_mask=bits[0] | bits[3],
+                        vertical=dc == 0,
+                    )
+                )
+    return tuple(lines)
+
+
+# the 69 possible 4-in-a-rows
+LINES = _build_lines()
+LINE_MASKS = tuple(line.mask for line in LINES)
+
+# indices into LINES of the lines through each bit of the bitboard layout
+LINES_THROUGH: tuple[tuple[int, ...], ...] = tuple(
+    tuple(index for index, mask in enumerate(LINE_MASKS) if mask >> bit & 1)
+    for bit in range(COLS * COLUMN_BITS)
+)
@@ -0,0 +1,30 @@
+from .layout import BOARD_MASK, BOTTOM_MASK, COLUMN_BITS
+
+
+# empty cells that would complete a 4-in-a-row of `position`
+def winning_cells(position: int, mask: int) -> int:
+    # vertical: only the cell on top of three stones
+    cells = (position << 1) & (position << 2) & (position << 3)
+    for shift in (COLUMN_BITS, COLUMN_BITS + 1, COLUMN_BITS - 1):
+        pair = (position << shift) & (position << 2 * shift)
+        cells |= pair & (position << 3 * shift)
+        cells |= pair & (position >> shift)
+        pair = (position >> shift) & (position >> 2 * shift)
+        cells |= pair & (position << shift)
+        cells |= pair & (position >> 3 * shift)
+    return cells & (BOARD_MASK ^ mask)
+
+
+def playable_cells(mask: int) -> int:
+    return (mask + BOTTOM_MASK) & BOARD_MASK
+
+
+# whether `position` has two stones in a row or diagonal with both cells beyond
+# them empty, e.g. _XX_
+def has_open_pair(position: int, mask: int) -> bool:
+    empty = BOARD_MASK ^ mask
+    for shift in (COLUMN_BITS, COLUMN_BITS + 1, COLUMN_BITS - 1):
+        pairs = position & (position >> shift)
+        if pairs & (empty << shift) & (empty >> 2 * shift):
+            return True
+    return False
@@ -0,0 +1,44 @@
+import numpy as np
+
+from .layout import COLS, COLUMN_BITS, DIRECTIONS, ROWS, cell_bit
+
+# Bitboard operations on NumPy arrays of uint64 bitboards, one per board.
+
+BOTTOM_CELLS = np.array(
+    [1 << (col * COLUMN_BITS) for col in range(COLS)], dtype=np.uint64
+)
+COLUMN_MASKS = np.array(
+    [((1 << ROWS) - 1) << (col * COLUMN_BITS) for col in range(COLS)], dtype=np.uint64
+)
+TOP_CELLS = BOTTOM_CELLS << np.uint64(ROWS - 1)
+# bit of every cell, in the row-major order of a board's grid
+_CELL_BITS = np.array(
+    [cell_bit(row, col) for row in range(ROWS) for col in range(COLS)], dtype=np.uint64
+)
+
+
+def has_four(positions: np.ndarray) -> np.ndarray:
+    # which of the bitboards hold a 4-in-a-row
+    won = np.zeros(positions.shape, dtype=bool)
+    for shift in DIRECTIONS:
+        pairs = positions & (positions >> np.uint64(shift))
+        won |= (pairs & (pairs >> np.uint64(2 * shift))) != 0
+    return won
+
+
+def drop(masks: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    # the bit a stone dropped into each column lands on
+    return (masks + BOTTOM_CELLS[cols]) & COLUMN_MASKS[cols]
+
+
+def grids(own: np.ndarray, opponent: np.ndarray) -> np.ndarray:
+    # (N, ROWS, COLS) int8 boards with HUMAN for `own` and CPU for `opponent`
+    cells = ((own[:, None] >> _CELL_BITS) & np.uint64(1)) + 2 * (
+        (opponent[:, None] >> _CELL_BITS) & np.uint64(1)
+    )
+    return cells.astype(np.int8).reshape(-1, ROWS, COLS)
+
+
+def random_columns(rng: np.random.Generator, choices: np.ndarray) -> np.ndarray:
+    # a uniformly random True column of every (COLS,) row, 0 for rows without any
+    return np.argmax(rng.random(choices.shape) * choices, axis=1)
@@ -0,0 +1,32 @@
+from random import Random
+
+from src.types.piece_enum import PieceEnum
+
+from .layout import COLS, COLUMN_BITS
+
+# Fixed seed so keys are stable across processes and runs, which lets them be
+# shared between workers and persisted (e.g. in an opening book)
+_random = Random(0xC0FFEE)
+
+# one 64-bit key per (piece, bit), indexed like ConnectFourBoard.bitboards
+ZOBRIST_KEYS: list[list[int]] = [
+    [0] * (COLS * COLUMN_BITS),
+    [_random.getrandbits(64) for _ in range(COLS * COLUMN_BITS)],
+    [_random.getrandbits(64) for _ in range(COLS * COLUMN_BITS)],
+]
+
+# keys of the left-right reflected bit, so the mirror key can be kept up to date
+# with the same single XOR per move
+MIRROR_KEYS: list[list[int]] = [
+    [
+        keys[(COLS - 1 - bit // COLUMN_BITS) * COLUMN_BITS + bit % COLUMN_BITS]
+        for bit in range(COLS * COLUMN_BITS)
+    ]
+    for keys in ZOBRIST_KEYS
+]
+
+# XORed into a position key by callers that also need the side to move
+SIDE_TO_MOVE_KEYS: dict[PieceEnum, int] = {
+    PieceEnum.HUMAN: _random.getrandbits(64),
+    PieceEnum.CPU: _random.getrandbits(64),
+}
@@ -0,0 +1,3 @@
+from .opening_book import OpeningBook, get_opening_book
+
+__all__ = ["OpeningBook", "get_opening_book"]
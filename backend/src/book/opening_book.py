@@ -0,0 +1,106 @@
+import mmap
+import struct
+from functools import cache
+from pathlib import Path
+from typing import NamedTuple
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.board.layout import COLS
+from src.board.zobrist import MIRROR_KEYS, ZOBRIST_KEYS
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+BOOKS_DIR = Path(__file__).resolve().parents[2] / "data" / "opening_books"
+
+# magic, format version, entry count, deepest ply in the book, search depth
+_HEADER = struct.Struct("<6sHIBB")
+# canonical position key, value for the side to move, best column
+_ENTRY = struct.Struct("<Qfb")
+_MAGIC = b"C4BOOK"
+_VERSION = 1
+
+
+class BookEntry(NamedTuple):
+    key: int
+    value: float
+    col: int
+
+
+# Zobrist key of the position with the side to move as HUMAN, so one entry
+# serves both colors, and whether its mirror image was the smaller key
+def book_key(board: ConnectFourBoard, piece: PieceEnum) -> tuple[int, bool]:
+    key = mirror_key = 0
+    for owner, bitboard in (
+        (PieceEnum.HUMAN, board.bitboards[piece]),
+        (PieceEnum.CPU, board.bitboards[3 - piece]),
+    ):
+        while bitboard:
+            bit = (bitboard & -bitboard).bit_length() - 1
+            key ^= ZOBRIST_KEYS[owner][bit]
+            mirror_key ^= MIRROR_KEYS[owner][bit]
+            bitboard &= bitboard - 1
+    return min(key, mirror_key), mirror_key < key
+
+
+def write_opening_book(
+    path: Path, entries: list[BookEntry], max_plies: int, depth: int
+) -> None:
+    entries = sorted(entries)
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, len(entries), max_plies, depth))
+        for entry in entries:
+            file.write(_ENTRY.pack(*entry))
+
+
+class OpeningBook:
+    def __init__(self, path: Path):
+        with open(path, "rb") as file:
+            # read-only and shared, so every process reading the book uses the
+            # same pages of the OS page cache
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.size, self.max_plies, self.depth = _HEADER.unpack_from(
+            self._data, 0
+        )
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a version {_VERSION} opening book")
+
+    def lookup(self, board: ConnectFourBoard, piece: PieceEnum) -> BookEntry | None:
+        # value and best move for `piece` to move, None when the book lacks it
+        if board.mask.bit_count() > self.max_plies:
+            return None
+
+        key, mirrored = book_key(board, piece)
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            entry = BookEntry(*_ENTRY.unpack_from(self._data, self._offset(middle)))
+            if entry.key < key:
+                low = middle + 1
+            elif entry.key > key:
+                high = middle
+            else:
+                col = COLS - 1 - entry.col if mirrored else entry.col
+                return entry._replace(col=col)
+        return None
+
+    def best_move(self, board: ConnectFourBoard, piece: PieceEnum) -> Move | None:
+        entry = self.lookup(board, piece)
+        if entry is None:
+            return None
+        return board.get_move_from_col(entry.col)
+
+    def first_move(self) -> Move:
+        move = self.best_move(ConnectFourBoard(), PieceEnum.HUMAN)
+        if move is None:
+            raise ValueError("Opening book has no entry for the empty board")
+        return move
+
+    def _offset(self, index: int) -> int:
+        return _HEADER.size + index * _ENTRY.size
+
+
+# one mapping per book and process
+@cache
+def get_opening_book(name: str) -> OpeningBook:
+    return OpeningBook(BOOKS_DIR / f"{name}.book")
@@ -1,4 +1,13 @@
+from .batch_games import BatchGames
+from .batch_policies import GreedyPolicy, RandomPolicy, SolverPolicy
 from .game import Game
 from .game_state import GameState
 
-__all__ = ["Game", "GameState"]
+__all__ = [
+    "BatchGames",
+    "Game",
+    "GameState",
+    "GreedyPolicy",
+    "RandomPolicy",
+    "SolverPolicy",
+]
@@ -0,0 +1,70 @@
+from typing import Protocol
+
+import numpy as np
+
+from src.board.layout import BOARD_MASK
+from src.board.vectorized import TOP_CELLS, drop, grids, has_four
+from src.types.piece_enum import PieceEnum
+
+
+class BatchPolicy(Protocol):
+    # a column for every game, ignored for games that are over
+    def __call__(self, games: "BatchGames") -> np.ndarray: ...
+
+
+# Many independent games played in lockstep, every game that is not over making
+# one move per step, so the side to move is the same in all of them. A game is
+# a bitboard of the stones of the side to move and one of all stones.
+class BatchGames:
+    def __init__(self, games: int):
+        self.positions = np.zeros(games, dtype=np.uint64)
+        self.masks = np.zeros(games, dtype=np.uint64)
+        # stones played in each game, which stops counting when the game is over
+        self.plies = np.zeros(games, dtype=np.int64)
+        self.winners = np.zeros(games, dtype=np.int8)
+        self.over = np.zeros(games, dtype=bool)
+        self.ply = 0
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    @property
+    def piece(self) -> PieceEnum:
+        # the side to move in every game that is not over
+        return PieceEnum.HUMAN if self.ply % 2 == 0 else PieceEnum.CPU
+
+    def legal_moves(self) -> np.ndarray:
+        # (N, COLS) bool, all False for games that are over
+        return ((self.masks[:, None] & TOP_CELLS) == 0) & ~self.over[:, None]
+
+    def grids(self) -> np.ndarray:
+        # (N, ROWS, COLS) int8 boards of PieceEnum values
+        opponents = self.positions ^ self.masks
+        if self.piece == PieceEnum.HUMAN:
+            return grids(self.positions, opponents)
+        return grids(opponents, self.positions)
+
+    def step(self, cols: np.ndarray) -> None:
+        playing = ~self.over
+        cols = np.asarray(cols, dtype=np.int64)
+        if not self.legal_moves()[playing, cols[playing]].all():
+            raise ValueError("Invalid move")
+
+        moves = np.where(playing, drop(self.masks, cols), np.uint64(0))
+        stones = self.positions | moves
+        masks = self.masks | moves
+        won = playing & has_four(stones)
+        self.winners[won] = self.piece
+        self.positions = stones ^ masks
+        self.masks = masks
+        self.plies += playing
+        self.over |= won | (masks == BOARD_MASK)
+        self.ply += 1
+
+    def play(self, first: BatchPolicy, second: BatchPolicy) -> np.ndarray:
+        # plays every game to its end, `first` moving for HUMAN, and returns the
+        # winners, EMPTY for a draw
+        while not self.over.all():
+            policy = first if self.piece == PieceEnum.HUMAN else second
+            self.step(policy(self))
+        return self.winners
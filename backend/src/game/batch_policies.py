@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.board.layout import COLS
+from src.board.vectorized import drop, grids, has_four, random_columns
+from src.heuristic.heuristic import Heuristic
+from src.solver import Solver
+from src.types.piece_enum import PieceEnum
+
+from .batch_games import BatchGames
+
+
+class RandomPolicy:
+    def __init__(self, seed: int | None = None):
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, games: BatchGames) -> np.ndarray:
+        return random_columns(self.rng, games.legal_moves())
+
+
+# Plays the move whose resulting position the heuristic scores best, a win
+# always, ties at random. The heuristic must score boards with evaluate_batch.
+class GreedyPolicy:
+    def __init__(self, heuristic: Heuristic, seed: int | None = None):
+        if not hasattr(heuristic, "evaluate_batch"):
+            raise ValueError(f"{type(heuristic).__name__} cannot score batches")
+        self.heuristic = heuristic
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, games: BatchGames) -> np.ndarray:
+        legal = games.legal_moves()
+        scores = np.full(legal.shape, -np.inf)
+        for col in range(COLS):
+            playable = np.flatnonzero(legal[:, col])
+            masks = games.masks[playable]
+            moves = drop(masks, np.full(len(playable), col))
+            own = games.positions[playable] | moves
+            # boards seen from the side to move, which scores as HUMAN
+            child_scores = self.heuristic.evaluate_batch(
+                grids(own, own ^ masks ^ moves), PieceEnum.HUMAN
+            )
+            scores[playable, col] = np.where(has_four(own), np.inf, child_scores)
+        best = scores == scores.max(axis=1, keepdims=True)
+        return random_columns(self.rng, best & legal)
+
+
+# Asks a solver for every game in turn, so it is only as fast as the solver.
+class SolverPolicy:
+    def __init__(self, solver: Solver):
+        self.solver = solver
+
+    def __call__(self, games: BatchGames) -> np.ndarray:
+        cols = np.zeros(len(games), dtype=np.int64)
+        piece = games.piece
+        for index, grid in zip(np.flatnonzero(~games.over), games.grids()[~games.over]):
+            board = ConnectFourBoard(initial_state=grid.tolist())
+            cols[index] = self.solver.solve(board=board, piece=piece).col
+        return cols
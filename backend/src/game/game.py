@@ -21,20 +21,35 @@ class Game:
     def make_move(self, move: Move, piece: PieceEnum) -> None:
         if move not in self.board.get_possible_moves():
             raise ValueError("Invalid move")
+        logging.info(f"Making move: {move} for piece: {piece}")
         self.board.make_move(move=move, piece=piece)
-        self.sync_state()
+        self.sync_state(last_move=move)
 
     def get_solver_move(self, piece: PieceEnum) -> Move | None:
         best_move = self.solver.solve(self.board, piece=piece)
         logging.info(f"Solver selected move: {best_move} for piece: {piece}")
         return best_move
 
-    def sync_state(self) -> None:
-        if self.board.has_won(piece=PieceEnum.HUMAN):
-            self.state = "WIN"
+    def sync_state(self, last_move: Move | None = None) -> None:
+        # a win can only appear on a line through the last move played
+        if last_move is not None:
+            winner = (
+                self.board.get_piece(last_move)
+                if self.board.last_move_wins(last_move)
+                else PieceEnum.EMPTY
+            )
+        elif self.board.has_won(piece=PieceEnum.HUMAN):
+            winner = PieceEnum.HUMAN
         elif self.board.has_won(piece=PieceEnum.CPU):
+            winner = PieceEnum.CPU
+        else:
+            winner = PieceEnum.EMPTY
+
+        if winner == PieceEnum.HUMAN:
+            self.state = "WIN"
+        elif winner == PieceEnum.CPU:
             self.state = "LOSE"
-        elif not self.board.get_possible_moves():
+        elif self.board.is_full():
             self.state = "TIE"
 
     def get_winning_sequence(self):
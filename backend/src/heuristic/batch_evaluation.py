@@ -0,0 +1,42 @@
+import numpy as np
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.board.layout import COLS, ROWS
+from src.board.lines import LINES
+
+# Batches are (N, ROWS, COLS) int8 arrays of PieceEnum values. To score them for
+# one piece, every cell becomes OWN, OPPONENT or 0, and a matrix product sums the
+# cells of every line (or any set of cells) at once. Up to 63 own pieces, such a
+# sum is OWN * own pieces + OPPONENT * opponent pieces, both exact in float32.
+OWN = 1
+OPPONENT = 64
+
+# values of EMPTY, HUMAN and CPU cells for each piece
+_CELL_VALUES = np.array([[0, OWN, OPPONENT], [0, OPPONENT, OWN]], dtype=np.float32)
+
+
+def cells_matrix(cell_sets: list[list[tuple[int, int]]]) -> np.ndarray:
+    # (ROWS * COLS, len(cell_sets)) matrix with a 1 where a cell is in a set
+    matrix = np.zeros((ROWS * COLS, len(cell_sets)), dtype=np.float32)
+    for index, cells in enumerate(cell_sets):
+        for row, col in cells:
+            matrix[row * COLS + col, index] = 1
+    return matrix
+
+
+LINE_MATRIX = cells_matrix([list(line.cells) for line in LINES])
+
+
+def stack_boards(boards: list[ConnectFourBoard]) -> np.ndarray:
+    return np.array([board.grid for board in boards], dtype=np.int8).reshape(
+        -1, ROWS, COLS
+    )
+
+
+def cell_values(boards: np.ndarray, piece: int) -> np.ndarray:
+    # the (N, ROWS * COLS) values of the cells seen from `piece`
+    if boards.ndim != 3 or boards.shape[1:] != (ROWS, COLS):
+        raise ValueError(
+            f"Expected boards of shape (N, {ROWS}, {COLS}), got {boards.shape}"
+        )
+    return _CELL_VALUES[piece - 1][boards.reshape(len(boards), ROWS * COLS)]
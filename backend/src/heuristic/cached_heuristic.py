@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.board.zobrist import SIDE_TO_MOVE_KEYS
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+from .heuristic import Heuristic
+
+
+class CachedHeuristic(Heuristic):
+    # scores of the most recently evaluated positions, for `piece` to move
+    def __init__(self, heuristic: Heuristic, max_entries: int = 1 << 16):
+        if max_entries <= 0:
+            raise ValueError("Evaluation cache size must be positive.")
+
+        self.heuristic = heuristic
+        self.max_entries = max_entries
+        self._scores: OrderedDict[int, float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, board: ConnectFourBoard, piece: PieceEnum) -> float:
+        score = self.lookup(board, piece)
+        if score is None:
+            score = self.heuristic.evaluate(board=board, piece=piece)
+            self.store(board, piece, score)
+        return score
+
+    def first_move(self) -> Move:
+        return self.heuristic.first_move()
+
+    def lookup(self, board: ConnectFourBoard, piece: PieceEnum) -> float | None:
+        key = board.key ^ SIDE_TO_MOVE_KEYS[piece]
+        score = self._scores.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._scores.move_to_end(key)
+        return score
+
+    def store(self, board: ConnectFourBoard, piece: PieceEnum, score: float) -> None:
+        scores = self._scores
+        scores[board.key ^ SIDE_TO_MOVE_KEYS[piece]] = score
+        if len(scores) > self.max_entries:
+            # evict the least recently used score
+            scores.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "entries": len(self._scores),
+        }
+
+    def __getstate__(self) -> dict:
+        # copies sent to pool workers start empty
+        state = self.__dict__.copy()
+        state["_scores"] = OrderedDict()
+        return state
+
+    def clear(self) -> None:
+        self._scores.clear()
+        self.hits = 0
+        self.misses = 0
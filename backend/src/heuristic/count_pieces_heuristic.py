@@ -1,11 +1,16 @@
+import numpy as np
+
 from src.board.connect_four_board import ConnectFourBoard
+from src.board.lines import LINE_MASKS
+from src.book import get_opening_book
 from src.types.move import Move
 from src.types.piece_enum import PieceEnum
 
-from .heuristic import Heuristic
+from .batch_evaluation import LINE_MATRIX, OWN, cell_values
+from .heuristic import IncrementalHeuristic
 
 
-class CountPiecesHeuristic(Heuristic):
+class CountPiecesHeuristic(IncrementalHeuristic):
     @staticmethod
     def evaluate(board: ConnectFourBoard, piece: PieceEnum) -> int:
         if board.has_won(piece=piece):
@@ -15,42 +20,56 @@ class CountPiecesHeuristic(Heuristic):
 
     @staticmethod
     def first_move() -> Move:
-        return Move(col=0, row=5)
+        return get_opening_book("pieces").first_move()
 
     @staticmethod
     def _evaluate_board(board: ConnectFourBoard, piece: PieceEnum):
+        own = board.bitboards[piece]
+        opponent = board.bitboards[3 - piece]
         score = 0
-        # Evaluate based on consecutive pieces in rows
-        for row in range(board.rows):
-            for col in range(board.cols - 3):
-                window = board.state[row][col : col + 4]
-                score += CountPiecesHeuristic.evaluateWindow(window, piece)
-
-        # Evaluate based on consecutive pieces in columns
-        for col in range(board.cols):
-            for row in range(board.rows - 3):
-                window = [board.state[row + i][col] for i in range(4)]
-                score += CountPiecesHeuristic.evaluateWindow(window, piece)
-
-        # Evaluate based on consecutive pieces in diagonals (bottom-left to top-right)
-        for row in range(3, board.rows):
-            for col in range(board.cols - 3):
-                window = [board.state[row - i][col + i] for i in range(4)]
-                score += CountPiecesHeuristic.evaluateWindow(window, piece)
-
-        # Evaluate based on consecutive pieces in diagonals (top-left to bottom-right)
-        for row in range(board.rows - 3):
-            for col in range(board.cols - 3):
-                window = [board.state[row + i][col + i] for i in range(4)]
-                score += CountPiecesHeuristic.evaluateWindow(window, piece)
-
+        # only lines without opponent pieces score, by the pieces already in them
+        for mask in LINE_MASKS:
+            if not opponent & mask:
+                count = (own & mask).bit_count()
+                score += CountPiecesHeuristic._score_window(count, 4 - count)
         return score
 
     @staticmethod
-    def evaluateWindow(window: list, piece: PieceEnum):
-        if window.count(piece) == 3 and window.count(PieceEnum.EMPTY) == 1:
+    def evaluate_batch(boards: np.ndarray, piece: PieceEnum) -> np.ndarray:
+        # evaluate() of every (ROWS, COLS) board in `boards`, as int64
+        sums = cell_values(boards, piece) @ LINE_MATRIX
+        # lines without opponent pieces sum to OWN times their own pieces
+        score = 10 * np.count_nonzero(sums == 3 * OWN, axis=1).astype(np.int64)
+        score += 5 * np.count_nonzero(sums == 2 * OWN, axis=1)
+        return np.where((sums == 4 * OWN).any(axis=1), 999_999, score)
+
+    @staticmethod
+    def line_features(window: tuple[PieceEnum, ...], vertical: bool) -> tuple[int, int]:
+        return (
+            CountPiecesHeuristic.evaluateWindow(window, PieceEnum.HUMAN),
+            CountPiecesHeuristic.evaluateWindow(window, PieceEnum.CPU),
+        )
+
+    @staticmethod
+    def evaluate_features(
+        board: ConnectFourBoard, piece: PieceEnum, features: tuple[int, ...]
+    ) -> int:
+        if board.has_won(piece=piece):
+            return 999_999
+
+        return features[piece - 1]
+
+    @staticmethod
+    def evaluateWindow(window: list | tuple, piece: PieceEnum):
+        return CountPiecesHeuristic._score_window(
+            window.count(piece), window.count(PieceEnum.EMPTY)
+        )
+
+    @staticmethod
+    def _score_window(own: int, empty: int) -> int:
+        if own == 3 and empty == 1:
             return 10  # Encourage completing a winning sequence
-        elif window.count(piece) == 2 and window.count(PieceEnum.EMPTY) == 2:
+        elif own == 2 and empty == 2:
             return 5  # Encourage creating opportunities
         else:
             return 0
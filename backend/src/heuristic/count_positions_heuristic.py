@@ -1,173 +1,170 @@
+import numpy as np
+
 from src.board.connect_four_board import ConnectFourBoard
+from src.board.layout import COLS, ROWS, cell_bit
+from src.board.lines import LINE_MASKS, LINES
+from src.board.threats import has_open_pair, winning_cells
+from src.book import get_opening_book
 from src.types.move import Move
 from src.types.piece_enum import PieceEnum
 
+from .batch_evaluation import LINE_MATRIX, OPPONENT, OWN, cells_matrix, cell_values
 from .heuristic import Heuristic
 
+_CENTER_CELLS = [(row, COLS // 2) for row in range(ROWS)]
+_CORNER_CELLS = [(row, col) for row in (0, ROWS - 1) for col in (0, COLS - 1)]
+# every cell of the outermost rows and columns, counting the corners once
+_SIDE_CELLS = [
+    (row, col)
+    for row in range(ROWS)
+    for col in range(COLS)
+    if row in (0, ROWS - 1) or col in (0, COLS - 1)
+]
+_CENTER_MASK, _CORNER_MASK, _SIDE_MASK = (
+    sum(1 << cell_bit(row, col) for row, col in cells)
+    for cells in (_CENTER_CELLS, _CORNER_CELLS, _SIDE_CELLS)
+)
+# (inner, outer) masks of the lines a double-sided win can be built on
+_OPEN_ENDED_LINES = tuple(
+    (line.inner_mask, line.outer_mask) for line in LINES if not line.vertical
+)
+
+
+# line sums, then inner and outer sums of the open-ended lines, then the center,
+# corner and side sums, all in one matrix product
+_OPEN_ENDED_CELLS = [line.cells for line in LINES if not line.vertical]
+_BATCH_MATRIX = np.hstack(
+    [
+        LINE_MATRIX,
+        cells_matrix([cells[1:3] for cells in _OPEN_ENDED_CELLS]),
+        cells_matrix([cells[::3] for cells in _OPEN_ENDED_CELLS]),
+        cells_matrix([_CENTER_CELLS, _CORNER_CELLS, _SIDE_CELLS]),
+    ]
+)
+_INNER_SUMS = slice(len(LINES), len(LINES) + len(_OPEN_ENDED_CELLS))
+_OUTER_SUMS = slice(_INNER_SUMS.stop, _INNER_SUMS.stop + len(_OPEN_ENDED_CELLS))
+
 
 class CountPositionsHeuristic(Heuristic):
     @staticmethod
     def evaluate(board: ConnectFourBoard, piece: PieceEnum) -> float:
+        # every term at once from whole-board bit operations, without visiting
+        # lines; equal to _evaluate_terms
         if board.has_won(piece=piece):
             return 999_999
 
+        own = board.bitboards[piece]
+        mask = board.mask
+        # an open three is a line with one empty cell left to win with
+        open_three = winning_cells(own, mask) != 0
+        score = 0
+        score += 4 * (own & _CENTER_MASK).bit_count()
+        score += 1 * (own & _CORNER_MASK).bit_count()
+        score += 0.5 * (own & _SIDE_MASK).bit_count()
+        score += -1000 if has_open_pair(own ^ mask, mask) else 0
+        score += 20 * (50 if open_three else 0)
+        score += 1000 * (100 if open_three else 0)
+
+        return score
+
+    @staticmethod
+    def _evaluate_terms(board: ConnectFourBoard, piece: PieceEnum) -> float:
+        # the heuristic as the sum of its separately computed terms
+        if board.has_won(piece=piece):
+            return 999_999
+
+        return CountPositionsHeuristic._score(
+            board,
+            piece,
+            CountPositionsHeuristic._check_double_sided_win(board, piece),
+            CountPositionsHeuristic._check_blocking_move(board, piece),
+            CountPositionsHeuristic._check_winning_move(board, piece),
+        )
+
+    @staticmethod
+    def evaluate_batch(boards: np.ndarray, piece: PieceEnum) -> np.ndarray:
+        # evaluate() of every (ROWS, COLS) board in `boards`, as float64
+        sums = cell_values(boards, piece) @ _BATCH_MATRIX
+        lines = sums[:, : len(LINES)]
+        open_three = (lines == 3 * OWN).any(axis=1)
+        double_sided = (
+            (sums[:, _INNER_SUMS] == 2 * OPPONENT) & (sums[:, _OUTER_SUMS] == 0)
+        ).any(axis=1)
+        center, corner, side = (sums[:, -3:] % OPPONENT).astype(np.int64).T
+
+        # every term is a multiple of 0.5, so the sums are exact in any order
+        score = 4.0 * center
+        score += 1 * corner
+        score += 0.5 * side
+        score += np.where(double_sided, -1000, 0)
+        score += np.where(open_three, 20 * 50 + 1000 * 100, 0)
+        return np.where((lines == 4 * OWN).any(axis=1), 999_999.0, score)
+
+    @staticmethod
+    def _score(
+        board: ConnectFourBoard,
+        piece: PieceEnum,
+        double_sided_win: int,
+        blocking_move: int,
+        winning_move: int,
+    ) -> float:
         score = 0
         score += 4 * CountPositionsHeuristic._evaluate_center_control(board, piece)
         score += 1 * CountPositionsHeuristic._evaluate_corner_control(board, piece)
         score += 0.5 * CountPositionsHeuristic._evaluate_side_control(board, piece)
-        score += CountPositionsHeuristic._check_double_sided_win(board, piece)
-        score += 20 * CountPositionsHeuristic._check_blocking_move(board, piece)
-        score += 1000 * CountPositionsHeuristic._check_winning_move(board, piece)
+        score += double_sided_win
+        score += 20 * blocking_move
+        score += 1000 * winning_move
 
         return score
 
     @staticmethod
     def first_move() -> Move:
-        return Move(col=3, row=5)
+        return get_opening_book("positions").first_move()
 
     @staticmethod
     def _evaluate_center_control(board: ConnectFourBoard, piece: PieceEnum):
-        center_col = board.cols // 2
-        center_count = 0
-
-        for row in range(board.rows):
-            if board.state[row][center_col] == piece:
-                center_count += 1
-
-        return center_count
+        return (board.bitboards[piece] & _CENTER_MASK).bit_count()
 
     @staticmethod
     def _evaluate_corner_control(board: ConnectFourBoard, piece: PieceEnum):
-        corner_count = 0
-
-        if board.state[0][0] == piece:
-            corner_count += 1
-        if board.state[0][board.cols - 1] == piece:
-            corner_count += 1
-        if board.state[board.rows - 1][0] == piece:
-            corner_count += 1
-        if board.state[board.rows - 1][board.cols - 1] == piece:
-            corner_count += 1
-
-        return corner_count
+        return (board.bitboards[piece] & _CORNER_MASK).bit_count()
 
     @staticmethod
     def _evaluate_side_control(board: ConnectFourBoard, piece: PieceEnum):
-        side_count = 0
-
-        for row in range(board.rows):
-            if board.state[row][0] == piece:
-                side_count += 1
-            if board.state[row][board.cols - 1] == piece:
-                side_count += 1
-
-        for col in range(1, board.cols - 1):
-            if board.state[0][col] == piece:
-                side_count += 1
-            if board.state[board.rows - 1][col] == piece:
-                side_count += 1
-
-        return side_count
+        return (board.bitboards[piece] & _SIDE_MASK).bit_count()
 
     @staticmethod
     def _check_double_sided_win(board: ConnectFourBoard, piece: PieceEnum):
-        opponent_piece = PieceEnum(3 - piece.value)
-
-        # Check for potential double-sided wins in rows
-        for row in range(board.rows):
-            for col in range(board.cols - 3):
-                window = [board.state[row][col + i] for i in range(4)]
-                if (
-                    window[1] == opponent_piece
-                    and window[2] == opponent_piece
-                    and window.count(PieceEnum.EMPTY) == 2
-                ):
-                    return -1000  # Penalize the opponent for potential double-sided win
-
-        # Check for potential double-sided wins in diagonals (bottom-left to top-right)
-        for row in range(3, board.rows):
-            for col in range(board.cols - 3):
-                window = [board.state[row - i][col + i] for i in range(4)]
-                if (
-                    window[1] == opponent_piece
-                    and window[2] == opponent_piece
-                    and window.count(PieceEnum.EMPTY) == 2
-                ):
-                    return -1000
-
-        # Check for potential double-sided wins in diagonals (top-left to bottom-right)
-        for row in range(board.rows - 3):
-            for col in range(board.cols - 3):
-                window = [board.state[row + i][col + i] for i in range(4)]
-                if (
-                    window[1] == opponent_piece
-                    and window[2] == opponent_piece
-                    and window.count(PieceEnum.EMPTY) == 2
-                ):
-                    return -1000
+        opponent = board.bitboards[3 - piece]
+        occupied = board.mask
+        # two opponent pieces in the middle of a row or diagonal with both ends empty
+        for inner_mask, outer_mask in _OPEN_ENDED_LINES:
+            if opponent & inner_mask == inner_mask and not occupied & outer_mask:
+                return -1000  # Penalize the opponent for potential double-sided win
 
         return 0
 
     @staticmethod
     def _check_blocking_move(board: ConnectFourBoard, piece: PieceEnum):
-        # Check for potential blocking moves in rows
-        for row in range(board.rows):
-            for col in range(board.cols - 3):
-                window = [board.state[row][col + i] for i in range(4)]
-                if window.count(piece) == 3 and window.count(PieceEnum.EMPTY) == 1:
-                    return 50  # Encourage blocking opponent's winning move
-
-        # Check for potential blocking moves in diagonals (bottom-left to top-right)
-        for row in range(3, board.rows):
-            for col in range(board.cols - 3):
-                window = [board.state[row - i][col + i] for i in range(4)]
-                if window.count(piece) == 3 and window.count(PieceEnum.EMPTY) == 1:
-                    return 50
-
-        # Check for potential blocking moves in diagonals (top-left to bottom-right)
-        for row in range(board.rows - 3):
-            for col in range(board.cols - 3):
-                window = [board.state[row + i][col + i] for i in range(4)]
-                if window.count(piece) == 3 and window.count(PieceEnum.EMPTY) == 1:
-                    return 50
-
-        # Check for potential blocking moves in columns
-        for col in range(board.cols):
-            for row in range(board.rows - 3):
-                window = [board.state[row + i][col] for i in range(4)]
-                if window.count(piece) == 3 and window.count(PieceEnum.EMPTY) == 1:
-                    return 50
+        if CountPositionsHeuristic._has_open_three(board, piece):
+            return 50  # Encourage blocking opponent's winning move
 
         return 0
 
     @staticmethod
     def _check_winning_move(board: ConnectFourBoard, piece: PieceEnum):
-        # Check for potential winning moves in rows
-        for row in range(board.rows):
-            for col in range(board.cols - 3):
-                window = [board.state[row][col + i] for i in range(4)]
-                if window.count(piece) == 3 and window.count(PieceEnum.EMPTY) == 1:
-                    return 100  # Encourage making winning move
-
-        # Check for potential winning moves in diagonals (bottom-left to top-right)
-        for row in range(3, board.rows):
-            for col in range(board.cols - 3):
-                window = [board.state[row - i][col + i] for i in range(4)]
-                if window.count(piece) == 3 and window.count(PieceEnum.EMPTY) == 1:
-                    return 100
-
-        # Check for potential winning moves in diagonals (top-left to bottom-right)
-        for row in range(board.rows - 3):
-            for col in range(board.cols - 3):
-                window = [board.state[row + i][col + i] for i in range(4)]
-                if window.count(piece) == 3 and window.count(PieceEnum.EMPTY) == 1:
-                    return 100
-
-        # Check for potential winning moves in columns
-        for col in range(board.cols):
-            for row in range(board.rows - 3):
-                window = [board.state[row + i][col] for i in range(4)]
-                if window.count(piece) == 3 and window.count(PieceEnum.EMPTY) == 1:
-                    return 100
+        if CountPositionsHeuristic._has_open_three(board, piece):
+            return 100  # Encourage making winning move
 
         return 0
+
+    @staticmethod
+    def _has_open_three(board: ConnectFourBoard, piece: PieceEnum) -> bool:
+        # a line with three of the pieces and an empty fourth cell
+        own = board.bitboards[piece]
+        opponent = board.bitboards[3 - piece]
+        for mask in LINE_MASKS:
+            if not opponent & mask and (own & mask).bit_count() == 3:
+                return True
+        return False
@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Protocol, runtime_checkable
 
 from src.board.connect_four_board import ConnectFourBoard
 from src.types.move import Move
@@ -11,3 +11,20 @@ class Heuristic(Protocol):
 
     @staticmethod
     def first_move() -> Move: ...
+
+
+# Heuristics built from per-line terms can also be kept up to date move by move,
+# see IncrementalEvaluator.
+@runtime_checkable
+class IncrementalHeuristic(Heuristic, Protocol):
+    # non-negative terms of one 4-cell line, summed over all lines of the board
+    @staticmethod
+    def line_features(
+        window: tuple[PieceEnum, ...], vertical: bool
+    ) -> tuple[int, ...]: ...
+
+    # must equal evaluate(board, piece) given the summed line features
+    @staticmethod
+    def evaluate_features(
+        board: ConnectFourBoard, piece: PieceEnum, features: tuple[int, ...]
+    ) -> float: ...
@@ -0,0 +1,134 @@
+from functools import cache
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.board.layout import COLS, COLUMN_BITS, cell_bit
+from src.board.lines import LINES
+from src.types.piece_enum import PieceEnum
+
+from .heuristic import IncrementalHeuristic
+
+# The line features are summed in one int, FEATURE_BITS bits per feature, so a
+# move updates every sum at once. A line's pattern is sum(piece * 3**i) over its
+# cells.
+FEATURE_BITS = 16
+_FEATURE_MASK = (1 << FEATURE_BITS) - 1
+_PATTERNS = 3**4
+
+# (line index, pattern weight) of the lines through each bit
+_CELL_LINES = tuple(
+    tuple(
+        (index, 3**position)
+        for index, line in enumerate(LINES)
+        for position, (row, col) in enumerate(line.cells)
+        if cell_bit(row, col) == bit
+    )
+    for bit in range(COLS * COLUMN_BITS)
+)
+
+
+def _window(pattern: int) -> tuple[PieceEnum, ...]:
+    return tuple(PieceEnum(pattern // 3**i % 3) for i in range(4))
+
+
+@cache
+def _feature_tables(
+    heuristic_cls: type[IncrementalHeuristic],
+) -> tuple[int, tuple[tuple[int, ...], ...]]:
+    # the number of features, and the packed features of every pattern of every line
+    sizes = set()
+    tables = []
+    for line in LINES:
+        table = []
+        for pattern in range(_PATTERNS):
+            features = heuristic_cls.line_features(_window(pattern), line.vertical)
+            sizes.add(len(features))
+            table.append(
+                sum(value << FEATURE_BITS * i for i, value in enumerate(features))
+            )
+        tables.append(tuple(table))
+    return sizes.pop(), tuple(tables)
+
+
+class IncrementalEvaluator:
+    # compare every score with a full evaluation; slow, for tests
+    check = False
+
+    def __init__(self, heuristic: IncrementalHeuristic, board: ConnectFourBoard):
+        self.heuristic = heuristic
+        self._size, self._tables = _feature_tables(type(heuristic))
+        self._patterns = [0] * len(LINES)
+        self._total = sum(table[0] for table in self._tables)
+        for piece in (PieceEnum.HUMAN, PieceEnum.CPU):
+            bitboard = board.bitboards[piece]
+            while bitboard:
+                self.on_move((bitboard & -bitboard).bit_length() - 1, piece)
+                bitboard &= bitboard - 1
+        # the board's moves past the stones counted above, as far as they are played
+        self._root = len(board.moves)
+        self._bits: list[int] = []
+        self._pieces: list[PieceEnum] = []
+
+    def __getstate__(self) -> dict:
+        # copies sent to pool workers look the tables up again
+        state = self.__dict__.copy()
+        del state["_tables"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._tables = _feature_tables(type(self.heuristic))[1]
+
+    def on_move(self, bit: int, piece: PieceEnum) -> None:
+        self._update(bit, piece)
+
+    def on_undo(self, bit: int, piece: PieceEnum) -> None:
+        self._update(bit, -piece)
+
+    def _update(self, bit: int, step: int) -> None:
+        tables = self._tables
+        patterns = self._patterns
+        total = self._total
+        for index, weight in _CELL_LINES[bit]:
+            old = patterns[index]
+            new = old + step * weight
+            patterns[index] = new
+            table = tables[index]
+            total += table[new] - table[old]
+        self._total = total
+
+    @property
+    def features(self) -> tuple[int, ...]:
+        total = self._total
+        return tuple(
+            total >> FEATURE_BITS * i & _FEATURE_MASK for i in range(self._size)
+        )
+
+    def evaluate(self, board: ConnectFourBoard, piece: PieceEnum) -> float:
+        self._sync(board)
+        score = self.heuristic.evaluate_features(board, piece, self.features)
+        if self.check:
+            expected = self.heuristic.evaluate(board, piece)
+            if score != expected:
+                raise RuntimeError(
+                    f"Incremental score {score} differs from {expected} for\n{board}"
+                )
+        return score
+
+    def _sync(self, board: ConnectFourBoard) -> None:
+        # Undo the moves the board took back since the last call and play the new
+        # ones. Pieces alternate within a search, so equal bits mean equal moves.
+        moves = board.moves
+        bits, pieces = self._bits, self._pieces
+        start = self._root
+        common = min(len(bits), len(moves) - start)
+        while bits[:common] != moves[start : start + common]:
+            common -= 1
+
+        while len(bits) > common:
+            self.on_undo(bits.pop(), pieces.pop())
+        human = board.bitboards[PieceEnum.HUMAN]
+        for bit in moves[start + len(bits) :]:
+            piece = PieceEnum.HUMAN if human >> bit & 1 else PieceEnum.CPU
+            self.on_move(bit, piece)
+            bits.append(bit)
+            pieces.append(piece)
@@ -0,0 +1,42 @@
+from functools import cache
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.book import get_opening_book
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+from .heuristic import Heuristic
+from .ntuple_tables import (
+    PATTERN_SHIFT,
+    TABLES_PATH,
+    pattern_tables,
+    read_ntuple_tables,
+)
+
+
+# loaded once per process, on first use
+@cache
+def load_pattern_tables() -> tuple[tuple[int, dict[int, int]], ...]:
+    return pattern_tables(*read_ntuple_tables(TABLES_PATH))
+
+
+class NTupleHeuristic(Heuristic):
+    def __init__(self):
+        load_pattern_tables()
+
+    @staticmethod
+    def evaluate(board: ConnectFourBoard, piece: PieceEnum) -> float:
+        # the sum of one learned weight per tuple, looked up by the tuple's contents
+        if board.has_won(piece=piece):
+            return 999_999
+
+        # both sides in one int, so each tuple costs one AND and one lookup
+        pattern = board.bitboards[piece] << PATTERN_SHIFT | board.bitboards[3 - piece]
+        score = 0
+        for mask, table in load_pattern_tables():
+            score += table[pattern & mask]
+        return score
+
+    @staticmethod
+    def first_move() -> Move:
+        return get_opening_book("ntuple").first_move()
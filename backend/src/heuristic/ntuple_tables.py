@@ -0,0 +1,104 @@
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from src.board.layout import COLS, COLUMN_BITS, ROWS, cell_bit
+
+TABLES_PATH = Path(__file__).resolve().parents[2] / "data" / "ntuple.tables"
+
+# magic, format version, tuple count; every tuple then follows as its cell
+# count, its cell bits and one int16 weight per pattern
+_HEADER = struct.Struct("<6sHB")
+_MAGIC = b"C4NTUP"
+_VERSION = 1
+_WEIGHT = np.dtype("<i2")
+
+# own bits go above every bit of the layout, opponent bits stay in place
+PATTERN_SHIFT = COLS * COLUMN_BITS
+
+
+def _build_tuples() -> tuple[tuple[int, ...], ...]:
+    rows = [[(row, col) for col in range(COLS)] for row in range(ROWS)]
+    cols = [[(row, col) for row in range(ROWS)] for col in range(COLS)]
+    # cells with the same col - row lie on one ↘ diagonal, with the same
+    # col + row on one ↗ diagonal
+    diagonals = []
+    for sign in (-1, 1):
+        for value in range(-ROWS, COLS + ROWS):
+            cells = [
+                (row, col)
+                for row in range(ROWS)
+                for col in range(COLS)
+                if col + sign * row == value
+            ]
+            if len(cells) >= 4:
+                diagonals.append(cells)
+    return tuple(
+        tuple(cell_bit(row, col) for row, col in cells)
+        for cells in rows + cols + diagonals
+    )
+
+
+# every full row, column and diagonal long enough to hold a 4-in-a-row
+TUPLES = _build_tuples()
+
+
+# base-3 index of the pattern on `cells`: 0 empty, 1 own, 2 opponent, first
+# cell least significant
+def pattern_index(own: int, opponent: int, cells: tuple[int, ...]) -> int:
+    index = 0
+    for bit in reversed(cells):
+        index = 3 * index + (own >> bit & 1) + 2 * (opponent >> bit & 1)
+    return index
+
+
+def write_ntuple_tables(
+    path: Path, tuples: tuple[tuple[int, ...], ...], weights: list[np.ndarray]
+) -> None:
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, len(tuples)))
+        for cells, table in zip(tuples, weights):
+            if len(table) != 3 ** len(cells):
+                raise ValueError(f"Expected {3 ** len(cells)} weights for {cells}")
+            file.write(bytes([len(cells), *cells]))
+            file.write(np.asarray(table).astype(_WEIGHT).tobytes())
+
+
+def read_ntuple_tables(
+    path: Path,
+) -> tuple[tuple[tuple[int, ...], ...], list[np.ndarray]]:
+    data = path.read_bytes()
+    magic, version, count = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{path} is not a version {_VERSION} n-tuple table file")
+
+    tuples, weights = [], []
+    offset = _HEADER.size
+    for _ in range(count):
+        size = data[offset]
+        cells = tuple(data[offset + 1 : offset + 1 + size])
+        offset += 1 + size
+        table = np.frombuffer(data, _WEIGHT, 3**size, offset)
+        offset += table.nbytes
+        tuples.append(cells)
+        weights.append(table)
+    return tuple(tuples), weights
+
+
+# Each table as a dict from the tuple's own bits, shifted by PATTERN_SHIFT,
+# and opponent bits to its weight, with the mask selecting both from a
+# packed position, so evaluating needs no base-3 arithmetic.
+def pattern_tables(
+    tuples: tuple[tuple[int, ...], ...], weights: list[np.ndarray]
+) -> tuple[tuple[int, dict[int, int]], ...]:
+    tables = []
+    for cells, table in zip(tuples, weights):
+        digits = np.arange(3 ** len(cells))[:, None] // 3 ** np.arange(len(cells)) % 3
+        bits = np.array([1 << bit for bit in cells], dtype=np.int64)
+        own = ((digits == 1) @ bits).tolist()
+        opponent = ((digits == 2) @ bits).tolist()
+        keys = [o << PATTERN_SHIFT | p for o, p in zip(own, opponent)]
+        mask = sum(bits.tolist())
+        tables.append((mask << PATTERN_SHIFT | mask, dict(zip(keys, table.tolist()))))
+    return tuple(tables)
@@ -1,4 +1,13 @@
+from .mcts_solver import MCTSSolver
 from .minimax_alpha_beta_solver import MinimaxAlphaBetaPruningSolver
+from .negamax_solver import NegamaxSolver
+from .perfect_solver import PerfectSolver
 from .solver import Solver
 
-__all__ = ["Solver", "MinimaxAlphaBetaPruningSolver"]
+__all__ = [
+    "Solver",
+    "MCTSSolver",
+    "MinimaxAlphaBetaPruningSolver",
+    "NegamaxSolver",
+    "PerfectSolver",
+]
@@ -0,0 +1,45 @@
+from src.board.connect_four_board import ConnectFourBoard
+from src.board.layout import COLS
+from src.types.piece_enum import PieceEnum
+
+from .move_ordering import CENTER_FIRST
+
+
+# Scores every column for `piece` by solving the position after it for the
+# opponent, sharing the solver's time budget between the columns. Columns that
+# win right away score `win_score`; full columns, and columns whose search ran
+# out of time before finding a score, score None.
+def score_columns(
+    solver, board: ConnectFourBoard, piece: PieceEnum, win_score: float
+) -> list[float | None]:
+    scores: list[float | None] = [None] * COLS
+    moves = board.get_possible_moves()
+    opponent = PieceEnum(3 - piece.value)
+    time_budget_ms = solver.time_budget_ms
+    if time_budget_ms is not None and moves:
+        solver.time_budget_ms = time_budget_ms / len(moves)
+    try:
+        for move in moves:
+            if board.is_winning_move(move, piece):
+                scores[move.col] = win_score
+                continue
+
+            board.make_move(move=move, piece=piece)
+            try:
+                if board.is_full():
+                    scores[move.col] = 0
+                else:
+                    solver.solve(board, opponent)
+                    if solver.score is not None:
+                        scores[move.col] = -solver.score
+            finally:
+                board.undo_move()
+    finally:
+        solver.time_budget_ms = time_budget_ms
+    return scores
+
+
+# the column scoring highest, the one nearest the center on ties
+def best_column(scores: list[float | None]) -> int | None:
+    scored = [col for col in CENTER_FIRST if scores[col] is not None]
+    return max(scored, key=lambda col: scores[col], default=None)
@@ -0,0 +1,20 @@
+from time import perf_counter
+from typing import Protocol
+
+# how many nodes are searched between two deadline checks
+DEADLINE_CHECK_INTERVAL = 64
+
+
+# e.g. a threading.Event, or a multiprocessing one set by another process
+class StopEvent(Protocol):
+    def is_set(self) -> bool: ...
+
+
+def out_of_time(deadline: float, stop_event: StopEvent | None) -> bool:
+    return perf_counter() >= deadline or (
+        stop_event is not None and stop_event.is_set()
+    )
+
+
+class SearchTimeout(Exception):
+    pass
@@ -0,0 +1,251 @@
+import logging
+from math import log, sqrt
+from time import perf_counter
+
+import numpy as np
+
+from src.board.connect_four_board import ConnectFourBoard, bit_move
+from src.board.layout import BOARD_MASK, COLS, COLUMN_BITS
+from src.board.threats import playable_cells, winning_cells
+from src.board.vectorized import COLUMN_MASKS, has_four, random_columns
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+from src.types.search_info import SearchInfo
+
+from .move_ordering import CENTER_FIRST
+from .solver import Solver
+
+# column masks, the center column last
+_EXPANSION_ORDER = [int(COLUMN_MASKS[col]) for col in reversed(CENTER_FIRST)]
+
+
+# Plays random games from every (position, mask), a bitboard of the stones of
+# the side to move and one of all stones, all at once, and returns 1 where the
+# side to move wins, -1 where it loses and 0 for a draw. Tactical playouts
+# take a win, or else block a threat, whenever they can.
+def play_out(
+    positions: np.ndarray,
+    masks: np.ndarray,
+    rng: np.random.Generator,
+    tactical: bool = True,
+) -> np.ndarray:
+    results = np.zeros(len(masks), dtype=np.int64)
+    over = masks == BOARD_MASK
+    result = 1
+    while not over.all():
+        choices = playable_cells(masks)
+        if tactical:
+            wins = winning_cells(positions, masks) & choices
+            blocks = winning_cells(positions ^ masks, masks) & choices
+            choices = np.where(wins != 0, wins, np.where(blocks != 0, blocks, choices))
+        cols = random_columns(rng, (choices[:, None] & COLUMN_MASKS) != 0)
+        moves = np.where(over, np.uint64(0), choices & COLUMN_MASKS[cols])
+
+        stones = positions | moves
+        won = ~over & has_four(stones)
+        results[won] = result
+        masks = masks | moves
+        positions = stones ^ masks
+        over |= won | (masks == BOARD_MASK)
+        result = -result
+    return results
+
+
+class _Node:
+    __slots__ = (
+        "position",
+        "mask",
+        "move",
+        "parent",
+        "children",
+        "untried",
+        "visits",
+        "value",
+        "result",
+    )
+
+    def __init__(self, position: int, mask: int, move: int, parent: "_Node | None"):
+        # the stones of the side to move, all stones, and the bit played to get here
+        self.position = position
+        self.mask = mask
+        self.move = move
+        self.parent = parent
+        self.children: list[_Node] = []
+        playable = playable_cells(mask)
+        # moves not expanded yet, popped center first
+        self.untried = [
+            playable & column for column in _EXPANSION_ORDER if playable & column
+        ]
+        # summed playout results for the side that moved into the node
+        self.visits = 0
+        self.value = 0.0
+        # the final result for that side if the game is over here, else None
+        self.result: int | None = None
+        if parent is not None and winning_cells(parent.position, parent.mask) & move:
+            self.result = 1
+        elif mask == BOARD_MASK:
+            self.result = 0
+
+
+# Monte Carlo tree search with UCT. Leaves are selected in batches so that the
+# playouts of a whole batch run in one NumPy loop; every selection counts as
+# lost until its playouts are in (a virtual loss), which spreads a batch over
+# different leaves.
+class MCTSSolver(Solver):
+    def __init__(
+        self,
+        iterations: int | None = 2_000,
+        time_budget_ms: float | None = None,
+        exploration: float = 1.0,
+        leaves_per_batch: int = 16,
+        playouts_per_leaf: int = 8,
+        tactical: bool = True,
+        seed: int | None = None,
+    ):
+        if iterations is None and time_budget_ms is None:
+            raise ValueError("MCTSSolver needs an iteration or a time budget.")
+
+        # leaves to expand and time to search for; the first one spent ends the search
+        self.iterations = iterations
+        self.time_budget_ms = time_budget_ms
+        self.exploration = exploration
+        self.leaves_per_batch = leaves_per_batch
+        self.playouts_per_leaf = playouts_per_leaf
+        self.tactical = tactical
+        self.rng = np.random.default_rng(seed)
+        self.nodes = 0
+        self.search_info: SearchInfo | None = None
+        # the tree of the last search, whose subtrees the next search starts from
+        self._root: _Node | None = None
+
+    def solve(self, board: ConnectFourBoard, piece: PieceEnum) -> Move | None:
+        if piece not in [PieceEnum.HUMAN, PieceEnum.CPU]:
+            raise ValueError(f"Invalid piece for {type(self).__name__}.")
+
+        self.nodes = 0
+        self.search_info = None
+        if board.is_full():
+            return None
+
+        position, mask = board.bitboards[piece], board.mask
+        wins = winning_cells(position, mask) & playable_cells(mask)
+        if wins:
+            return bit_move((wins & -wins).bit_length() - 1)
+
+        deadline = (
+            perf_counter() + self.time_budget_ms / 1000
+            if self.time_budget_ms is not None
+            else None
+        )
+        root = self._reuse_root(position, mask)
+        iterations = depth = 0
+        while (self.iterations is None or iterations < self.iterations) and (
+            deadline is None or perf_counter() < deadline
+        ):
+            batch = self.leaves_per_batch
+            if self.iterations is not None:
+                batch = min(batch, self.iterations - iterations)
+            leaves = [self._select(root) for _ in range(batch)]
+            self._back_up([node for node, _ in leaves])
+            iterations += batch
+            depth = max(depth, *(plies for _, plies in leaves))
+            if self.stop_event is not None and self.stop_event.is_set():
+                break
+
+        self._root = root
+        best = max(root.children, key=lambda child: child.visits)
+        best_move = bit_move(best.move.bit_length() - 1)
+        self.search_info = SearchInfo(mode="mcts", depth=depth, nodes=self.nodes)
+        logging.info(
+            f"MCTS played {best_move} after {iterations} iterations and "
+            f"{self.nodes} playouts, value {best.value / best.visits:.2f}"
+        )
+        return best_move
+
+    def analyze(
+        self, board: ConnectFourBoard, piece: PieceEnum
+    ) -> tuple[Move | None, list[float | None]]:
+        # columns score the mean playout result of their node, from -1 to 1
+        scores: list[float | None] = [None] * COLS
+        best_move = self.solve(board, piece)
+        if best_move is None:
+            return None, scores
+        if self.search_info is None:
+            # played a win without searching
+            for move in board.get_possible_moves():
+                if board.is_winning_move(move, piece):
+                    scores[move.col] = 1.0
+            return best_move, scores
+
+        for child in self._root.children:
+            col = (child.move.bit_length() - 1) // COLUMN_BITS
+            scores[col] = child.value / child.visits
+        return best_move, scores
+
+    def first_move(self) -> Move:
+        return bit_move(CENTER_FIRST[0] * COLUMN_BITS)
+
+    # the node of the last tree for (position, mask), the same position or one
+    # two plies further, so that its playouts count again; else a new root
+    def _reuse_root(self, position: int, mask: int) -> _Node:
+        if self._root is not None:
+            nodes = [self._root]
+            nodes += [node for child in self._root.children for node in child.children]
+            for node in nodes:
+                if node.position == position and node.mask == mask:
+                    node.parent = None
+                    return node
+        return _Node(position, mask, 0, None)
+
+    # walks down by UCT to a new or final node, adding a virtual loss to every
+    # node on the way; returns the node and its depth
+    def _select(self, root: _Node) -> tuple[_Node, int]:
+        weight = self.playouts_per_leaf
+        node, plies = root, 0
+        while True:
+            node.visits += weight
+            node.value -= weight
+            if node.result is not None:
+                return node, plies
+
+            if node.untried:
+                move = node.untried.pop()
+                child = _Node(node.position ^ node.mask, node.mask | move, move, node)
+                child.visits, child.value = weight, -weight
+                node.children.append(child)
+                return child, plies + 1
+
+            scale = self.exploration * sqrt(log(node.visits))
+            node = max(
+                node.children,
+                key=lambda child: (child.value + scale * sqrt(child.visits))
+                / child.visits,
+            )
+            plies += 1
+
+    # replaces the virtual losses on the way to every leaf by its playout results
+    def _back_up(self, leaves: list[_Node]) -> None:
+        weight = self.playouts_per_leaf
+        open_leaves = [node for node in leaves if node.result is None]
+        totals = {}
+        if open_leaves:
+            results = play_out(
+                np.repeat(
+                    np.array([n.position for n in open_leaves], np.uint64), weight
+                ),
+                np.repeat(np.array([n.mask for n in open_leaves], np.uint64), weight),
+                self.rng,
+                self.tactical,
+            )
+            self.nodes += len(results)
+            # the playouts score for the side to move in the leaf, which did not
+            # move into it
+            sums = -results.reshape(-1, weight).sum(axis=1)
+            totals = dict(zip(map(id, open_leaves), sums.tolist()))
+
+        for node in leaves:
+            total = totals[id(node)] if node.result is None else weight * node.result
+            while node is not None:
+                node.value += weight + total
+                total = -total
+                node = node.parent
@@ -1,31 +1,533 @@
+import copy
+import logging
+import multiprocessing
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
 from math import inf
+from time import perf_counter
 
 from src.board.connect_four_board import ConnectFourBoard
-from src.heuristic.heuristic import Heuristic
+from src.book.opening_book import OpeningBook
+from src.board.layout import COLS, COLUMN_BITS, ROWS, cell_bit
+from src.board.zobrist import SIDE_TO_MOVE_KEYS
+from src.heuristic.cached_heuristic import CachedHeuristic
+from src.heuristic.heuristic import Heuristic, IncrementalHeuristic
+from src.heuristic.incremental_evaluator import IncrementalEvaluator
 from src.types.move import Move
 from src.types.piece_enum import PieceEnum
+from src.types.search_info import SearchInfo
+from src.types.search_progress import SearchProgress
 
+from .analysis import best_column, score_columns
+from .deadline import DEADLINE_CHECK_INTERVAL, SearchTimeout, StopEvent, out_of_time
+from .move_ordering import MoveOrdering
+from .perfect_solver import PerfectSolver
 from .solver import Solver
+from .transposition_table import Bound, TranspositionTable
+
+# values are stored from the max player's point of view, so min nodes get their own keys
+_MIN_PLAYER_KEY = 0x9E3779B97F4A7C15
+
+# column orders with one column (e.g. from the principal variation) searched first,
+# used when no MoveOrdering is configured
+_COLUMNS = tuple(range(COLS))
+_FIRST_COLUMN_ORDERS = tuple(
+    (first,) + tuple(col for col in _COLUMNS if col != first) for first in _COLUMNS
+)
+
+# root moves searched in parallel get a window this much wider than the best score
+# so far, so a move tying with it gets an exact score and ties break as in a serial search
+_PARALLEL_ALPHA_MARGIN = 1e-6
+
+# how often a parallel search checks its stop_event while its root moves run
+_STOP_POLL_S = 0.01
+
+# one process pool per worker count, shared by all solvers of this process, with
+# an event stopping the root moves its workers search
+_process_pools: dict[int, tuple[ProcessPoolExecutor, StopEvent]] = {}
+
+# inside a pool worker: the transposition table of the search it last helped with,
+# reused by the next root moves of that same search
+_worker_table: tuple[str, TranspositionTable | None] | None = None
+# inside a pool worker: the stop event of its pool
+_worker_stop: StopEvent | None = None
+
+
+def _init_pool_worker(stop: StopEvent) -> None:
+    global _worker_stop
+    _worker_stop = stop
+
+
+def _get_process_pool(workers: int) -> tuple[ProcessPoolExecutor, StopEvent]:
+    if workers not in _process_pools:
+        # forking a threaded server can deadlock, so start fresh interpreters
+        context = multiprocessing.get_context("spawn")
+        stop = context.Event()
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_pool_worker,
+            initargs=(stop,),
+        )
+        _process_pools[workers] = (pool, stop)
+    return _process_pools[workers]
+
+
+def shutdown_process_pools() -> None:
+    for pool, _ in _process_pools.values():
+        pool.shutdown(cancel_futures=True)
+    _process_pools.clear()
+
+
+def _search_root_move(
+    solver: "MinimaxAlphaBetaPruningSolver",
+    board: ConnectFourBoard,
+    piece: PieceEnum,
+    move: Move,
+    depth: int,
+    alpha: float,
+    time_left: float | None,
+) -> tuple[float | None, int]:
+    # runs in a pool worker; the score is None when the deadline passed
+    global _worker_table
+    if _worker_table is None or _worker_table[0] != solver._search_id:
+        _worker_table = (
+            solver._search_id,
+            (
+                TranspositionTable(size_mb=solver.tt_size_mb)
+                if solver.tt_size_mb
+                else None
+            ),
+        )
+    solver.transposition_table = _worker_table[1]
+    solver.stop_event = _worker_stop
+    solver._deadline = perf_counter() + time_left if time_left is not None else None
+
+    board.make_move(move=move, piece=piece)
+    try:
+        value, _ = solver.minimax_alpha_beta_pruning(
+            board=board,
+            depth=depth - 1,
+            alpha=alpha,
+            beta=inf,
+            max_player=False,
+            piece=PieceEnum(3 - piece.value),
+        )
+    except SearchTimeout:
+        value = None
+    return value, solver.nodes
 
 
 class MinimaxAlphaBetaPruningSolver(Solver):
-    def __init__(self, heuristic: Heuristic, depth: int):
+    # search depth 1, 2, ... even without a time budget
+    always_deepen = False
+
+    def __init__(
+        self,
+        heuristic: Heuristic,
+        depth: int,
+        tt_size_mb: float | None = 4,
+        time_budget_ms: float | None = None,
+        move_ordering: MoveOrdering | None = None,
+        workers: int = 1,
+        opening_book: OpeningBook | None = None,
+        endgame_empty_cells: int | None = None,
+        incremental_evaluation: bool = True,
+    ):
         self.depth = depth
         self.heuristic = heuristic
+        self.tt_size_mb = tt_size_mb
+        self.transposition_table = (
+            TranspositionTable(size_mb=tt_size_mb) if tt_size_mb else None
+        )
+        # with a time budget the search deepens iteratively, up to `depth` plies
+        self.time_budget_ms = time_budget_ms
+        # None keeps the plain left-to-right column order
+        self.move_ordering = move_ordering
+        # with more than one worker the root moves are searched in a process pool
+        self.workers = workers
+        # precomputed moves for the first plies, which must match the heuristic
+        self.opening_book = opening_book
+        # with fewer empty cells than this the position is solved exactly instead,
+        # falling back to the heuristic search if that runs out of time
+        self.endgame_empty_cells = endgame_empty_cells
+        self._endgame_solver: PerfectSolver | None = None
+        # heuristics built from line terms keep a running score instead of
+        # rescanning the board at every leaf
+        self.incremental_evaluation = incremental_evaluation
+        self._evaluator: IncrementalEvaluator | None = None
+        # a CachedHeuristic is looked up first, and filled by the running score
+        self._eval_cache: CachedHeuristic | None = None
+        self._leaf_heuristic = heuristic
+        self.nodes = 0
+        self.completed_depth = 0
+        self.score: float | None = None
+        self.principal_variation: list[Move] = []
+        self._root_ply = 0
+        self._pv_bits: list[int] = []
+        self._deadline: float | None = None
+        self._search_id = ""
 
     def solve(self, board: ConnectFourBoard, piece: PieceEnum) -> Move | None:
         if piece not in [PieceEnum.HUMAN, PieceEnum.CPU]:
-            raise ValueError("Invalid piece for MinimaxAlphaBetaPruningSolver.")
+            raise ValueError(f"Invalid piece for {type(self).__name__}.")
+
+        start = perf_counter()
+        self.nodes = 0
+        self.evaluation = None
+        self.search_info = None
+        if self.opening_book is not None:
+            entry = self.opening_book.lookup(board, piece)
+            if entry is not None:
+                best_move = board.get_move_from_col(entry.col)
+                self.score = entry.value
+                self.completed_depth = self.opening_book.depth
+                self.principal_variation = [best_move]
+                self.search_info = SearchInfo(mode="book")
+                logging.info(f"Opening book move: {best_move}")
+                return best_move
+
+        empty_cells = ROWS * COLS - board.mask.bit_count()
+        if (
+            self.endgame_empty_cells is not None
+            and 0 < empty_cells < self.endgame_empty_cells
+        ):
+            best_move = self._solve_endgame(board, piece)
+            if best_move is not None:
+                return best_move
+
+        self._root_ply = len(board.moves)
+        if isinstance(self.heuristic, CachedHeuristic):
+            self._eval_cache = self.heuristic
+            self._leaf_heuristic = self.heuristic.heuristic
+        else:
+            self._eval_cache = None
+            self._leaf_heuristic = self.heuristic
+        self._evaluator = (
+            IncrementalEvaluator(self._leaf_heuristic, board)
+            if self.incremental_evaluation
+            and isinstance(self._leaf_heuristic, IncrementalHeuristic)
+            else None
+        )
+        self._search_id = uuid.uuid4().hex
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+        if self.time_budget_ms is None and not self.always_deepen:
+            # no deadline, but stop_event can still end the search, without a move
+            self._deadline = inf
+            try:
+                self.score, best_move = self._search_root(board, piece, self.depth)
+            except SearchTimeout:
+                while len(board.moves) > self._root_ply:
+                    board.undo_move()
+                logging.info(f"Search stopped after {self.nodes} nodes")
+                return None
+            finally:
+                self._deadline = None
+            self.completed_depth = self.depth
+        else:
+            best_move = self._iterative_deepening(board, piece, start)
+
+        self.search_info = SearchInfo(
+            mode="heuristic", depth=self.completed_depth, nodes=self.nodes
+        )
+        logging.info(
+            f"Searched {self.nodes} nodes at depth {self.completed_depth}"
+            + (
+                f", transposition table: {self.transposition_table.stats()}"
+                if self.transposition_table
+                else ""
+            )
+            + (
+                f", evaluation cache: {self._eval_cache.stats()}"
+                if self._eval_cache
+                else ""
+            )
+        )
+        return best_move
+
+    def analyze(
+        self, board: ConnectFourBoard, piece: PieceEnum
+    ) -> tuple[Move | None, list[float | None]]:
+        scores = score_columns(self, board, piece, win_score=999_999)
+        col = best_column(scores)
+        return (board.get_move_from_col(col) if col is not None else None), scores
+
+    def _solve_endgame(self, board: ConnectFourBoard, piece: PieceEnum) -> Move | None:
+        # the exact solver's table holds exact bounds, so it is kept between moves
+        if self._endgame_solver is None:
+            self._endgame_solver = PerfectSolver(
+                tt_size_mb=self.tt_size_mb or 4, time_budget_ms=self.time_budget_ms
+            )
+        solver = self._endgame_solver
+        solver.stop_event = self.stop_event
+        best_move = solver.solve(board, piece)
+        self.nodes += solver.nodes
+        if solver.evaluation is None:
+            return None
+
+        outcome = solver.evaluation.outcome
+        self.score = (
+            999_999 if outcome == "win" else -999_999 if outcome == "loss" else 0
+        )
+        self.completed_depth = ROWS * COLS - board.mask.bit_count()
+        self.principal_variation = [best_move]
+        self.evaluation = solver.evaluation
+        self.search_info = SearchInfo(
+            mode="exact", depth=self.completed_depth, nodes=self.nodes
+        )
+        return best_move
+
+    def _iterative_deepening(
+        self, board: ConnectFourBoard, piece: PieceEnum, start: float
+    ) -> Move | None:
+        # time spent solving the endgame counts against the budget too; without
+        # a budget only stop_event ends the search
+        deadline = (
+            start + self.time_budget_ms / 1000
+            if self.time_budget_ms is not None
+            else inf
+        )
+        empty_cells = ROWS * COLS - board.mask.bit_count()
+        best_move = None
+        self.completed_depth = 0
+        self.score = None
+        self.principal_variation = []
+        self._pv_bits = []
+
+        try:
+            for depth in range(1, min(self.depth, empty_cells) + 1):
+                # the first iteration always completes so there is a move to play
+                self._deadline = deadline if depth > 1 else None
+                try:
+                    value, move = self._search_root(board, piece, depth, self.score)
+                except SearchTimeout:
+                    while len(board.moves) > self._root_ply:
+                        board.undo_move()
+                    break
+
+                best_move = move
+                self.completed_depth = depth
+                self.score = value
+                self.principal_variation = self._get_principal_variation(
+                    board, piece, move, depth
+                )
+                self._pv_bits = [
+                    cell_bit(pv_move.row, pv_move.col)
+                    for pv_move in self.principal_variation
+                ]
+                if self.on_iteration is not None:
+                    self.on_iteration(
+                        SearchProgress(
+                            depth=depth, move=move, score=value, nodes=self.nodes
+                        )
+                    )
+                if abs(value) >= 999_999 or out_of_time(deadline, self.stop_event):
+                    break
+        finally:
+            self._deadline = None
+            self._pv_bits = []
+
+        return best_move
 
-        _, best_move = self.minimax_alpha_beta_pruning(
+    def _search_root(
+        self,
+        board: ConnectFourBoard,
+        piece: PieceEnum,
+        depth: int,
+        previous_score: float | None = None,
+    ) -> tuple[float, Move | None]:
+        if self.workers > 1 and depth > 1 and not board.is_full():
+            return self._parallel_search_root(board, piece, depth)
+
+        return self.minimax_alpha_beta_pruning(
             board=board,
-            depth=self.depth,
+            depth=depth,
             alpha=-inf,
             beta=inf,
             max_player=True,
             piece=piece,
         )
-        return best_move
+
+    def _parallel_search_root(
+        self, board: ConnectFourBoard, piece: PieceEnum, depth: int
+    ) -> tuple[float, Move | None]:
+        self.nodes += 1
+        table = self.transposition_table
+        key = self._table_key(board, piece, max_player=True)
+        tt_col = -1
+        if table is not None:
+            slot = table.probe(key)
+            if slot >= 0:
+                tt_col = table.moves[slot]
+
+        moves = [
+            move
+            for col in self._column_order(board, piece, tt_col)
+            if (move := board.get_move_from_col(col)) is not None
+        ]
+        # a serial search would return the first winning move it reaches
+        for move in moves:
+            if board.is_winning_move(move=move, piece=piece):
+                return 999_999, move
+
+        # search the first move here to get a bound for all the others
+        board.make_move(move=moves[0], piece=piece)
+        alpha, _ = self.minimax_alpha_beta_pruning(
+            board=board,
+            depth=depth - 1,
+            alpha=-inf,
+            beta=inf,
+            max_player=False,
+            piece=PieceEnum(3 - piece.value),
+        )
+        board.undo_move()
+        scores = [alpha]
+
+        # the other moves go to the pool, each with the best score known when it starts
+        worker = copy.copy(self)
+        worker.transposition_table = None
+        worker.move_ordering = copy.deepcopy(self.move_ordering)
+        worker.workers = 1
+        worker._endgame_solver = None
+        # workers search below the root, where the book is never looked up, and
+        # its memory mapping cannot be pickled
+        worker.opening_book = None
+        worker.stop_event = None
+        worker.on_iteration = None
+        # workers report only the nodes they searched themselves
+        worker.nodes = 0
+        pool, stop_workers = _get_process_pool(self.workers)
+        # set by the last search stopped in this process
+        stop_workers.clear()
+        pending: dict[Future, int] = {}
+        next_index = 1
+        try:
+            while next_index < len(moves) or pending:
+                while next_index < len(moves) and len(pending) < self.workers:
+                    time_left = (
+                        self._deadline - perf_counter()
+                        if self._deadline is not None
+                        else None
+                    )
+                    future = pool.submit(
+                        _search_root_move,
+                        worker,
+                        board,
+                        piece,
+                        moves[next_index],
+                        depth,
+                        alpha - _PARALLEL_ALPHA_MARGIN,
+                        time_left,
+                    )
+                    pending[future] = next_index
+                    scores.append(-inf)
+                    next_index += 1
+
+                done, _ = wait(
+                    pending, timeout=_STOP_POLL_S, return_when=FIRST_COMPLETED
+                )
+                if self.stop_event is not None and self.stop_event.is_set():
+                    raise SearchTimeout()
+                for future in done:
+                    index = pending.pop(future)
+                    value, nodes = future.result()
+                    self.nodes += nodes
+                    if value is None:
+                        raise SearchTimeout()
+                    scores[index] = value
+                    alpha = max(alpha, value)
+        finally:
+            for future in pending:
+                future.cancel()
+            if pending:
+                # the root moves already running end at their next deadline check
+                stop_workers.set()
+                wait(pending)
+
+        # the first move with the best score, like the serial search
+        best_value = max(scores)
+        best_move = moves[scores.index(best_value)]
+        if table is not None:
+            table.store(key, best_value, depth, Bound.EXACT, best_move.col)
+        return best_value, best_move
+
+    def _get_principal_variation(
+        self, board: ConnectFourBoard, piece: PieceEnum, move: Move | None, depth: int
+    ) -> list[Move]:
+        if move is None:
+            return []
+
+        # follow the best moves stored in the transposition table
+        pv = [move]
+        board.make_move(move=move, piece=piece)
+        table = self.transposition_table
+        max_player = False
+        while table is not None and len(pv) < depth:
+            piece = PieceEnum(3 - piece.value)
+            slot = table.probe(self._table_key(board, piece, max_player))
+            if slot < 0 or table.moves[slot] < 0:
+                break
+
+            move = board.get_move_from_col(table.moves[slot])
+            if move is None:
+                break
+
+            pv.append(move)
+            board.make_move(move=move, piece=piece)
+            max_player = not max_player
+
+        for _ in pv:
+            board.undo_move()
+        return pv
+
+    def _table_key(
+        self, board: ConnectFourBoard, piece: PieceEnum, max_player: bool
+    ) -> int:
+        key = board.key ^ SIDE_TO_MOVE_KEYS[piece]
+        return key if max_player else key ^ _MIN_PLAYER_KEY
+
+    def _column_order(
+        self, board: ConnectFourBoard, piece: PieceEnum, tt_col: int
+    ) -> list[int] | tuple[int, ...]:
+        ply = len(board.moves) - self._root_ply
+        pv_col = self._pv_col(board, ply)
+        if self.move_ordering is not None:
+            return self.move_ordering.order(board, piece, ply, pv_col, tt_col)
+        return _FIRST_COLUMN_ORDERS[pv_col] if pv_col >= 0 else _COLUMNS
+
+    def _pv_col(self, board: ConnectFourBoard, ply: int) -> int:
+        # the previous iteration's move, while the search follows its principal variation
+        pv = self._pv_bits
+        if ply >= len(pv):
+            return -1
+
+        for i in range(ply):
+            if board.moves[self._root_ply + i] != pv[i]:
+                return -1
+        return pv[ply] // COLUMN_BITS
+
+    def _evaluate(self, board: ConnectFourBoard, piece: PieceEnum) -> float:
+        cache = self._eval_cache
+        if cache is not None:
+            score = cache.lookup(board, piece)
+            if score is not None:
+                return score
+
+        if self._evaluator is not None:
+            score = self._evaluator.evaluate(board, piece)
+        else:
+            score = self._leaf_heuristic.evaluate(board=board, piece=piece)
+        if cache is not None:
+            cache.store(board, piece, score)
+        return score
+
+    def _on_cutoff(
+        self, board: ConnectFourBoard, piece: PieceEnum, col: int, depth: int
+    ) -> None:
+        if self.move_ordering is not None:
+            ply = len(board.moves) - self._root_ply
+            self.move_ordering.on_cutoff(board, piece, ply, col, depth)
 
     def minimax_alpha_beta_pruning(
         self,
@@ -36,31 +538,84 @@ class MinimaxAlphaBetaPruningSolver(Solver):
         max_player,
         piece: PieceEnum,
     ) -> tuple[float, Move | None]:
-        if depth == 0 or not board.get_possible_moves():
+        self.nodes += 1
+        if (
+            self._deadline is not None
+            and not self.nodes % DEADLINE_CHECK_INTERVAL
+            and out_of_time(self._deadline, self.stop_event)
+        ):
+            raise SearchTimeout()
+
+        if depth == 0 or board.is_full():
             sign = 1 if max_player else -1
-            return sign * self.heuristic.evaluate(board=board, piece=piece), None
+            return sign * self._evaluate(board, piece), None
+
+        table = self.transposition_table
+        tt_col = -1
+        if table is not None:
+            key = self._table_key(board, piece, max_player)
+            slot = table.probe(key)
+            if slot >= 0:
+                tt_col = table.moves[slot]
+            if slot >= 0 and table.depths[slot] >= depth:
+                value = table.values[slot]
+                bound = table.bounds[slot]
+                if (
+                    bound == Bound.EXACT
+                    or (bound == Bound.LOWER and value >= beta)
+                    or (bound == Bound.UPPER and value <= alpha)
+                ):
+                    col = table.moves[slot]
+                    return value, board.get_move_from_col(col) if col >= 0 else None
+
+        alpha_orig, beta_orig = alpha, beta
+        value, best_move = self._search_children(
+            board, depth, alpha, beta, max_player, piece, tt_col
+        )
+
+        if table is not None and best_move is not None:
+            if value <= alpha_orig:
+                bound = Bound.UPPER
+            elif value >= beta_orig:
+                bound = Bound.LOWER
+            else:
+                bound = Bound.EXACT
+            table.store(key, value, depth, bound, best_move.col)
 
-        possible_moves = board.get_possible_moves()
+        return value, best_move
+
+    def _search_children(
+        self,
+        board: ConnectFourBoard,
+        depth,
+        alpha,
+        beta,
+        max_player,
+        piece: PieceEnum,
+        tt_col: int,
+    ) -> tuple[float, Move | None]:
         if max_player:
             max_eval = -inf
             best_move: Move | None = None
 
-            for move in possible_moves:
-                new_board = ConnectFourBoard(initial_state=board.state)
+            for col in self._column_order(board, piece, tt_col):
+                move = board.get_move_from_col(col)
+                if move is None:
+                    continue
 
-                new_board.make_move(move=move, piece=piece)
-
-                if new_board.has_won(piece=piece):
+                if board.is_winning_move(move=move, piece=piece):
                     return 999_999, move
 
+                board.make_move(move=move, piece=piece)
                 eval, _ = self.minimax_alpha_beta_pruning(
-                    board=new_board,
+                    board=board,
                     depth=depth - 1,
                     alpha=alpha,
                     beta=beta,
                     max_player=False,
                     piece=PieceEnum(3 - piece.value),
                 )
+                board.undo_move()
 
                 if eval > max_eval:
                     max_eval = eval
@@ -69,6 +624,7 @@ class MinimaxAlphaBetaPruningSolver(Solver):
                 alpha = max(alpha, eval)
 
                 if beta <= alpha:
+                    self._on_cutoff(board, piece, col, depth)
                     break
 
             return max_eval, best_move
@@ -76,22 +632,24 @@ class MinimaxAlphaBetaPruningSolver(Solver):
         else:
             min_eval = inf
             best_move = None
-            for move in possible_moves:
-                new_board = ConnectFourBoard(initial_state=board.state)
-
-                new_board.make_move(move=move, piece=piece)
+            for col in self._column_order(board, piece, tt_col):
+                move = board.get_move_from_col(col)
+                if move is None:
+                    continue
 
-                if new_board.has_won(piece=piece):
+                if board.is_winning_move(move=move, piece=piece):
                     return -999_999, move
 
+                board.make_move(move=move, piece=piece)
                 eval, _ = self.minimax_alpha_beta_pruning(
-                    board=new_board,
+                    board=board,
                     depth=depth - 1,
                     alpha=alpha,
                     beta=beta,
                     max_player=True,
                     piece=PieceEnum(3 - piece.value),
                 )
+                board.undo_move()
 
                 if eval < min_eval:
                     min_eval = eval
@@ -100,6 +658,7 @@ class MinimaxAlphaBetaPruningSolver(Solver):
                 beta = min(beta, eval)
 
                 if beta <= alpha:
+                    self._on_cutoff(board, piece, col, depth)
                     break
 
             return min_eval, best_move
@@ -0,0 +1,91 @@
+from src.board.connect_four_board import ConnectFourBoard
+from src.board.layout import COLS, COLUMN_BITS, ROWS
+from src.types.piece_enum import PieceEnum
+
+LEFT_TO_RIGHT = tuple(range(COLS))
+# center columns take part in the most lines, so they are usually the best moves
+CENTER_FIRST = tuple(sorted(LEFT_TO_RIGHT, key=lambda col: abs(2 * col - COLS + 1)))
+
+KILLERS_PER_PLY = 2
+
+
+class MoveOrdering:
+    def __init__(
+        self,
+        center_first: bool = True,
+        pv_move: bool = True,
+        tt_move: bool = True,
+        killers: bool = True,
+        history: bool = True,
+    ):
+        # every layer can be switched off on its own to measure its effect
+        self.static_order = CENTER_FIRST if center_first else LEFT_TO_RIGHT
+        self.pv_move = pv_move
+        self.tt_move = tt_move
+        self.killers = killers
+        self.history = history
+
+        # killer columns per ply, most recent first
+        self._killers = [[-1] * KILLERS_PER_PLY for _ in range(ROWS * COLS + 1)]
+        # cutoff scores per piece and bit, indexed like ConnectFourBoard.bitboards
+        self._history = [[0] * (COLS * COLUMN_BITS) for _ in range(3)]
+
+    def new_search(self) -> None:
+        for killers in self._killers:
+            killers[:] = [-1] * KILLERS_PER_PLY
+        # keep some history between searches, but let the new one dominate
+        for scores in self._history:
+            scores[:] = [score // 2 for score in scores]
+
+    def order(
+        self,
+        board: ConnectFourBoard,
+        piece: PieceEnum,
+        ply: int,
+        pv_col: int = -1,
+        tt_col: int = -1,
+    ) -> list[int] | tuple[int, ...]:
+        first: list[int] = []
+        if self.pv_move and pv_col >= 0:
+            first.append(pv_col)
+        if self.tt_move and tt_col >= 0 and tt_col not in first:
+            first.append(tt_col)
+        if self.killers:
+            for col in self._killers[ply]:
+                if col >= 0 and col not in first and board.heights[col] < ROWS:
+                    first.append(col)
+
+        if not first and not self.history:
+            return self.static_order
+
+        rest = [col for col in self.static_order if col not in first]
+        if self.history:
+            scores = self._history[piece]
+            heights = board.heights
+            # sort is stable, so ties keep the static order
+            rest.sort(
+                key=lambda col: (
+                    -scores[col * COLUMN_BITS + heights[col]]
+                    if heights[col] < ROWS
+                    else 0
+                )
+            )
+        return first + rest
+
+    def on_cutoff(
+        self,
+        board: ConnectFourBoard,
+        piece: PieceEnum,
+        ply: int,
+        col: int,
+        depth: int,
+    ) -> None:
+        if self.killers:
+            killers = self._killers[ply]
+            if killers[0] != col:
+                killers[1] = killers[0]
+                killers[0] = col
+        if self.history:
+            self._history[piece][col * COLUMN_BITS + board.heights[col]] += (
+                depth * depth
+            )
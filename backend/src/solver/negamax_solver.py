@@ -0,0 +1,159 @@
+from math import inf
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.book.opening_book import OpeningBook
+from src.board.zobrist import SIDE_TO_MOVE_KEYS
+from src.heuristic.heuristic import Heuristic
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+from .deadline import DEADLINE_CHECK_INTERVAL, SearchTimeout, out_of_time
+from .minimax_alpha_beta_solver import MinimaxAlphaBetaPruningSolver
+from .move_ordering import MoveOrdering
+from .transposition_table import Bound
+
+# width of the null window; smaller than any difference between two heuristic scores
+_NULL_WINDOW = 1e-6
+
+
+class NegamaxSolver(MinimaxAlphaBetaPruningSolver):
+    # every iteration is searched in an aspiration window around the previous score
+    always_deepen = True
+
+    def __init__(
+        self,
+        heuristic: Heuristic,
+        depth: int,
+        tt_size_mb: float | None = 4,
+        time_budget_ms: float | None = None,
+        move_ordering: MoveOrdering | None = None,
+        aspiration_window: float | None = 50,
+        opening_book: OpeningBook | None = None,
+        endgame_empty_cells: int | None = None,
+        incremental_evaluation: bool = True,
+    ):
+        super().__init__(
+            heuristic=heuristic,
+            depth=depth,
+            tt_size_mb=tt_size_mb,
+            time_budget_ms=time_budget_ms,
+            move_ordering=move_ordering,
+            opening_book=opening_book,
+            endgame_empty_cells=endgame_empty_cells,
+            incremental_evaluation=incremental_evaluation,
+        )
+        self.aspiration_window = aspiration_window
+
+    def _search_root(
+        self,
+        board: ConnectFourBoard,
+        piece: PieceEnum,
+        depth: int,
+        previous_score: float | None = None,
+    ) -> tuple[float, Move | None]:
+        window = self.aspiration_window
+        if window is None or previous_score is None or abs(previous_score) >= 999_999:
+            return self.negamax(board, depth, -inf, inf, piece)
+
+        alpha, beta = previous_score - window, previous_score + window
+        value, best_move = self.negamax(board, depth, alpha, beta, piece)
+        # outside the window the score is only a bound, so search again on that side
+        if value <= alpha:
+            value, best_move = self.negamax(board, depth, -inf, beta, piece)
+        elif value >= beta:
+            value, best_move = self.negamax(board, depth, alpha, inf, piece)
+        return value, best_move
+
+    def negamax(
+        self,
+        board: ConnectFourBoard,
+        depth: int,
+        alpha: float,
+        beta: float,
+        piece: PieceEnum,
+    ) -> tuple[float, Move | None]:
+        # scores are from the point of view of `piece`, the side to move
+        self.nodes += 1
+        if (
+            self._deadline is not None
+            and not self.nodes % DEADLINE_CHECK_INTERVAL
+            and out_of_time(self._deadline, self.stop_event)
+        ):
+            raise SearchTimeout()
+
+        if depth == 0 or board.is_full():
+            return self._evaluate(board, piece), None
+
+        table = self.transposition_table
+        tt_col = -1
+        if table is not None:
+            key = self._table_key(board, piece, max_player=True)
+            slot = table.probe(key)
+            if slot >= 0:
+                tt_col = table.moves[slot]
+            if slot >= 0 and table.depths[slot] >= depth:
+                value = table.values[slot]
+                bound = table.bounds[slot]
+                if (
+                    bound == Bound.EXACT
+                    or (bound == Bound.LOWER and value >= beta)
+                    or (bound == Bound.UPPER and value <= alpha)
+                ):
+                    return value, (
+                        board.get_move_from_col(tt_col) if tt_col >= 0 else None
+                    )
+
+        alpha_orig = alpha
+        opponent = PieceEnum(3 - piece.value)
+        best_value = -inf
+        best_move: Move | None = None
+        searched_first = False
+
+        for col in self._column_order(board, piece, tt_col):
+            move = board.get_move_from_col(col)
+            if move is None:
+                continue
+
+            if board.is_winning_move(move=move, piece=piece):
+                return 999_999, move
+
+            board.make_move(move=move, piece=piece)
+            if not searched_first:
+                value = -self.negamax(board, depth - 1, -beta, -alpha, opponent)[0]
+                searched_first = True
+            else:
+                # prove the move is no better than the first one with a null window,
+                # and only search it fully when that fails
+                value = -self.negamax(
+                    board, depth - 1, -alpha - _NULL_WINDOW, -alpha, opponent
+                )[0]
+                if alpha < value < beta:
+                    value = -self.negamax(board, depth - 1, -beta, -value, opponent)[0]
+            board.undo_move()
+
+            if value > best_value:
+                best_value = value
+                best_move = move
+
+            alpha = max(alpha, value)
+
+            if beta <= alpha:
+                self._on_cutoff(board, piece, col, depth)
+                break
+
+        if table is not None and best_move is not None:
+            if best_value <= alpha_orig:
+                bound = Bound.UPPER
+            elif best_value >= beta:
+                bound = Bound.LOWER
+            else:
+                bound = Bound.EXACT
+            table.store(key, best_value, depth, bound, best_move.col)
+
+        return best_value, best_move
+
+    def _table_key(
+        self, board: ConnectFourBoard, piece: PieceEnum, max_player: bool
+    ) -> int:
+        # negamax scores do not depend on which player is at the root
+        return board.key ^ SIDE_TO_MOVE_KEYS[piece]
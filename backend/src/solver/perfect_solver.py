@@ -0,0 +1,264 @@
+import logging
+from math import inf
+from time import perf_counter
+
+from src.board.connect_four_board import ConnectFourBoard, bit_move
+from src.board.layout import COLS, COLUMN_BITS, ROWS
+from src.board.threats import playable_cells, winning_cells
+from src.types.evaluation import Evaluation
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+from src.types.search_info import SearchInfo
+
+from .analysis import best_column, score_columns
+from .deadline import DEADLINE_CHECK_INTERVAL, SearchTimeout, out_of_time
+from .move_ordering import CENTER_FIRST
+from .solver import Solver
+from .transposition_table import Bound, TranspositionTable
+
+CELLS = ROWS * COLS
+
+_COLUMN_MASKS = [((1 << ROWS) - 1) << (col * COLUMN_BITS) for col in range(COLS)]
+_ORDERED_COLUMN_MASKS = [_COLUMN_MASKS[col] for col in CENTER_FIRST]
+
+
+# Scores are from the point of view of the side to move: a win with its k-th
+# stone scores 22 - k, a loss to the opponent's k-th stone scores k - 22, and
+# a draw scores 0.
+def score_to_plies(score: int, moves: int) -> int:
+    if score > 0:
+        return 2 * (CELLS // 2 + 1 - score - moves // 2) - 1
+    if score < 0:
+        return 2 * (CELLS // 2 + 1 + score - (moves + 1) // 2)
+    return CELLS - moves
+
+
+class PerfectSolver(Solver):
+    def __init__(
+        self,
+        weak: bool = False,
+        tt_size_mb: float = 16,
+        time_budget_ms: float | None = None,
+    ):
+        # a weak solver only tells wins, draws and losses apart
+        self.weak = weak
+        self.transposition_table = TranspositionTable(size_mb=tt_size_mb)
+        # early positions can take too long to solve; past the budget a proven
+        # draw or win is played, or else the most threatening move not proven lost,
+        # and the evaluation stays None
+        self.time_budget_ms = time_budget_ms
+        self.nodes = 0
+        self.score: int | None = None
+        self.evaluation: Evaluation | None = None
+        self.search_info: SearchInfo | None = None
+        self._deadline: float | None = None
+
+    def solve(self, board: ConnectFourBoard, piece: PieceEnum) -> Move | None:
+        if piece not in [PieceEnum.HUMAN, PieceEnum.CPU]:
+            raise ValueError(f"Invalid piece for {type(self).__name__}.")
+
+        self.nodes = 0
+        self.score = None
+        self.evaluation = None
+        self.search_info = None
+        if board.is_full():
+            return None
+
+        # without a budget only stop_event ends the search
+        self._deadline = (
+            perf_counter() + self.time_budget_ms / 1000
+            if self.time_budget_ms is not None
+            else inf
+        )
+
+        position, mask = board.bitboards[piece], board.mask
+        moves = mask.bit_count()
+        # play a winning move right away, if there is one
+        wins = winning_cells(position, mask) & playable_cells(mask)
+        if wins:
+            best_bit = (wins & -wins).bit_length() - 1
+            best_score = (CELLS + 1 - moves) // 2
+        else:
+            best_bit, best_score = self._best_move(position, mask, moves)
+        if self.weak and best_score is not None:
+            best_score = max(-1, min(1, best_score))
+
+        best_move = bit_move(best_bit)
+        if best_score is None:
+            logging.info(f"Out of time, playing {best_move} after {self.nodes} nodes")
+            return best_move
+
+        self.score = best_score
+        self.evaluation = Evaluation.from_score(
+            best_score, score_to_plies(best_score, moves) if not self.weak else None
+        )
+        self.search_info = SearchInfo(
+            mode="exact", depth=CELLS - moves, nodes=self.nodes
+        )
+        logging.info(
+            f"Solved {best_move}: {self.evaluation}, {self.nodes} nodes, "
+            f"transposition table {self.transposition_table.stats()}"
+        )
+        return best_move
+
+    def analyze(
+        self, board: ConnectFourBoard, piece: PieceEnum
+    ) -> tuple[Move | None, list[float | None]]:
+        win_score = 1 if self.weak else (CELLS + 1 - board.mask.bit_count()) // 2
+        scores = score_columns(self, board, piece, win_score)
+        col = best_column(scores)
+        if col is None:
+            # no column was solved in time
+            return self.solve(board, piece), scores
+        return board.get_move_from_col(col), scores
+
+    def first_move(self) -> Move:
+        # the center column is the only winning first move
+        return bit_move(CENTER_FIRST[0] * COLUMN_BITS)
+
+    def evaluate(self, board: ConnectFourBoard, piece: PieceEnum) -> int:
+        # exact score of the position for `piece` to move, see score_to_plies
+        self.nodes = 0
+        self._deadline = None
+        position, mask = board.bitboards[piece], board.mask
+        return self._solve(position, mask, mask.bit_count())
+
+    def _best_move(
+        self, position: int, mask: int, moves: int
+    ) -> tuple[int, int | None]:
+        opponent_wins = winning_cells(position ^ mask, mask)
+        playable = playable_cells(mask)
+        forced = playable & opponent_wins
+        # the same pruning as in _negamax: block a threat, and never play below one
+        candidates = (forced or playable) & ~(opponent_wins >> 1)
+        if not candidates or forced & (forced - 1):
+            # every move loses to the opponent's next stone
+            move = forced or playable
+            return (move & -move).bit_length() - 1, -((CELLS - moves) // 2)
+
+        ordered = self._order(position, mask, candidates)
+        best_bit, best_score = -1, None
+        for index, move in enumerate(ordered):
+            child = (position ^ mask, mask | move, moves + 1)
+            try:
+                if best_score is None:
+                    score = -self._solve(*child)
+                elif best_score >= self._score_range(moves)[1]:
+                    break
+                else:
+                    # capped at the best score so far, so only a better move is solved exactly
+                    score = -self._solve(*child, highest=-best_score)
+            except SearchTimeout:
+                # a proven draw or win is kept; otherwise the moves not proven lost
+                # yet are ranked by the threats they create
+                if best_score is not None and best_score >= 0:
+                    return best_bit, None
+                return ordered[index].bit_length() - 1, None
+            if best_score is None or score > best_score:
+                best_bit, best_score = move.bit_length() - 1, score
+        return best_bit, best_score
+
+    # moves creating the most threats first, center first among equals
+    def _order(self, position: int, mask: int, candidates: int) -> list[int]:
+        scored = []
+        for column in _ORDERED_COLUMN_MASKS:
+            move = candidates & column
+            if move:
+                threats = winning_cells(position | move, mask | move).bit_count()
+                scored.append((-threats, len(scored), move))
+        scored.sort()
+        return [move for _, _, move in scored]
+
+    def _score_range(self, moves: int) -> tuple[int, int]:
+        if self.weak:
+            return -1, 1
+        return -((CELLS - moves) // 2), (CELLS + 1 - moves) // 2
+
+    # exact score of the position, or `highest` if the score is at least that
+    def _solve(
+        self, position: int, mask: int, moves: int, highest: int | None = None
+    ) -> int:
+        if winning_cells(position, mask) & playable_cells(mask):
+            return (CELLS + 1 - moves) // 2
+
+        low, high = self._score_range(moves)
+        if highest is not None:
+            high = min(high, highest)
+        # narrow [low, high] down with null-window searches, probing near 0 first
+        while low < high:
+            middle = low + (high - low) // 2
+            if middle <= 0 and low // 2 < middle:
+                middle = low // 2
+            elif middle >= 0 and high // 2 > middle:
+                middle = high // 2
+            score = self._negamax(position, mask, moves, middle, middle + 1)
+            if score <= middle:
+                high = score
+            else:
+                low = score
+        return low
+
+    # Alpha-beta search of a position where the side to move cannot win
+    # right away; returns a bound outside [alpha, beta] on a cutoff.
+    def _negamax(
+        self, position: int, mask: int, moves: int, alpha: int, beta: int
+    ) -> int:
+        self.nodes += 1
+        if (
+            self._deadline is not None
+            and not self.nodes % DEADLINE_CHECK_INTERVAL
+            and out_of_time(self._deadline, self.stop_event)
+        ):
+            raise SearchTimeout()
+
+        opponent = position ^ mask
+        playable = playable_cells(mask)
+        opponent_wins = winning_cells(opponent, mask)
+        forced = playable & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                # two threats cannot both be blocked
+                return -((CELLS - moves) // 2)
+            playable = forced
+        # never play right below a cell the opponent wins with
+        candidates = playable & ~(opponent_wins >> 1)
+        if not candidates:
+            return -((CELLS - moves) // 2)
+
+        if moves >= CELLS - 2:
+            return 0
+
+        # the opponent cannot win with its next stone, so neither before its next-but-one
+        lowest = -((CELLS - 2 - moves) // 2)
+        if alpha < lowest:
+            alpha = lowest
+            if alpha >= beta:
+                return alpha
+        highest = (CELLS - 1 - moves) // 2
+
+        table = self.transposition_table
+        key = position + mask
+        slot = table.probe(key)
+        if slot >= 0:
+            value = int(table.values[slot])
+            if table.bounds[slot] == Bound.UPPER:
+                highest = min(highest, value)
+            elif value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    return alpha
+        if beta > highest:
+            beta = highest
+            if alpha >= beta:
+                return beta
+
+        for move in self._order(position, mask, candidates):
+            score = -self._negamax(opponent, mask | move, moves + 1, -beta, -alpha)
+            if score >= beta:
+                table.store(key, score, CELLS - moves, Bound.LOWER, -1)
+                return score
+            if score > alpha:
+                alpha = score
+
+        table.store(key, alpha, CELLS - moves, Bound.UPPER, -1)
+        return alpha
@@ -1,11 +1,25 @@
 from abc import ABC, abstractmethod
+from typing import Callable
 
 from src.board.connect_four_board import ConnectFourBoard
+from src.types.evaluation import Evaluation
 from src.types.move import Move
 from src.types.piece_enum import PieceEnum
+from src.types.search_info import SearchInfo
+from src.types.search_progress import SearchProgress
+
+from .deadline import StopEvent
 
 
 class Solver(ABC):
+    # set by solve() for solvers that can tell; None otherwise
+    evaluation: Evaluation | None = None
+    search_info: SearchInfo | None = None
+    # once set, a search with a time budget ends as if the budget were spent
+    stop_event: StopEvent | None = None
+    # called after every depth by solvers that deepen iteratively
+    on_iteration: Callable[[SearchProgress], None] | None = None
+
     @abstractmethod
     def solve(self, board: ConnectFourBoard, piece: PieceEnum) -> Move | None:
         pass
@@ -13,3 +27,10 @@ class Solver(ABC):
     @abstractmethod
     def first_move(self) -> Move:
         pass
+
+    # the best move for `piece`, and the score of every column in the solver's
+    # own units; None for full columns and those it could not score
+    def analyze(
+        self, board: ConnectFourBoard, piece: PieceEnum
+    ) -> tuple[Move | None, list[float | None]]:
+        raise ValueError(f"{type(self).__name__} cannot analyze positions.")
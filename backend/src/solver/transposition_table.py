@@ -0,0 +1,75 @@
+from array import array
+from enum import IntEnum
+
+
+class Bound(IntEnum):
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+
+class TranspositionTable:
+    # key (8) + value (8) + depth (1) + bound (1) + best move (1)
+    ENTRY_BYTES = 19
+
+    def __init__(self, size_mb: float):
+        if size_mb <= 0:
+            raise ValueError("Transposition table size must be positive.")
+
+        # every bucket holds a depth-preferred slot followed by an always-replace slot
+        self.buckets = max(1, int(size_mb * 1024 * 1024) // (2 * self.ENTRY_BYTES))
+        slots = 2 * self.buckets
+        self.keys = array("Q", bytes(8 * slots))
+        self.values = array("d", bytes(8 * slots))
+        self.depths = array("b", b"\xff" * slots)  # -1 marks an empty slot
+        self.bounds = array("B", bytes(slots))
+        self.moves = array("b", b"\xff" * slots)  # best column, -1 when unknown
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    # slot holding `key`, or -1 when it is not stored
+    def probe(self, key: int) -> int:
+        slot = 2 * (key % self.buckets)
+        for index in (slot, slot + 1):
+            if self.keys[index] == key and self.depths[index] >= 0:
+                self.hits += 1
+                return index
+
+        self.misses += 1
+        if self.depths[slot] >= 0 or self.depths[slot + 1] >= 0:
+            self.collisions += 1
+        return -1
+
+    def store(
+        self, key: int, value: float, depth: int, bound: Bound, move: int
+    ) -> None:
+        slot = 2 * (key % self.buckets)
+        if self.keys[slot] != key and depth < self.depths[slot]:
+            # a deeper search of another position keeps the depth-preferred slot
+            slot += 1
+
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.depths[slot] = depth
+        self.bounds[slot] = bound
+        self.moves[slot] = move
+
+    def clear(self) -> None:
+        slots = 2 * self.buckets
+        self.depths = array("b", b"\xff" * slots)
+        self.moves = array("b", b"\xff" * slots)
+        self.hits = self.misses = self.collisions = 0
+
+    def hit_rate(self) -> float:
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "hit_rate": self.hit_rate(),
+        }
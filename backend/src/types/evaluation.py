@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing_extensions import Literal
+
+
+class Evaluation(BaseModel):
+    # game-theoretic value for the player to move, assuming perfect play
+    outcome: Literal["win", "draw", "loss"]
+    # moves left until the game ends, unknown when only the outcome was solved
+    plies_to_end: int | None = None
+
+    @classmethod
+    def from_score(cls, score: int, plies_to_end: int | None = None) -> "Evaluation":
+        outcome = "win" if score > 0 else "loss" if score < 0 else "draw"
+        return cls(outcome=outcome, plies_to_end=plies_to_end)
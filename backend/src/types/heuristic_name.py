@@ -1,3 +1,3 @@
 from typing_extensions import Literal
 
-HeuristicName = Literal["pieces", "positions"]
+HeuristicName = Literal["pieces", "positions", "ntuple"]
@@ -0,0 +1,4 @@
+from typing_extensions import Literal
+
+# how the playouts of the MCTS solver pick their moves
+MCTSSolverName = Literal["random", "tactical"]
@@ -1,9 +1,12 @@
 from typing import TypedDict
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class Move(BaseModel):
+    # frozen, so the board can hand out the same instances to every caller
+    model_config = ConfigDict(frozen=True)
+
     col: int
     row: int
 
@@ -0,0 +1,3 @@
+from typing_extensions import Literal
+
+PerfectSolverName = Literal["weak", "strong"]
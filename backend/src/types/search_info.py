@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing_extensions import Literal
+
+
+class SearchInfo(BaseModel):
+    # how the move was chosen: from an opening book, by a heuristic search, by
+    # solving the position exactly, or by Monte Carlo tree search
+    mode: Literal["book", "heuristic", "exact", "mcts"]
+    # plies searched ahead, unknown for book moves
+    depth: int | None = None
+    nodes: int = 0
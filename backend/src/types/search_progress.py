@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from src.types.move import Move
+
+
+class SearchProgress(BaseModel):
+    # the best move after searching `depth` plies, and its heuristic score for
+    # the side to move
+    depth: int
+    move: Move
+    score: float
+    nodes: int
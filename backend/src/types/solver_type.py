@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from typing_extensions import Annotated, Literal, Union
 from src.types.heuristic_name import HeuristicName
+from src.types.mcts_solver_name import MCTSSolverName
+from src.types.perfect_solver_name import PerfectSolverName
 
 from .model_provider_name import ModelProviderName
 
@@ -10,11 +12,33 @@ class HeuristicSolverType(BaseModel):
     name: HeuristicName
 
 
+class NegamaxSolverType(BaseModel):
+    type: Literal["negamax"]
+    name: HeuristicName
+
+
+class PerfectSolverType(BaseModel):
+    type: Literal["perfect"]
+    name: PerfectSolverName
+
+
+class MCTSSolverType(BaseModel):
+    type: Literal["mcts"]
+    name: MCTSSolverName
+
+
 class LLMSolverType(BaseModel):
     type: ModelProviderName
     name: str
 
 
 SolverType = Annotated[
-    Union[HeuristicSolverType, LLMSolverType], Field(discriminator="type")
+    Union[
+        HeuristicSolverType,
+        NegamaxSolverType,
+        PerfectSolverType,
+        MCTSSolverType,
+        LLMSolverType,
+    ],
+    Field(discriminator="type"),
 ]
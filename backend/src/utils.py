@@ -3,21 +3,67 @@ from typing import Annotated, get_args
 from fastapi import Path
 from pydantic import TypeAdapter
 
+from src.board.layout import COLS, ROWS
+from src.book import get_opening_book
 from src.heuristic.heuristic_factory import HeuristicFactory
 from src.model import ModelProviderFactory
-from src.solver import MinimaxAlphaBetaPruningSolver
+from src.solver import (
+    MCTSSolver,
+    MinimaxAlphaBetaPruningSolver,
+    NegamaxSolver,
+    PerfectSolver,
+)
+from src.solver.move_ordering import MoveOrdering
 from src.solver.llm_based_solver import LLMBasedSolver
 from src.types.model import Model
 from src.types.model_provider_name import ModelProviderName
 from src.types.solver_type import SolverType
 
+PERFECT_SOLVER_TIME_BUDGET_MS = 1_000
+# heuristic solvers solve positions with fewer empty cells exactly, which takes
+# about as long as a depth 4 search from there on
+ENDGAME_EMPTY_CELLS = 20
+# leaves the MCTS solver expands without a time budget, about 0.4 s
+MCTS_ITERATIONS = 2_000
 
-def get_solver(solver_type: SolverType):
-    if solver_type.type == "heuristic":
+
+def get_solver(
+    solver_type: SolverType, time_budget_ms: float | None = None, workers: int = 1
+):
+    if solver_type.type in ("heuristic", "negamax"):
         heuristic = HeuristicFactory.create(name=solver_type.name)
-        return MinimaxAlphaBetaPruningSolver(heuristic=heuristic, depth=4)
+        options = dict(
+            heuristic=heuristic,
+            # with a time budget, deepen for as long as the budget allows
+            depth=4 if time_budget_ms is None else ROWS * COLS,
+            time_budget_ms=time_budget_ms,
+            move_ordering=MoveOrdering(),
+            opening_book=get_opening_book(solver_type.name),
+            endgame_empty_cells=ENDGAME_EMPTY_CELLS,
+        )
+        if solver_type.type == "negamax":
+            return NegamaxSolver(**options)
+        # only the minimax root is searched in parallel
+        return MinimaxAlphaBetaPruningSolver(**options, workers=workers)
+
+    elif solver_type.type == "perfect":
+        return PerfectSolver(
+            weak=solver_type.name == "weak",
+            # early positions cannot be solved within a request, so always cap the search
+            time_budget_ms=time_budget_ms or PERFECT_SOLVER_TIME_BUDGET_MS,
+        )
+
+    elif solver_type.type == "mcts":
+        return MCTSSolver(
+            iterations=MCTS_ITERATIONS if time_budget_ms is None else None,
+            time_budget_ms=time_budget_ms,
+            tactical=solver_type.name == "tactical",
+        )
 
     elif solver_type.type in get_args(ModelProviderName):
+        if time_budget_ms is not None:
+            raise ValueError("A time budget only applies to search-based solvers.")
+
         model_provider = ModelProviderFactory.create(solver_type.type)
         model = Model(name=solver_type.name)
 
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from api.main import app
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def empty_board():
+    return [[0] * 7 for _ in range(6)]
+
+
+def analyze(client: TestClient, url: str, positions: list[dict]):
+    response = client.post(url, json={"positions": positions})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_analyzes_every_position(client: TestClient):
+    """Test that every position gets a line with a score for each column"""
+    board = empty_board()
+    board[5][3] = 1
+    positions = [{"board": empty_board()}] * 20 + [{"board": board, "piece": 2}]
+    analyses = analyze(
+        client, "/analyze/heuristic/positions?time_budget_ms=50", positions
+    )
+
+    assert sorted(analysis["index"] for analysis in analyses) == list(range(21))
+    for analysis in analyses:
+        assert analysis["error"] is None
+        assert len(analysis["scores"]) == 7
+        assert analysis["best_move"]["col"] in range(7)
+
+
+def test_reports_positions_it_cannot_analyze(client: TestClient):
+    """Test that finished games and malformed boards get an error line"""
+    board = empty_board()
+    for row in range(2, 6):
+        board[row][0] = 1
+    analyses = analyze(
+        client,
+        "/analyze/heuristic/positions?time_budget_ms=50",
+        [{"board": board}, {"board": empty_board()}, {"board": [[0] * 7]}],
+    )
+
+    errors = {analysis["index"]: analysis["error"] for analysis in analyses}
+    assert errors[0] is not None
+    assert errors[1] is None
+    assert errors[2] is not None
+
+
+def test_llm_solvers_cannot_analyze(client: TestClient):
+    """Test that LLM solvers are refused since they do not search"""
+    response = client.post(
+        "/analyze/mistral/model", json={"positions": [{"board": empty_board()}]}
+    )
+    assert response.status_code == 400
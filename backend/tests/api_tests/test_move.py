@@ -0,0 +1,117 @@
+import pytest
+from api.main import app
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def empty_board():
+    return [[0] * 7 for _ in range(6)]
+
+
+def test_move_returns_solver_move(client: TestClient):
+    """Test that /move plays the player's move and answers with a solver move"""
+    response = client.post(
+        "/move/heuristic/pieces",
+        json={"board": empty_board(), "player_move": {"col": 3, "row": 5}},
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["state"] == "CONTINUE"
+    assert data["solver_move"] is not None
+
+
+def test_move_with_time_budget(client: TestClient):
+    """Test that /move accepts a per-move time budget in milliseconds"""
+    response = client.post(
+        "/move/heuristic/positions?time_budget_ms=100",
+        json={"board": empty_board(), "player_move": {"col": 3, "row": 5}},
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["solver_move"] is not None
+
+
+def test_move_with_invalid_time_budget(client: TestClient):
+    """Test that /move rejects a non-positive time budget"""
+    response = client.post(
+        "/move/heuristic/positions?time_budget_ms=0",
+        json={"board": empty_board(), "player_move": {"col": 3, "row": 5}},
+    )
+    assert response.status_code == 422
+
+
+def test_move_with_negamax_solver(client: TestClient):
+    """Test that /move can be answered by the negamax solver"""
+    response = client.post(
+        "/move/negamax/pieces",
+        json={"board": empty_board(), "player_move": {"col": 3, "row": 5}},
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["solver_move"] is not None
+
+
+def test_move_reports_how_the_move_was_chosen(client: TestClient):
+    """Test that /move tells book moves from searched and solved ones"""
+    response = client.post(
+        "/move/heuristic/positions",
+        json={"board": empty_board(), "player_move": {"col": 3, "row": 5}},
+    )
+    assert response.json()["data"]["search"]["mode"] == "book"
+
+    board = [
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 2, 1, 2],
+        [0, 0, 0, 0, 1, 1, 2],
+        [0, 0, 1, 2, 2, 2, 1],
+        [2, 2, 2, 1, 1, 1, 2],
+        [2, 1, 1, 2, 1, 1, 2],
+    ]
+    response = client.post(
+        "/move/heuristic/positions",
+        json={"board": board, "player_move": {"col": 4, "row": 0}},
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["search"]["mode"] == "exact"
+    assert data["evaluation"]["outcome"] in ("win", "draw", "loss")
+
+
+def test_move_with_mcts_solver(client: TestClient):
+    """Test that /move searches with MCTS within the time budget"""
+    response = client.post(
+        "/move/mcts/tactical?time_budget_ms=100",
+        json={"board": empty_board(), "player_move": {"col": 3, "row": 5}},
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["solver_move"] is not None
+    assert data["search"]["mode"] == "mcts"
+    assert data["evaluation"] is None
+
+
+def test_move_with_perfect_solver(client: TestClient):
+    """Test that /move reports the exact outcome of a solved position"""
+    board = empty_board()
+    board[5] = [2, 2, 2, 0, 1, 1, 0]
+    response = client.post(
+        "/move/perfect/strong",
+        json={"board": board, "player_move": {"col": 6, "row": 5}},
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["state"] == "LOSE"
+    assert data["solver_move"] == {"col": 3, "row": 5}
+    assert data["evaluation"] == {"outcome": "win", "plies_to_end": 1}
+
+
+def test_move_rejects_time_budget_for_llm_solver(client: TestClient):
+    """Test that /move refuses a time budget it cannot honour"""
+    response = client.post(
+        "/move/mistral/mistral-small-latest?time_budget_ms=100",
+        json={"board": empty_board(), "player_move": {"col": 3, "row": 5}},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,216 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from api import sessions, stopping
+from api.main import app
+from api.move_executor import MoveExecutor, Overloaded
+from fastapi.testclient import TestClient
+from src.types.solver_type import HeuristicSolverType, LLMSolverType
+
+SEARCH = HeuristicSolverType(type="heuristic", name="positions")
+LLM = LLMSolverType(type="mistral", name="model")
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def wait_to_stop_pondering(timeout_s: float) -> bool:
+    return sessions._stop_pondering.wait(timeout_s)
+
+
+def wait_to_be_stopped(timeout_s: float) -> bool:
+    deadline = time.perf_counter() + timeout_s
+    while time.perf_counter() < deadline:
+        if stopping.search_stopped.is_set():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def empty_board():
+    return [[0] * 7 for _ in range(6)]
+
+
+def test_searches_run_in_another_process():
+    async def main():
+        executor = MoveExecutor(
+            processes=1,
+            threads=1,
+            max_queued=0,
+            timeout_s=30,
+            session_ttl_s=600,
+            max_sessions=1,
+        )
+        try:
+            return await executor.run(SEARCH, threading.get_native_id)
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(main()) != threading.get_native_id()
+
+
+def test_session_moves_reach_the_same_process():
+    async def main():
+        executor = MoveExecutor(
+            processes=2,
+            threads=1,
+            max_queued=4,
+            timeout_s=30,
+            session_ttl_s=600,
+            max_sessions=1,
+        )
+        try:
+            return {
+                session_id: {
+                    await executor.run(SEARCH, os.getpid, session_id=session_id)
+                    for _ in range(4)
+                }
+                for session_id in ("a", "b")
+            }
+        finally:
+            executor.shutdown()
+
+    pids = asyncio.run(main())
+    assert len(pids["a"]) == len(pids["b"]) == 1
+
+
+def test_pondering_gives_way_to_moves():
+    async def main():
+        executor = MoveExecutor(
+            processes=1,
+            threads=1,
+            max_queued=0,
+            timeout_s=30,
+            session_ttl_s=600,
+            max_sessions=1,
+        )
+        try:
+            # the process starts, then ponders until it is stopped
+            await executor.run(SEARCH, os.getpid)
+            executor.ponder(SEARCH, wait_to_stop_pondering, 30, session_id="a")
+            await asyncio.sleep(0.2)
+            start = time.perf_counter()
+            await executor.run(SEARCH, os.getpid, session_id="a")
+            return time.perf_counter() - start
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(main()) < 1
+
+
+def test_refuses_work_beyond_its_queue():
+    async def main():
+        executor = MoveExecutor(
+            processes=1,
+            threads=1,
+            max_queued=1,
+            timeout_s=30,
+            session_ttl_s=600,
+            max_sessions=1,
+        )
+        running = [
+            asyncio.create_task(executor.run(LLM, time.sleep, 0.2)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await executor.run(LLM, time.sleep, 0)
+        await asyncio.gather(*running)
+        # the slots are free again
+        await executor.run(LLM, time.sleep, 0)
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_timed_out_searches_free_their_process():
+    async def main():
+        executor = MoveExecutor(
+            processes=1,
+            threads=1,
+            max_queued=0,
+            timeout_s=2,
+            session_ttl_s=600,
+            max_sessions=1,
+        )
+        try:
+            # the process starts within the first timeout
+            await executor.run(SEARCH, os.getpid)
+            with pytest.raises(TimeoutError):
+                await executor.run(SEARCH, wait_to_be_stopped, 30)
+            # without the stop, this would find the process still busy
+            await asyncio.sleep(0.2)
+            await executor.run(SEARCH, os.getpid)
+        finally:
+            executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_times_out():
+    async def main():
+        executor = MoveExecutor(
+            processes=1,
+            threads=1,
+            max_queued=0,
+            timeout_s=0.05,
+            session_ttl_s=600,
+            max_sessions=1,
+        )
+        with pytest.raises(TimeoutError):
+            await executor.run(LLM, time.sleep, 0.5)
+        # the timed out call keeps its thread until it ends
+        with pytest.raises(Overloaded):
+            await executor.run(LLM, time.sleep, 0)
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_move_answers_429_when_overloaded(client: TestClient, monkeypatch):
+    async def overloaded(*args, **kwargs):
+        raise Overloaded()
+
+    monkeypatch.setattr(client.app.state.move_executor, "run", overloaded)
+    response = client.post(
+        "/move/heuristic/positions",
+        json={"board": empty_board(), "player_move": {"col": 3, "row": 5}},
+    )
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_move_answers_503_on_timeout(client: TestClient, monkeypatch):
+    async def timed_out(*args, **kwargs):
+        raise TimeoutError()
+
+    monkeypatch.setattr(client.app.state.move_executor, "run", timed_out)
+    response = client.post(
+        "/move/heuristic/positions",
+        json={"board": empty_board(), "player_move": {"col": 3, "row": 5}},
+    )
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+def test_ping_answers_during_a_search(client: TestClient):
+    # past the opening book, so the solver searches for the whole budget
+    board = empty_board()
+    board[4] = [0, 0, 0, 2, 1, 0, 0]
+    board[5] = [0, 1, 2, 1, 2, 0, 0]
+    search = threading.Thread(
+        target=client.post,
+        args=("/move/negamax/positions?time_budget_ms=2000",),
+        kwargs={"json": {"board": board, "player_move": {"col": 0, "row": 5}}},
+    )
+    search.start()
+    time.sleep(0.5)
+    start = time.perf_counter()
+    assert client.get("/ping").status_code == 200
+    assert time.perf_counter() - start < 0.5
+    search.join()
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+from api.main import app
+from fastapi.testclient import TestClient
+
+# past the opening book, so the solver deepens for the whole budget
+BOARD = [
+    [0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 2, 1, 0, 0],
+    [0, 1, 2, 1, 2, 0, 0],
+]
+MOVE = {"board": BOARD, "player_move": {"col": 0, "row": 5}}
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def receive_until_done(websocket):
+    messages = []
+    while not messages or messages[-1]["type"] == "progress":
+        messages.append(websocket.receive_json())
+    return messages
+
+
+def test_streams_every_depth_then_the_result(client: TestClient):
+    """Test that the stream reports each completed depth before the move"""
+    with client.websocket_connect("/move/negamax/positions?time_budget_ms=300") as ws:
+        ws.send_json(MOVE)
+        messages = receive_until_done(ws)
+
+    *progress, result = messages
+    assert result["type"] == "result"
+    assert [report["data"]["depth"] for report in progress] == list(
+        range(1, len(progress) + 1)
+    )
+    assert progress[-1]["data"]["move"] == result["data"]["solver_move"]
+    assert result["data"]["search"]["depth"] == progress[-1]["data"]["depth"]
+
+
+def test_streams_every_depth_without_a_time_budget(client: TestClient):
+    """Test that a search without a time budget still deepens one ply at a time"""
+    with client.websocket_connect("/move/heuristic/positions") as ws:
+        ws.send_json(MOVE)
+        messages = receive_until_done(ws)
+
+    *progress, result = messages
+    assert result["type"] == "result"
+    assert [report["data"]["depth"] for report in progress] == [1, 2, 3, 4]
+    assert progress[-1]["data"]["move"] == result["data"]["solver_move"]
+
+
+def test_stop_answers_with_the_best_move_so_far(client: TestClient):
+    """Test that a stop message ends the search early"""
+    with client.websocket_connect(
+        "/move/heuristic/positions?time_budget_ms=30000"
+    ) as ws:
+        ws.send_json(MOVE)
+        first = ws.receive_json()
+        start = time.perf_counter()
+        ws.send_json({"type": "stop"})
+        messages = receive_until_done(ws)
+
+    assert first["type"] == "progress"
+    assert time.perf_counter() - start < 5
+    assert messages[-1]["type"] == "result"
+    assert messages[-1]["data"]["solver_move"] is not None
+
+
+def test_stream_rejects_llm_solvers(client: TestClient):
+    """Test that LLM solvers, which do not search, cannot be streamed"""
+    with client.websocket_connect("/move/mistral/mistral-large-latest") as ws:
+        ws.send_json(MOVE)
+        message = ws.receive_json()
+    assert message["type"] == "error"
+    assert message["status"] == 400
+
+
+def test_stream_rejects_an_invalid_move(client: TestClient):
+    """Test that an invalid request is answered with an error message"""
+    with client.websocket_connect("/move/negamax/positions") as ws:
+        ws.send_json({"board": BOARD})
+        message = ws.receive_json()
+    assert message["type"] == "error"
+    assert message["status"] == 422
@@ -0,0 +1,193 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from api import sessions, stopping
+from api.main import app
+from api.registry import register_heuristics
+from api.sessions import (
+    SessionNotFound,
+    SessionStore,
+    configure_sessions,
+    play_game_move,
+    ponder_game,
+    start_game,
+)
+from fastapi.testclient import TestClient
+from src.types.solver_type import (
+    HeuristicSolverType,
+    MCTSSolverType,
+    PerfectSolverType,
+)
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def games():
+    # the games of this process, as a search process would keep them
+    register_heuristics()
+    stop_pondering = threading.Event()
+    configure_sessions(ttl_s=600, max_sessions=1, stop_pondering=stop_pondering)
+    return stop_pondering
+
+
+def create_session(client: TestClient, url: str = "/sessions/heuristic/pieces"):
+    response = client.post(url)
+    assert response.status_code == 200
+    return response.json()["data"]
+
+
+def test_session_plays_moves_by_column(client: TestClient):
+    """Test that a session keeps the board, so moves only name their column"""
+    session = create_session(client)
+    assert session["solver_move"] is None
+
+    moves = [{"col": 3, "row": 5}]
+    for _ in range(2):
+        response = client.post(f"/sessions/{session['session_id']}", json={"col": 3})
+        assert response.status_code == 200
+        assert response.json()["data"]["state"] == "CONTINUE"
+        moves.append(response.json()["data"]["solver_move"])
+    # the solver never plays on a cell taken earlier in the game
+    assert len({(move["col"], move["row"]) for move in moves}) == 3
+
+
+def test_session_with_cpu_first(client: TestClient):
+    """Test that a session can start with the solver's first move"""
+    session = create_session(client, "/sessions/negamax/positions?cpu_first=true")
+    assert session["solver_move"] is not None
+
+    response = client.post(
+        f"/sessions/{session['session_id']}",
+        json={"col": session["solver_move"]["col"]},
+    )
+    assert response.status_code == 200
+
+
+def test_session_rejects_moves_outside_the_board(client: TestClient):
+    """Test that a move outside the board is rejected"""
+    session_id = create_session(client)["session_id"]
+    assert client.post(f"/sessions/{session_id}", json={"col": 7}).status_code == 422
+
+
+def test_unknown_session(client: TestClient):
+    """Test that moves of an unknown session answer 404"""
+    response = client.post("/sessions/unknown", json={"col": 3})
+    assert response.status_code == 404
+
+
+def test_delete_session(client: TestClient):
+    """Test that a deleted session takes no more moves"""
+    session_id = create_session(client)["session_id"]
+    assert client.delete(f"/sessions/{session_id}").status_code == 200
+    response = client.post(f"/sessions/{session_id}", json={"col": 3})
+    assert response.status_code == 404
+
+
+def test_game_keeps_its_solver(games):
+    start_game("game", MCTSSolverType(type="mcts", name="tactical"), 50, 1, False)
+    solver = sessions._games.get("game").game.solver
+    play_game_move("game", 3)
+    play_game_move("game", 3)
+    assert sessions._games.get("game").game.solver is solver
+
+
+def test_game_rejects_a_full_column(games):
+    start_game(
+        "game", HeuristicSolverType(type="heuristic", name="pieces"), None, 1, False
+    )
+    sessions._games.get("game").game.board.state = [[1, 2, 0, 0, 0, 0, 0]] * 6
+    with pytest.raises(ValueError):
+        play_game_move("game", 0)
+
+
+def test_finished_game_is_dropped(games):
+    start_game(
+        "game", HeuristicSolverType(type="heuristic", name="pieces"), None, 1, False
+    )
+    sessions._games.get("game").game.board.state = [
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 2, 2, 2, 0, 0, 0],
+        [0, 1, 1, 1, 0, 0, 0],
+    ]
+    assert play_game_move("game", 0).state == "WIN"
+    with pytest.raises(SessionNotFound):
+        play_game_move("game", 0)
+
+
+def test_stopped_move_can_be_played_again(games, monkeypatch):
+    start_game(
+        "game", HeuristicSolverType(type="heuristic", name="pieces"), None, 1, False
+    )
+    with monkeypatch.context() as patched:
+        patched.setattr(stopping.search_stopped, "is_set", lambda: True)
+        play_game_move("game", 3)
+    assert sessions._games.get("game").game.board.moves == []
+    assert play_game_move("game", 3).solver_move is not None
+
+
+def test_pondered_replies_are_played_without_a_search(games):
+    start_game(
+        "game", HeuristicSolverType(type="heuristic", name="pieces"), None, 1, False
+    )
+    play_game_move("game", 3)
+    ponder_game("game")
+    session = sessions._games.get("game")
+    assert sorted(session.replies) == list(range(7))
+
+    reply = session.replies[2]
+    with patch.object(session.game.solver, "solve", side_effect=AssertionError):
+        response = play_game_move("game", 2)
+    assert response.solver_move == reply.move
+    assert session.replies == {}
+
+
+def test_pondering_stops_when_asked(games):
+    start_game(
+        "game", HeuristicSolverType(type="heuristic", name="pieces"), None, 1, False
+    )
+    games.set()
+    ponder_game("game")
+    assert sessions._games.get("game").replies == {}
+
+
+def test_pondering_without_a_time_budget_stops_when_asked(games):
+    # solving the replies to the first move exactly takes far longer than this test
+    start_game("game", PerfectSolverType(type="perfect", name="strong"), None, 1, False)
+    pondering = threading.Thread(target=ponder_game, args=("game",))
+    pondering.start()
+    time.sleep(0.2)
+    games.set()
+    pondering.join(timeout=5)
+    assert not pondering.is_alive()
+    assert sessions._games.get("game").replies == {}
+
+
+def test_store_drops_least_recently_used_sessions():
+    store = SessionStore[int](ttl_s=600, max_sessions=2)
+    store.add("a", 1)
+    store.add("b", 2)
+    store.get("a")
+    store.add("c", 3)
+    assert len(store) == 2
+    assert store.get("a") == 1
+    with pytest.raises(SessionNotFound):
+        store.get("b")
+
+
+def test_store_drops_expired_sessions():
+    store = SessionStore[int](ttl_s=0.05, max_sessions=2)
+    store.add("a", 1)
+    time.sleep(0.1)
+    with pytest.raises(SessionNotFound):
+        store.get("a")
+    assert len(store) == 0
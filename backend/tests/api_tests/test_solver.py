@@ -2,6 +2,9 @@ import pytest
 from api.main import app
 from fastapi.testclient import TestClient
 
+# solver types backed by a search engine rather than an LLM provider
+ENGINE_SOLVER_TYPES = ("heuristic", "negamax", "mcts")
+
 
 @pytest.fixture
 def client():
@@ -42,7 +45,7 @@ def test_get_solvers_includes_llm_solvers(client: TestClient):
     response = client.get("/solvers")
     data = response.json()["data"]
 
-    llm_solvers = [s for s in data if s.get("type") != "heuristic"]
+    llm_solvers = [s for s in data if s.get("type") not in ENGINE_SOLVER_TYPES]
     assert len(llm_solvers) > 0
 
 
@@ -51,7 +54,7 @@ def test_get_solvers_llm_solver_structure(client: TestClient):
     response = client.get("/solvers")
     data = response.json()["data"]
 
-    llm_solvers = [s for s in data if s.get("type") != "heuristic"]
+    llm_solvers = [s for s in data if s.get("type") not in ENGINE_SOLVER_TYPES]
     for solver in llm_solvers:
         assert "type" in solver
         assert "name" in solver
@@ -63,3 +66,13 @@ def test_get_solvers_returns_list(client: TestClient):
     response = client.get("/solvers")
     data = response.json()["data"]
     assert isinstance(data, list)
+
+
+def test_get_solvers_includes_negamax_solvers(client: TestClient):
+    """Test that /solvers endpoint includes a negamax solver for each heuristic"""
+    response = client.get("/solvers")
+    data = response.json()["data"]
+
+    heuristic_names = {s["name"] for s in data if s.get("type") == "heuristic"}
+    negamax_names = {s["name"] for s in data if s.get("type") == "negamax"}
+    assert negamax_names == heuristic_names
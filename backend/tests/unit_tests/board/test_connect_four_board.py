@@ -1,6 +1,8 @@
 from random import random
 from unittest import TestCase
 
+from pydantic import ValidationError
+
 from src.types.piece_enum import PieceEnum
 from src.board.connect_four_board import ConnectFourBoard
 from src.types.move import Move
@@ -151,3 +153,143 @@ class TestConnectFourBoard(TestCase):
         initial_state = [[1] * 7 for _ in range(6)]
         board = ConnectFourBoard(initial_state)
         self.assertFalse(board.is_empty())
+
+    def test_make_move_updates_state_and_heights(self):
+        board = ConnectFourBoard()
+        board.make_move(Move(col=3, row=5), PieceEnum.HUMAN)
+        board.make_move(Move(col=3, row=4), PieceEnum.CPU)
+        self.assertEqual(board.state[5][3], PieceEnum.HUMAN)
+        self.assertEqual(board.state[4][3], PieceEnum.CPU)
+        self.assertEqual(board.get_move_from_col(3), Move(col=3, row=3))
+        self.assertIn(Move(col=3, row=3), board.get_possible_moves())
+
+    def test_make_move_on_occupied_cell(self):
+        board = ConnectFourBoard()
+        board.make_move(Move(col=0, row=5), PieceEnum.HUMAN)
+        with self.assertRaises(ValueError):
+            board.make_move(Move(col=0, row=5), PieceEnum.CPU)
+
+    def test_full_column_has_no_moves(self):
+        initial_state = [[0] * 7 for _ in range(6)]
+        for row in range(6):
+            initial_state[row][2] = 1 + row % 2
+        board = ConnectFourBoard(initial_state)
+        self.assertIsNone(board.get_move_from_col(2))
+        self.assertNotIn(2, [move.col for move in board.get_possible_moves()])
+
+    def test_has_won_anti_diagonal(self):
+        initial_state = [
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 2, 0, 0, 0],
+            [0, 0, 0, 1, 2, 0, 0],
+            [0, 0, 0, 1, 1, 2, 0],
+            [0, 0, 0, 1, 1, 1, 2],
+        ]
+        board = ConnectFourBoard(initial_state)
+        self.assertFalse(board.has_won(PieceEnum.HUMAN))
+        self.assertTrue(board.has_won(PieceEnum.CPU))
+        self.assertEqual(
+            board.winning_sequence,
+            [
+                Move(row=2, col=3),
+                Move(row=3, col=4),
+                Move(row=4, col=5),
+                Move(row=5, col=6),
+            ],
+        )
+
+    def test_is_winning_move_leaves_board_unchanged(self):
+        initial_state = [[0] * 7 for _ in range(5)] + [[1, 1, 1, 0, 0, 0, 0]]
+        board = ConnectFourBoard(initial_state)
+        self.assertTrue(board.is_winning_move(Move(col=3, row=5), PieceEnum.HUMAN))
+        self.assertFalse(board.is_winning_move(Move(col=3, row=5), PieceEnum.CPU))
+        self.assertEqual(board.state, initial_state)
+        self.assertIsNone(board.winning_sequence)
+
+    def test_undo_move_restores_previous_position(self):
+        board = ConnectFourBoard()
+        board.make_move(Move(col=3, row=5), PieceEnum.HUMAN)
+        before = [row[:] for row in board.state]
+        board.make_move(Move(col=3, row=4), PieceEnum.CPU)
+        self.assertEqual(board.undo_move(), Move(col=3, row=4))
+        self.assertEqual(board.state, before)
+        self.assertEqual(board.get_move_from_col(3), Move(col=3, row=4))
+
+    def test_undo_move_without_moves(self):
+        with self.assertRaises(ValueError):
+            self.board.undo_move()
+
+    def test_state_is_a_copy(self):
+        self.board.state[5][3] = PieceEnum.HUMAN
+        self.assertTrue(self.board.is_empty())
+        self.assertEqual(self.board.state[5][3], PieceEnum.EMPTY)
+        with self.assertRaises(TypeError):
+            self.board.grid[5][3] = PieceEnum.HUMAN
+
+    def test_shared_moves_are_frozen(self):
+        move = self.board.get_move_from_col(3)
+        with self.assertRaises(ValidationError):
+            move.row = 0
+        self.assertEqual(self.board.get_move_from_col(3), Move(col=3, row=5))
+
+    def test_last_move_wins(self):
+        initial_state = [[0] * 7 for _ in range(5)] + [[1, 1, 1, 0, 2, 2, 2]]
+        board = ConnectFourBoard(initial_state)
+        board.make_move(Move(col=3, row=5), PieceEnum.HUMAN)
+        self.assertTrue(board.last_move_wins(Move(col=3, row=5)))
+        self.assertEqual(
+            board.winning_sequence,
+            [
+                Move(row=5, col=0),
+                Move(row=5, col=1),
+                Move(row=5, col=2),
+                Move(row=5, col=3),
+            ],
+        )
+
+    def test_last_move_wins_ignores_other_lines(self):
+        # the CPU line does not go through the human's last move
+        initial_state = [[0] * 7 for _ in range(5)] + [[2, 2, 2, 2, 0, 0, 0]]
+        board = ConnectFourBoard(initial_state)
+        board.make_move(Move(col=6, row=5), PieceEnum.HUMAN)
+        self.assertFalse(board.last_move_wins(Move(col=6, row=5)))
+        self.assertFalse(board.last_move_wins(Move(col=6, row=4)))
+        self.assertIsNone(board.winning_sequence)
+
+    def test_key_is_updated_incrementally(self):
+        board = ConnectFourBoard()
+        empty_key = board.key
+        board.make_move(Move(col=3, row=5), PieceEnum.HUMAN)
+        board.make_move(Move(col=4, row=5), PieceEnum.CPU)
+        self.assertEqual(board.key, ConnectFourBoard(board.state).key)
+        board.undo_move()
+        board.undo_move()
+        self.assertEqual(board.key, empty_key)
+
+    def test_key_depends_on_pieces(self):
+        human = ConnectFourBoard()
+        human.make_move(Move(col=3, row=5), PieceEnum.HUMAN)
+        cpu = ConnectFourBoard()
+        cpu.make_move(Move(col=3, row=5), PieceEnum.CPU)
+        self.assertNotEqual(human.key, cpu.key)
+
+    def test_key_is_independent_of_move_order(self):
+        first = ConnectFourBoard()
+        first.make_move(Move(col=0, row=5), PieceEnum.HUMAN)
+        first.make_move(Move(col=6, row=5), PieceEnum.CPU)
+        first.make_move(Move(col=1, row=5), PieceEnum.HUMAN)
+        second = ConnectFourBoard()
+        second.make_move(Move(col=1, row=5), PieceEnum.HUMAN)
+        second.make_move(Move(col=6, row=5), PieceEnum.CPU)
+        second.make_move(Move(col=0, row=5), PieceEnum.HUMAN)
+        self.assertEqual(first.key, second.key)
+
+    def test_canonical_key_of_mirrored_positions(self):
+        board = ConnectFourBoard()
+        board.make_move(Move(col=0, row=5), PieceEnum.HUMAN)
+        board.make_move(Move(col=2, row=5), PieceEnum.CPU)
+        mirrored = ConnectFourBoard([row[::-1] for row in board.state])
+        self.assertNotEqual(board.key, mirrored.key)
+        self.assertEqual(board.key, mirrored.mirror_key)
+        self.assertEqual(board.canonical_key, mirrored.canonical_key)
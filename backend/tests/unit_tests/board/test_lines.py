@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from src.board.layout import BOARD_MASK, cell_bit
+from src.board.lines import LINE_MASKS, LINES, LINES_THROUGH
+
+
+class TestLines(TestCase):
+    def test_all_lines_are_distinct(self):
+        self.assertEqual(len(LINES), 69)
+        self.assertEqual(len(set(LINE_MASKS)), 69)
+        self.assertEqual(sum(line.vertical for line in LINES), 21)
+
+    def test_lines_are_four_cells_on_the_board(self):
+        for line in LINES:
+            self.assertEqual(line.mask.bit_count(), 4)
+            self.assertEqual(line.mask & ~BOARD_MASK, 0)
+            self.assertEqual(line.inner_mask | line.outer_mask, line.mask)
+            self.assertEqual(line.inner_mask & line.outer_mask, 0)
+
+    def test_lines_through_cells(self):
+        # a corner is on 3 lines, the cells next to the center on 13
+        self.assertEqual(len(LINES_THROUGH[cell_bit(0, 0)]), 3)
+        self.assertEqual(len(LINES_THROUGH[cell_bit(2, 3)]), 13)
+        for bit, indices in enumerate(LINES_THROUGH):
+            for index in indices:
+                self.assertTrue(LINE_MASKS[index] >> bit & 1)
+        self.assertEqual(sum(map(len, LINES_THROUGH)), 4 * 69)
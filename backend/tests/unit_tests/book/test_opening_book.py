@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.book.opening_book import (
+    BookEntry,
+    OpeningBook,
+    book_key,
+    get_opening_book,
+    write_opening_book,
+)
+from src.heuristic.count_pieces_heuristic import CountPiecesHeuristic
+from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
+from src.heuristic.ntuple_heuristic import NTupleHeuristic
+from src.solver import MinimaxAlphaBetaPruningSolver
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "test.book"
+        self.solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=CountPositionsHeuristic(), depth=2
+        )
+
+        # the empty board and the position after a move in column 1
+        self.board = ConnectFourBoard()
+        self.played = ConnectFourBoard()
+        self.played.make_move(Move(col=1, row=5), PieceEnum.HUMAN)
+        entries = [
+            self._label(self.board, PieceEnum.HUMAN),
+            self._label(self.played, PieceEnum.CPU),
+        ]
+        write_opening_book(self.path, entries, max_plies=1, depth=2)
+        self.book = OpeningBook(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _label(self, board: ConnectFourBoard, piece: PieceEnum) -> BookEntry:
+        move = self.solver.solve(board=board, piece=piece)
+        key, mirrored = book_key(board, piece)
+        col = 6 - move.col if mirrored else move.col
+        return BookEntry(key=key, value=self.solver.score, col=col)
+
+    def test_lookup_matches_search(self):
+        entry = self.book.lookup(self.played, PieceEnum.CPU)
+        move = self.solver.solve(board=self.played, piece=PieceEnum.CPU)
+        self.assertEqual(entry.col, move.col)
+        self.assertAlmostEqual(entry.value, self.solver.score, places=3)
+        self.assertEqual(self.book.size, 2)
+        self.assertEqual(self.book.depth, 2)
+
+    def test_lookup_mirrored_and_recolored_position(self):
+        expected = self.book.best_move(self.played, PieceEnum.CPU)
+        mirrored = ConnectFourBoard()
+        mirrored.make_move(Move(col=5, row=5), PieceEnum.CPU)
+        move = self.book.best_move(mirrored, PieceEnum.HUMAN)
+        self.assertEqual(move, Move(col=6 - expected.col, row=expected.row))
+
+    def test_missing_positions(self):
+        self.assertIsNone(self.book.lookup(self.played, PieceEnum.HUMAN))
+        self.played.make_move(Move(col=3, row=5), PieceEnum.CPU)
+        self.assertIsNone(self.book.lookup(self.played, PieceEnum.HUMAN))
+
+    def test_rejects_other_files(self):
+        self.path.write_bytes(b"not a book at all")
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+    def test_solver_plays_book_moves(self):
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=CountPositionsHeuristic(), depth=4, opening_book=self.book
+        )
+        move = solver.solve(board=self.played, piece=PieceEnum.CPU)
+        self.assertEqual(move, self.book.best_move(self.played, PieceEnum.CPU))
+        self.assertEqual(solver.nodes, 0)
+
+    def test_parallel_solver_searches_past_the_book(self):
+        # the workers search without the book, whose mapping cannot be pickled
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=CountPositionsHeuristic(),
+            depth=4,
+            opening_book=self.book,
+            workers=2,
+        )
+        self.played.make_move(Move(col=3, row=5), PieceEnum.CPU)
+        move = solver.solve(board=self.played, piece=PieceEnum.HUMAN)
+        self.assertIn(move, self.played.get_possible_moves())
+        self.assertIs(solver.opening_book, self.book)
+
+    def test_heuristic_first_moves_come_from_the_books(self):
+        for name, heuristic in (
+            ("pieces", CountPiecesHeuristic),
+            ("positions", CountPositionsHeuristic),
+            ("ntuple", NTupleHeuristic),
+        ):
+            move = heuristic.first_move()
+            self.assertEqual(move, get_opening_book(name).first_move())
+            self.assertEqual(move.row, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
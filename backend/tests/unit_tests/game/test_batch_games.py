@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.game import BatchGames, GreedyPolicy, RandomPolicy, SolverPolicy
+from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
+from src.heuristic.ntuple_heuristic import NTupleHeuristic
+from src.solver import MinimaxAlphaBetaPruningSolver
+from src.types.piece_enum import PieceEnum
+
+
+class TestBatchGames(TestCase):
+    def test_matches_games_played_one_by_one(self):
+        games = BatchGames(200)
+        policy = RandomPolicy(seed=0)
+        boards = [ConnectFourBoard() for _ in range(len(games))]
+        winners = [PieceEnum.EMPTY] * len(games)
+        while not games.over.all():
+            cols = policy(games)
+            for index, board in enumerate(boards):
+                if winners[index] or board.is_full():
+                    continue
+                move = board.get_move_from_col(int(cols[index]))
+                if board.is_winning_move(move, games.piece):
+                    winners[index] = games.piece
+                board.make_move(move, games.piece)
+            games.step(cols)
+
+        self.assertEqual(games.winners.tolist(), winners)
+        self.assertEqual(games.plies.tolist(), [len(board.moves) for board in boards])
+        np.testing.assert_array_equal(games.grids(), [board.grid for board in boards])
+
+    def test_legal_moves(self):
+        games = BatchGames(2)
+        for _ in range(6):
+            games.step(np.array([3, 3]))
+        legal = games.legal_moves()
+        self.assertEqual(legal.tolist()[0], [True] * 3 + [False] + [True] * 3)
+
+        with self.assertRaises(ValueError):
+            games.step(np.array([3, 0]))
+
+    def test_finished_games_stop(self):
+        games = BatchGames(2)
+        # the first game is won vertically by HUMAN, the second keeps going
+        for cols in ([0, 0], [1, 1], [0, 2], [1, 3], [0, 0], [1, 1], [0, 2]):
+            games.step(np.array(cols))
+
+        self.assertEqual(games.winners.tolist(), [PieceEnum.HUMAN, PieceEnum.EMPTY])
+        self.assertEqual(games.over.tolist(), [True, False])
+        self.assertEqual(games.plies.tolist(), [7, 7])
+        self.assertFalse(games.legal_moves()[0].any())
+
+        games.step(np.array([6, 6]))
+        self.assertEqual(games.plies.tolist(), [7, 8])
+
+    def test_greedy_beats_random(self):
+        games = BatchGames(500)
+        winners = games.play(
+            GreedyPolicy(CountPositionsHeuristic(), seed=0), RandomPolicy(seed=1)
+        )
+        self.assertGreater(np.mean(winners == PieceEnum.HUMAN), 0.8)
+
+    def test_greedy_needs_batch_scores(self):
+        with self.assertRaises(ValueError):
+            GreedyPolicy(NTupleHeuristic())
+
+    def test_solver_policy(self):
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=CountPositionsHeuristic(), depth=2
+        )
+        games = BatchGames(4)
+        winners = games.play(RandomPolicy(seed=2), SolverPolicy(solver))
+        self.assertTrue(games.over.all())
+        self.assertGreaterEqual(np.sum(winners == PieceEnum.CPU), 3)
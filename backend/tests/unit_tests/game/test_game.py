@@ -62,3 +62,17 @@ class TestGame(TestCase):
         ]
         self.game.sync_state()
         self.assertEqual(self.game.state, "TIE")
+
+    def test_make_move_win_sets_winning_sequence(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[1, 1, 1, 0, 2, 2, 0]]
+        self.game.make_move(Move(col=3, row=5), PieceEnum.HUMAN)
+        self.assertEqual(self.game.state, "WIN")
+        self.assertEqual(
+            self.game.get_winning_sequence(),
+            [Move(row=5, col=c) for c in range(4)],
+        )
+
+    def test_make_move_without_win(self):
+        self.game.make_move(Move(col=3, row=5), PieceEnum.CPU)
+        self.assertEqual(self.game.state, "CONTINUE")
+        self.assertIsNone(self.game.get_winning_sequence())
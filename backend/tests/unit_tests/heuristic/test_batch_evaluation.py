@@ -0,0 +1,43 @@
+import random
+import unittest
+
+import numpy as np
+
+from src.board import ConnectFourBoard
+from src.heuristic.batch_evaluation import stack_boards
+from src.heuristic.count_pieces_heuristic import CountPiecesHeuristic
+from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
+from src.types.piece_enum import PieceEnum
+
+
+class TestBatchEvaluation(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.boards = []
+        for _ in range(500):
+            board = ConnectFourBoard()
+            for ply in range(rng.randrange(43)):
+                board.make_move(
+                    move=rng.choice(board.get_possible_moves()),
+                    piece=PieceEnum(1 + ply % 2),
+                )
+            self.boards.append(board)
+
+    def test_matches_single_evaluation(self):
+        batch = stack_boards(self.boards)
+        self.assertEqual(batch.shape, (500, 6, 7))
+        for heuristic in (CountPiecesHeuristic, CountPositionsHeuristic):
+            for piece in (PieceEnum.HUMAN, PieceEnum.CPU):
+                expected = [heuristic.evaluate(board, piece) for board in self.boards]
+                scores = heuristic.evaluate_batch(batch, piece)
+                self.assertEqual(scores.tolist(), expected)
+        # the random games include won ones
+        self.assertIn(999_999, CountPiecesHeuristic.evaluate_batch(batch, 1).tolist())
+
+    def test_empty_batch(self):
+        batch = np.zeros((0, 6, 7), dtype=np.int8)
+        self.assertEqual(len(CountPositionsHeuristic.evaluate_batch(batch, 1)), 0)
+
+    def test_rejects_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            CountPiecesHeuristic.evaluate_batch(np.zeros((3, 7, 6), np.int8), 1)
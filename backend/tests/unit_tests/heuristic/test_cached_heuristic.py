@@ -0,0 +1,65 @@
+import pickle
+import unittest
+from unittest.mock import patch
+
+from src.board import ConnectFourBoard
+from src.heuristic.cached_heuristic import CachedHeuristic
+from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
+from src.solver import MinimaxAlphaBetaPruningSolver
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+
+class TestCachedHeuristic(unittest.TestCase):
+    def setUp(self):
+        self.heuristic = CountPositionsHeuristic()
+        self.cache = CachedHeuristic(self.heuristic, max_entries=2)
+        self.board = ConnectFourBoard()
+        self.board.make_move(Move(col=3, row=5), PieceEnum.HUMAN)
+
+    def test_scores_are_cached_per_side_to_move(self):
+        with patch.object(
+            self.heuristic, "evaluate", wraps=self.heuristic.evaluate
+        ) as evaluate:
+            human = self.cache.evaluate(self.board, PieceEnum.HUMAN)
+            cpu = self.cache.evaluate(self.board, PieceEnum.CPU)
+            self.assertEqual(self.cache.evaluate(self.board, PieceEnum.HUMAN), human)
+        self.assertEqual(evaluate.call_count, 2)
+        self.assertEqual(human, self.heuristic.evaluate(self.board, PieceEnum.HUMAN))
+        self.assertEqual(cpu, self.heuristic.evaluate(self.board, PieceEnum.CPU))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertAlmostEqual(self.cache.hit_rate(), 1 / 3)
+
+    def test_least_recently_used_score_is_evicted(self):
+        self.cache.evaluate(self.board, PieceEnum.HUMAN)
+        self.cache.evaluate(self.board, PieceEnum.CPU)
+        # HUMAN becomes the most recently used, so CPU goes first
+        self.cache.evaluate(self.board, PieceEnum.HUMAN)
+        self.board.make_move(Move(col=3, row=4), PieceEnum.CPU)
+        self.cache.evaluate(self.board, PieceEnum.HUMAN)
+        self.board.undo_move()
+
+        self.assertEqual(self.cache.stats()["entries"], 2)
+        self.assertIsNotNone(self.cache.lookup(self.board, PieceEnum.HUMAN))
+        self.assertIsNone(self.cache.lookup(self.board, PieceEnum.CPU))
+
+    def test_copies_start_empty(self):
+        self.cache.evaluate(self.board, PieceEnum.HUMAN)
+        copy = pickle.loads(pickle.dumps(self.cache))
+        self.assertEqual(copy.stats()["entries"], 0)
+        self.assertEqual(copy.max_entries, 2)
+
+    def test_solver_with_cache_plays_the_same(self):
+        board = ConnectFourBoard()
+        board.state = [[0] * 7 for _ in range(4)] + [
+            [0, 0, 1, 2, 0, 0, 0],
+            [0, 1, 2, 1, 2, 0, 0],
+        ]
+        plain = MinimaxAlphaBetaPruningSolver(heuristic=self.heuristic, depth=5)
+        cache = CachedHeuristic(self.heuristic)
+        cached = MinimaxAlphaBetaPruningSolver(heuristic=cache, depth=5)
+        for piece in (PieceEnum.CPU, PieceEnum.HUMAN):
+            move = plain.solve(board=board, piece=piece)
+            self.assertEqual(cached.solve(board=board, piece=piece), move)
+            self.assertEqual(cached.score, plain.score)
+        self.assertGreater(cache.hits, 0)
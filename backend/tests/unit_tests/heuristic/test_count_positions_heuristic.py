@@ -1,3 +1,4 @@
+import random
 import unittest
 
 from src.board import ConnectFourBoard
@@ -98,3 +99,18 @@ class TestCountPositionsHeuristic(unittest.TestCase):
             [2, 2, 2, 0, 0, 0, 0],
         ]
         self.assertEqual(self.heuristic.evaluate(self.board, PieceEnum.CPU), 101002.5)
+
+    def test_evaluate_matches_sum_of_terms(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            board = ConnectFourBoard()
+            for ply in range(rng.randrange(43)):
+                move = rng.choice(board.get_possible_moves())
+                board.make_move(move=move, piece=PieceEnum(1 + ply % 2))
+            for piece in (PieceEnum.HUMAN, PieceEnum.CPU):
+                board.winning_sequence = None
+                expected = self.heuristic._evaluate_terms(board, piece)
+                sequence = board.winning_sequence
+                board.winning_sequence = None
+                self.assertEqual(self.heuristic.evaluate(board, piece), expected)
+                self.assertEqual(board.winning_sequence, sequence)
@@ -0,0 +1,74 @@
+import random
+import unittest
+from unittest.mock import patch
+
+from src.board import ConnectFourBoard
+from src.board.layout import cell_bit
+from src.heuristic.count_pieces_heuristic import CountPiecesHeuristic
+from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
+from src.heuristic.incremental_evaluator import IncrementalEvaluator
+from src.solver import MinimaxAlphaBetaPruningSolver, NegamaxSolver
+from src.types.piece_enum import PieceEnum
+
+HEURISTICS = (CountPiecesHeuristic,)
+
+
+def random_board(rng: random.Random, plies: int) -> ConnectFourBoard:
+    board = ConnectFourBoard()
+    for ply in range(plies):
+        moves = board.get_possible_moves()
+        board.make_move(move=rng.choice(moves), piece=PieceEnum(1 + ply % 2))
+    # start from a state, like the API does
+    return ConnectFourBoard(initial_state=board.state)
+
+
+@patch.object(IncrementalEvaluator, "check", True)
+class TestIncrementalEvaluator(unittest.TestCase):
+    def test_matches_full_evaluation_through_moves_and_undos(self):
+        rng = random.Random(0)
+        for heuristic_cls in HEURISTICS:
+            for _ in range(50):
+                board = random_board(rng, rng.randrange(12))
+                evaluator = IncrementalEvaluator(heuristic_cls(), board)
+                for _ in range(30):
+                    moves = board.get_possible_moves()
+                    if moves and (not board.moves or rng.random() < 0.6):
+                        piece = PieceEnum(1 + board.mask.bit_count() % 2)
+                        board.make_move(move=rng.choice(moves), piece=piece)
+                    elif board.moves:
+                        board.undo_move()
+                    for piece in (PieceEnum.HUMAN, PieceEnum.CPU):
+                        evaluator.evaluate(board, piece)
+
+    def test_check_catches_a_drift(self):
+        board = ConnectFourBoard()
+        evaluator = IncrementalEvaluator(CountPiecesHeuristic(), board)
+        # two pieces the board does not have
+        evaluator.on_move(cell_bit(5, 3), PieceEnum.HUMAN)
+        evaluator.on_move(cell_bit(5, 4), PieceEnum.HUMAN)
+        with self.assertRaises(RuntimeError):
+            evaluator.evaluate(board, PieceEnum.HUMAN)
+
+    def test_solvers_match_full_evaluation(self):
+        rng = random.Random(2)
+        for heuristic_cls in HEURISTICS:
+            for solver_cls in (MinimaxAlphaBetaPruningSolver, NegamaxSolver):
+                board = random_board(rng, 6)
+                results = []
+                for incremental in (True, False):
+                    solver = solver_cls(
+                        heuristic=heuristic_cls(),
+                        depth=4,
+                        incremental_evaluation=incremental,
+                    )
+                    move = solver.solve(board=board, piece=PieceEnum.HUMAN)
+                    results.append((move, solver.score, solver.nodes))
+                self.assertEqual(results[0], results[1])
+
+    def test_solvers_evaluate_other_heuristics_from_scratch(self):
+        # CountPositionsHeuristic is cheaper to evaluate from scratch
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=CountPositionsHeuristic(), depth=2
+        )
+        solver.solve(board=random_board(random.Random(3), 4), piece=PieceEnum.HUMAN)
+        self.assertIsNone(solver._evaluator)
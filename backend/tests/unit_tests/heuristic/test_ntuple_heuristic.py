@@ -0,0 +1,106 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.board import ConnectFourBoard
+from src.board.lines import LINE_MASKS
+from src.heuristic.ntuple_heuristic import NTupleHeuristic
+from src.heuristic.ntuple_tables import (
+    TABLES_PATH,
+    TUPLES,
+    pattern_index,
+    read_ntuple_tables,
+    write_ntuple_tables,
+)
+from src.types.piece_enum import PieceEnum
+
+
+class TestNTupleTables(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "test.tables"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_every_line_lies_in_a_tuple(self):
+        tuple_masks = [sum(1 << bit for bit in cells) for cells in TUPLES]
+        for mask in LINE_MASKS:
+            self.assertTrue(any(mask & other == mask for other in tuple_masks))
+
+    def test_round_trip(self):
+        rng = np.random.default_rng(0)
+        weights = [rng.integers(-500, 500, 3 ** len(cells)) for cells in TUPLES]
+        write_ntuple_tables(self.path, TUPLES, weights)
+
+        tuples, loaded = read_ntuple_tables(self.path)
+        self.assertEqual(tuples, TUPLES)
+        for table, expected in zip(loaded, weights):
+            np.testing.assert_array_equal(table, expected)
+
+    def test_rejects_wrong_table_size(self):
+        with self.assertRaises(ValueError):
+            write_ntuple_tables(self.path, TUPLES[:1], [np.zeros(3)])
+
+    def test_rejects_other_files(self):
+        self.path.write_bytes(b"not a table file")
+        with self.assertRaises(ValueError):
+            read_ntuple_tables(self.path)
+
+
+class TestNTupleHeuristic(unittest.TestCase):
+    def setUp(self):
+        self.heuristic = NTupleHeuristic()
+        self.board = ConnectFourBoard()
+
+    def test_evaluate_sums_one_weight_per_tuple(self):
+        tuples, weights = read_ntuple_tables(TABLES_PATH)
+        rng = random.Random(0)
+        for _ in range(200):
+            self.board.state = [[0] * 7 for _ in range(6)]
+            piece = PieceEnum.HUMAN
+            for _ in range(rng.randrange(30)):
+                move = rng.choice(self.board.get_possible_moves())
+                if self.board.is_winning_move(move, piece):
+                    break
+                self.board.make_move(move, piece)
+                piece = PieceEnum(3 - piece)
+
+            own = self.board.bitboards[piece]
+            opponent = self.board.bitboards[3 - piece]
+            expected = sum(
+                int(table[pattern_index(own, opponent, cells)])
+                for cells, table in zip(tuples, weights)
+            )
+            self.assertEqual(self.heuristic.evaluate(self.board, piece), expected)
+
+    def test_evaluate_win(self):
+        self.board.state = [
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [2, 2, 2, 0, 0, 0, 0],
+            [1, 1, 1, 1, 0, 0, 0],
+        ]
+        self.assertEqual(self.heuristic.evaluate(self.board, PieceEnum.HUMAN), 999_999)
+
+    def test_prefers_an_open_three(self):
+        self.board.state = [
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 2, 1, 1, 1, 0, 2],
+        ]
+        human = self.heuristic.evaluate(self.board, PieceEnum.HUMAN)
+        self.assertGreater(human, 0)
+        self.assertGreater(human, self.heuristic.evaluate(self.board, PieceEnum.CPU))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import time
+import unittest
+
+import numpy as np
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.solver import MCTSSolver
+from src.solver.mcts_solver import play_out
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+
+class TestPlayOut(unittest.TestCase):
+    def test_tactical_playouts_take_a_win(self):
+        board = ConnectFourBoard()
+        board.state = [
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [1, 1, 1, 0, 2, 2, 0],
+        ]
+        positions = np.full(100, board.bitboards[PieceEnum.HUMAN], dtype=np.uint64)
+        masks = np.full(100, board.mask, dtype=np.uint64)
+        rng = np.random.default_rng(0)
+
+        self.assertTrue((play_out(positions, masks, rng) == 1).all())
+        # random playouts miss the win some of the time
+        self.assertLess(play_out(positions, masks, rng, tactical=False).mean(), 1)
+
+    def test_full_board_is_a_draw(self):
+        board = ConnectFourBoard()
+        board.state = [
+            [1, 1, 2, 2, 1, 1, 2] if row % 2 else [2, 2, 1, 1, 2, 2, 1]
+            for row in range(6)
+        ]
+        results = play_out(
+            np.array([board.bitboards[PieceEnum.HUMAN]], dtype=np.uint64),
+            np.array([board.mask], dtype=np.uint64),
+            np.random.default_rng(0),
+        )
+        self.assertEqual(results.tolist(), [0])
+
+
+class TestMCTSSolver(unittest.TestCase):
+    def setUp(self):
+        self.board = ConnectFourBoard()
+
+    def test_needs_a_budget(self):
+        with self.assertRaises(ValueError):
+            MCTSSolver(iterations=None, time_budget_ms=None)
+
+    def test_plays_a_winning_move(self):
+        self.board.state = [
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 2, 0, 0, 0, 0, 0],
+            [0, 2, 0, 0, 0, 0, 0],
+            [0, 2, 1, 1, 1, 0, 0],
+        ]
+        move = MCTSSolver(seed=0).solve(self.board, PieceEnum.CPU)
+        self.assertEqual(move, Move(col=1, row=2))
+
+    def test_blocks_a_threat(self):
+        self.board.state = [
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 1, 1, 1, 2, 2],
+        ]
+        for tactical in (True, False):
+            solver = MCTSSolver(iterations=500, tactical=tactical, seed=0)
+            move = solver.solve(self.board, PieceEnum.CPU)
+            self.assertEqual(move, Move(col=1, row=5))
+
+    def test_reports_the_search(self):
+        solver = MCTSSolver(iterations=64, leaves_per_batch=16, playouts_per_leaf=4)
+        solver.solve(self.board, PieceEnum.HUMAN)
+        self.assertEqual(solver.search_info.mode, "mcts")
+        self.assertEqual(solver.nodes, 64 * 4)
+        self.assertGreaterEqual(solver.search_info.depth, 2)
+        self.assertIsNone(solver.evaluation)
+
+    def test_reuses_the_tree_of_the_last_search(self):
+        solver = MCTSSolver(iterations=64, playouts_per_leaf=4, seed=0)
+        move = solver.solve(self.board, PieceEnum.CPU)
+        self.board.make_move(move, PieceEnum.CPU)
+        self.board.make_move(self.board.get_move_from_col(3), PieceEnum.HUMAN)
+
+        solver.solve(self.board, PieceEnum.CPU)
+        # the playouts already run below the new root count as well
+        self.assertGreater(solver._root.visits, 64 * 4)
+        self.assertIsNone(solver._root.parent)
+
+    def test_analysis_scores_every_column(self):
+        solver = MCTSSolver(iterations=200, seed=0)
+        move, scores = solver.analyze(self.board, PieceEnum.CPU)
+        self.assertIn(move, self.board.get_possible_moves())
+        self.assertTrue(all(-1 <= score <= 1 for score in scores))
+
+        self.board.state = [[0] * 7 for _ in range(5)] + [[2, 2, 2, 0, 1, 1, 0]]
+        move, scores = solver.analyze(self.board, PieceEnum.CPU)
+        self.assertEqual(move, Move(col=3, row=5))
+        self.assertEqual(scores, [None, None, None, 1.0, None, None, None])
+
+    def test_stops_at_the_time_budget(self):
+        solver = MCTSSolver(iterations=None, time_budget_ms=100)
+        start = time.perf_counter()
+        move = solver.solve(self.board, PieceEnum.HUMAN)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIn(move, self.board.get_possible_moves())
+
+    def test_full_board(self):
+        self.board.state = [
+            [1, 1, 2, 2, 1, 1, 2] if row % 2 else [2, 2, 1, 1, 2, 2, 1]
+            for row in range(6)
+        ]
+        self.assertIsNone(MCTSSolver().solve(self.board, PieceEnum.HUMAN))
+
+
+if __name__ == "__main__":
+    unittest.main()
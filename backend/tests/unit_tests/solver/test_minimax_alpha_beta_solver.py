@@ -1,11 +1,27 @@
+import itertools
+import threading
 import unittest
+from math import inf
+from time import perf_counter
+from unittest.mock import patch
 
 from src.board.connect_four_board import ConnectFourBoard
 from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
 from src.solver import MinimaxAlphaBetaPruningSolver
+from src.solver.move_ordering import MoveOrdering
 from src.types.move import Move
 from src.types.piece_enum import PieceEnum
 
+# 16 empty cells, the first player to move wins with (2, 2)
+ENDGAME_STATE = [
+    [0, 0, 0, 0, 1, 0, 0],
+    [0, 0, 0, 0, 2, 1, 2],
+    [0, 0, 0, 0, 1, 1, 2],
+    [0, 0, 1, 2, 2, 2, 1],
+    [2, 2, 2, 1, 1, 1, 2],
+    [2, 1, 1, 2, 1, 1, 2],
+]
+
 
 class TestMinimaxAlphaBetaSolverComprehensive(unittest.TestCase):
     def setUp(self):
@@ -54,3 +70,226 @@ class TestMinimaxAlphaBetaSolverComprehensive(unittest.TestCase):
         # Max player should block at column 3
         expected_move = Move(col=3, row=5)
         self.assertEqual(move, expected_move)
+
+    def test_solver_leaves_board_unchanged(self):
+        self.board.state = [[0] * 7 for _ in range(4)] + [
+            [0, 0, 1, 2, 0, 0, 0],
+            [0, 1, 2, 1, 2, 0, 0],
+        ]
+        before = [row[:] for row in self.board.state]
+        self.solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(self.board.state, before)
+        self.assertEqual(self.board.moves, [])
+        self.assertIsNone(self.board.winning_sequence)
+
+    def test_transposition_table_keeps_move_and_saves_nodes(self):
+        self.board.state = [[0] * 7 for _ in range(4)] + [
+            [0, 0, 1, 2, 0, 0, 0],
+            [0, 1, 2, 1, 2, 0, 0],
+        ]
+        plain = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=4, tt_size_mb=None
+        )
+        cached = MinimaxAlphaBetaPruningSolver(heuristic=self.heuristic, depth=4)
+        self.assertEqual(
+            plain.solve(board=self.board, piece=PieceEnum.CPU),
+            cached.solve(board=self.board, piece=PieceEnum.CPU),
+        )
+        self.assertLess(cached.nodes, plain.nodes)
+        self.assertGreater(cached.transposition_table.hits, 0)
+
+    def test_iterative_deepening_respects_time_budget(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[0, 0, 1, 2, 0, 0, 0]]
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=42, time_budget_ms=200
+        )
+        # every reading of the clock takes 10 ms, so the budget runs out after 20
+        clock = itertools.count(step=0.01)
+        with patch(
+            "src.solver.minimax_alpha_beta_solver.perf_counter",
+            side_effect=lambda: next(clock),
+        ) as perf_counter:
+            move = solver.solve(board=self.board, piece=PieceEnum.CPU)
+
+        self.assertIn(move, self.board.get_possible_moves())
+        self.assertGreaterEqual(solver.completed_depth, 1)
+        self.assertLess(solver.completed_depth, 42)
+        self.assertLessEqual(perf_counter.call_count, 22)
+        self.assertEqual(solver.principal_variation[0], move)
+        self.assertEqual(self.board.moves, [])
+
+    def test_reports_every_iteration(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[0, 0, 1, 2, 0, 0, 0]]
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=3, time_budget_ms=60_000
+        )
+        progress = []
+        solver.on_iteration = progress.append
+        move = solver.solve(board=self.board, piece=PieceEnum.CPU)
+
+        self.assertEqual([report.depth for report in progress], [1, 2, 3])
+        self.assertEqual(progress[-1].move, move)
+        self.assertEqual(progress[-1].score, solver.score)
+        self.assertEqual(progress[-1].nodes, solver.nodes)
+
+    def test_analysis_scores_columns_one_ply_deeper(self):
+        self.board.state = [[0] * 7 for _ in range(4)] + [
+            [0, 0, 0, 2, 1, 0, 0],
+            [0, 1, 2, 1, 2, 0, 0],
+        ]
+        solver = MinimaxAlphaBetaPruningSolver(heuristic=self.heuristic, depth=3)
+        move, scores = solver.analyze(board=self.board, piece=PieceEnum.CPU)
+
+        deeper = MinimaxAlphaBetaPruningSolver(heuristic=self.heuristic, depth=4)
+        self.assertEqual(move, deeper.solve(board=self.board, piece=PieceEnum.CPU))
+        self.assertEqual(max(scores), deeper.score)
+        self.assertEqual(self.board.moves, [])
+
+    def test_analysis_scores_a_win(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[2, 2, 2, 0, 1, 1, 0]]
+        solver = MinimaxAlphaBetaPruningSolver(heuristic=self.heuristic, depth=2)
+        move, scores = solver.analyze(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(move, Move(col=3, row=5))
+        self.assertEqual(scores[3], 999_999)
+
+    def test_stop_event_ends_the_search(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[0, 0, 1, 2, 0, 0, 0]]
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=42, time_budget_ms=60_000
+        )
+        solver.stop_event = threading.Event()
+        solver.stop_event.set()
+        move = solver.solve(board=self.board, piece=PieceEnum.CPU)
+
+        # the first iteration always completes
+        self.assertIn(move, self.board.get_possible_moves())
+        self.assertEqual(solver.completed_depth, 1)
+        self.assertEqual(self.board.moves, [])
+
+    def test_stop_event_ends_a_search_without_a_time_budget(self):
+        solver = MinimaxAlphaBetaPruningSolver(heuristic=self.heuristic, depth=42)
+        solver.stop_event = threading.Event()
+        solver.stop_event.set()
+        self.assertIsNone(solver.solve(board=self.board, piece=PieceEnum.CPU))
+        self.assertEqual(self.board.moves, [])
+
+    def test_iterative_deepening_matches_fixed_depth(self):
+        self.board.state = [[0] * 7 for _ in range(4)] + [
+            [0, 0, 1, 2, 0, 0, 0],
+            [0, 1, 2, 1, 2, 0, 0],
+        ]
+        deepening = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=3, time_budget_ms=60_000
+        )
+        fixed = MinimaxAlphaBetaPruningSolver(heuristic=self.heuristic, depth=3)
+        move = deepening.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(deepening.completed_depth, 3)
+        self.assertEqual(len(deepening.principal_variation), 3)
+        self.assertEqual(move, fixed.solve(board=self.board, piece=PieceEnum.CPU))
+
+    def test_iterative_deepening_takes_immediate_win(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[2, 2, 2, 0, 1, 1, 0]]
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=42, time_budget_ms=100
+        )
+        move = solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(move, Move(col=3, row=5))
+        self.assertEqual(solver.completed_depth, 1)
+
+    def test_move_ordering_keeps_value_and_saves_nodes(self):
+        self.board.state = [[0] * 7 for _ in range(4)] + [
+            [0, 0, 1, 2, 0, 0, 0],
+            [0, 1, 2, 1, 2, 0, 0],
+        ]
+        plain = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=4, tt_size_mb=None
+        )
+        ordered = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=4, move_ordering=MoveOrdering()
+        )
+        values = [
+            solver.minimax_alpha_beta_pruning(
+                board=self.board,
+                depth=4,
+                alpha=-inf,
+                beta=inf,
+                max_player=True,
+                piece=PieceEnum.CPU,
+            )[0]
+            for solver in (plain, ordered)
+        ]
+        self.assertEqual(values[0], values[1])
+        self.assertLess(ordered.nodes, plain.nodes)
+
+    def test_parallel_search_matches_serial(self):
+        self.board.state = [[0] * 7 for _ in range(4)] + [
+            [0, 0, 1, 2, 0, 0, 0],
+            [0, 1, 2, 1, 2, 0, 0],
+        ]
+        serial = MinimaxAlphaBetaPruningSolver(heuristic=self.heuristic, depth=4)
+        parallel = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=4, workers=2
+        )
+        for piece in (PieceEnum.CPU, PieceEnum.HUMAN):
+            move = serial.solve(board=self.board, piece=piece)
+            self.assertEqual(parallel.solve(board=self.board, piece=piece), move)
+            self.assertEqual(parallel.score, serial.score)
+            # workers lose the shared table, but not more than that
+            self.assertLess(parallel.nodes, 2 * serial.nodes)
+        self.assertEqual(self.board.moves, [])
+
+    def test_stop_event_ends_a_parallel_search(self):
+        # the first root move, searched before the pool starts, loses at once, so
+        # the stop arrives while the pool searches the other root moves
+        self.board.state = [[0] * 7 for _ in range(3)] + [
+            [0, 2, 2, 0, 0, 0, 0],
+            [0, 1, 1, 1, 2, 0, 0],
+            [0, 2, 1, 2, 1, 0, 0],
+        ]
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=14, tt_size_mb=None, workers=2
+        )
+        solver.stop_event = threading.Event()
+        stopper = threading.Timer(1, solver.stop_event.set)
+        stopper.start()
+        start = perf_counter()
+        self.assertIsNone(solver.solve(board=self.board, piece=PieceEnum.CPU))
+        self.assertLess(perf_counter() - start, 5)
+        self.assertEqual(self.board.moves, [])
+
+    def test_endgame_is_solved_exactly(self):
+        self.board.state = ENDGAME_STATE
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=4, endgame_empty_cells=20
+        )
+        with patch.object(
+            self.heuristic, "evaluate", wraps=self.heuristic.evaluate
+        ) as evaluate:
+            move = solver.solve(board=self.board, piece=PieceEnum.HUMAN)
+        evaluate.assert_not_called()
+        self.assertEqual(move, Move(col=2, row=2))
+        self.assertEqual(solver.evaluation.outcome, "win")
+        self.assertEqual(solver.search_info.mode, "exact")
+        self.assertEqual(solver.search_info.depth, 16)
+
+    def test_endgame_threshold_is_exclusive(self):
+        self.board.state = ENDGAME_STATE
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic, depth=4, endgame_empty_cells=16
+        )
+        solver.solve(board=self.board, piece=PieceEnum.HUMAN)
+        self.assertIsNone(solver.evaluation)
+        self.assertEqual(solver.search_info.mode, "heuristic")
+
+    def test_endgame_falls_back_to_heuristic_search_out_of_time(self):
+        solver = MinimaxAlphaBetaPruningSolver(
+            heuristic=self.heuristic,
+            depth=4,
+            time_budget_ms=1,
+            endgame_empty_cells=43,
+        )
+        move = solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertIsNotNone(move)
+        self.assertIsNone(solver.evaluation)
+        self.assertEqual(solver.search_info.mode, "heuristic")
+        self.assertGreaterEqual(solver.search_info.depth, 1)
@@ -0,0 +1,59 @@
+import unittest
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.solver.move_ordering import CENTER_FIRST, LEFT_TO_RIGHT, MoveOrdering
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+
+class TestMoveOrdering(unittest.TestCase):
+    def setUp(self):
+        self.board = ConnectFourBoard()
+
+    def test_static_orders(self):
+        self.assertEqual(CENTER_FIRST, (3, 2, 4, 1, 5, 0, 6))
+        plain = MoveOrdering(center_first=False, history=False)
+        self.assertEqual(
+            list(plain.order(self.board, PieceEnum.CPU, ply=0)), list(LEFT_TO_RIGHT)
+        )
+
+    def test_pv_then_tt_then_killers(self):
+        ordering = MoveOrdering(history=False)
+        ordering.on_cutoff(self.board, PieceEnum.CPU, ply=2, col=6, depth=1)
+        order = ordering.order(self.board, PieceEnum.CPU, ply=2, pv_col=0, tt_col=5)
+        self.assertEqual(order[:3], [0, 5, 6])
+        self.assertCountEqual(order, range(7))
+
+    def test_killers_are_per_ply(self):
+        ordering = MoveOrdering(history=False)
+        ordering.on_cutoff(self.board, PieceEnum.CPU, ply=1, col=0, depth=1)
+        ordering.on_cutoff(self.board, PieceEnum.CPU, ply=1, col=6, depth=1)
+        self.assertEqual(ordering.order(self.board, PieceEnum.CPU, ply=1)[:2], [6, 0])
+        self.assertEqual(
+            list(ordering.order(self.board, PieceEnum.CPU, ply=3)), list(CENTER_FIRST)
+        )
+
+    def test_history_orders_remaining_moves(self):
+        ordering = MoveOrdering(killers=False)
+        ordering.on_cutoff(self.board, PieceEnum.HUMAN, ply=0, col=6, depth=3)
+        self.assertEqual(ordering.order(self.board, PieceEnum.HUMAN, ply=5)[0], 6)
+        # the history is kept per piece
+        self.assertEqual(ordering.order(self.board, PieceEnum.CPU, ply=5)[0], 3)
+
+    def test_history_is_per_cell(self):
+        ordering = MoveOrdering(killers=False)
+        ordering.on_cutoff(self.board, PieceEnum.HUMAN, ply=0, col=6, depth=3)
+        self.board.make_move(Move(col=6, row=5), PieceEnum.CPU)
+        self.assertEqual(ordering.order(self.board, PieceEnum.HUMAN, ply=0)[0], 3)
+
+    def test_new_search_clears_killers(self):
+        ordering = MoveOrdering(history=False)
+        ordering.on_cutoff(self.board, PieceEnum.CPU, ply=0, col=6, depth=1)
+        ordering.new_search()
+        self.assertEqual(
+            list(ordering.order(self.board, PieceEnum.CPU, ply=0)), list(CENTER_FIRST)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
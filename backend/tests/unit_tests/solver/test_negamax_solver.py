@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.heuristic.count_positions_heuristic import CountPositionsHeuristic
+from src.solver import MinimaxAlphaBetaPruningSolver, NegamaxSolver
+from src.solver.move_ordering import MoveOrdering
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+
+def random_position(rng: random.Random) -> tuple[ConnectFourBoard, PieceEnum]:
+    board = ConnectFourBoard()
+    piece = PieceEnum.HUMAN
+    for _ in range(rng.randint(2, 20)):
+        move = rng.choice(board.get_possible_moves())
+        if board.is_winning_move(move, piece):
+            break
+        board.make_move(move, piece)
+        piece = PieceEnum(3 - piece.value)
+    return ConnectFourBoard(initial_state=board.state), piece
+
+
+class TestNegamaxSolver(unittest.TestCase):
+    def setUp(self):
+        self.heuristic = CountPositionsHeuristic()
+        self.solver = NegamaxSolver(heuristic=self.heuristic, depth=2)
+        self.board = ConnectFourBoard()
+
+    def test_winning_move(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[2, 2, 2, 0, 1, 1, 0]]
+        move = self.solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(move, Move(col=3, row=5))
+
+    def test_blocking_move(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[1, 1, 1, 0, 2, 0, 0]]
+        move = self.solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(move, Move(col=3, row=5))
+
+    def test_full_board(self):
+        self.board.state = [
+            [2, 1] * 3 + [2] if r % 2 else [1, 2] * 3 + [1] for r in range(6)
+        ]
+        self.assertIsNone(self.solver.solve(board=self.board, piece=PieceEnum.CPU))
+
+    def test_same_score_as_minimax(self):
+        rng = random.Random(0)
+        for _ in range(10):
+            board, piece = random_position(rng)
+            minimax = MinimaxAlphaBetaPruningSolver(heuristic=self.heuristic, depth=3)
+            negamax = NegamaxSolver(
+                heuristic=self.heuristic, depth=3, move_ordering=MoveOrdering()
+            )
+            minimax.solve(board=board, piece=piece)
+            negamax.solve(board=board, piece=piece)
+            self.assertEqual(minimax.score, negamax.score)
+            self.assertEqual(board.moves, [])
+
+    def test_without_aspiration_window(self):
+        rng = random.Random(1)
+        board, piece = random_position(rng)
+        scores = set()
+        for window in (None, 1, 50):
+            solver = NegamaxSolver(
+                heuristic=self.heuristic, depth=3, aspiration_window=window
+            )
+            solver.solve(board=board, piece=piece)
+            scores.add(solver.score)
+        self.assertEqual(len(scores), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
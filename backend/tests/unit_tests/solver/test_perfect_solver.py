@@ -0,0 +1,190 @@
+import random
+import threading
+import unittest
+
+from src.board.connect_four_board import ConnectFourBoard
+from src.solver import PerfectSolver
+from src.solver.perfect_solver import CELLS, score_to_plies
+from src.types.move import Move
+from src.types.piece_enum import PieceEnum
+
+
+def exact_score(
+    board: ConnectFourBoard, piece: PieceEnum, cache: dict | None = None
+) -> int:
+    # plain full-depth negamax with the same scores as the solver
+    cache = {} if cache is None else cache
+    if (board.key, piece) in cache:
+        return cache[board.key, piece]
+
+    moves = board.get_possible_moves()
+    if not moves:
+        return 0
+    for move in moves:
+        if board.is_winning_move(move, piece):
+            return (CELLS + 1 - board.mask.bit_count()) // 2
+
+    best = -CELLS
+    for move in moves:
+        board.make_move(move, piece)
+        best = max(best, -exact_score(board, PieceEnum(3 - piece.value), cache))
+        board.undo_move()
+    cache[board.key, piece] = best
+    return best
+
+
+def late_position(rng: random.Random) -> tuple[ConnectFourBoard, PieceEnum]:
+    # a position nobody has won yet, with few enough empty cells to brute-force
+    while True:
+        board = ConnectFourBoard()
+        piece = PieceEnum.HUMAN
+        for _ in range(34):
+            moves = [
+                move
+                for move in board.get_possible_moves()
+                if not board.is_winning_move(move, piece)
+            ]
+            if not moves:
+                break
+            board.make_move(rng.choice(moves), piece)
+            piece = PieceEnum(3 - piece.value)
+        else:
+            return ConnectFourBoard(initial_state=board.state), piece
+
+
+class TestPerfectSolver(unittest.TestCase):
+    def setUp(self):
+        self.solver = PerfectSolver(tt_size_mb=1)
+        self.board = ConnectFourBoard()
+
+    def test_winning_move(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[2, 2, 2, 0, 1, 1, 0]]
+        move = self.solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(move, Move(col=3, row=5))
+        self.assertEqual(self.solver.evaluation.outcome, "win")
+        self.assertEqual(self.solver.evaluation.plies_to_end, 1)
+
+    def test_blocking_move(self):
+        self.board.state = [[0] * 7 for _ in range(5)] + [[1, 1, 1, 0, 2, 0, 0]]
+        solver = PerfectSolver(tt_size_mb=1, time_budget_ms=100)
+        move = solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(move, Move(col=3, row=5))
+
+    def test_blocks_when_out_of_time(self):
+        for row in (5, 4, 3):
+            self.board.make_move(Move(col=0, row=row), PieceEnum.HUMAN)
+        self.board.make_move(Move(col=3, row=5), PieceEnum.CPU)
+        self.board.make_move(Move(col=4, row=5), PieceEnum.CPU)
+        solver = PerfectSolver(tt_size_mb=1, time_budget_ms=1)
+        move = solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(move, Move(col=0, row=2))
+
+    def test_lost_position(self):
+        # the human threatens both ends of an open three
+        self.board.state = [[0] * 7 for _ in range(4)] + [
+            [0, 0, 2, 2, 0, 0, 0],
+            [0, 0, 1, 1, 1, 0, 0],
+        ]
+        self.solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertEqual(self.solver.evaluation.outcome, "loss")
+        self.assertEqual(self.solver.evaluation.plies_to_end, 2)
+
+    def test_full_board(self):
+        self.board.state = [
+            [2, 1] * 3 + [2] if r % 2 else [1, 2] * 3 + [1] for r in range(6)
+        ]
+        self.assertIsNone(self.solver.solve(board=self.board, piece=PieceEnum.CPU))
+        self.assertIsNone(self.solver.evaluation)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        for _ in range(10):
+            board, piece = late_position(rng)
+            expected = exact_score(board, piece)
+            move = self.solver.solve(board=board, piece=piece)
+            self.assertEqual(self.solver.score, expected)
+            self.assertEqual(self.solver.evaluate(board=board, piece=piece), expected)
+            self.assertEqual(board.moves, [])
+
+            # the chosen move keeps the score
+            board.make_move(move, piece)
+            if not board.last_move_wins(move):
+                self.assertEqual(
+                    -exact_score(board, PieceEnum(3 - piece.value)), expected
+                )
+            board.undo_move()
+
+    def test_analysis_scores_every_column_exactly(self):
+        rng = random.Random(1)
+        for _ in range(5):
+            board, piece = late_position(rng)
+            move, scores = self.solver.analyze(board=board, piece=piece)
+            for col in range(7):
+                child = board.get_move_from_col(col)
+                if child is None:
+                    self.assertIsNone(scores[col])
+                    continue
+                board.make_move(child, piece)
+                expected = (
+                    (CELLS + 2 - board.mask.bit_count()) // 2
+                    if board.last_move_wins(child)
+                    else -exact_score(board, PieceEnum(3 - piece.value))
+                )
+                board.undo_move()
+                self.assertEqual(scores[col], expected)
+            self.assertEqual(scores[move.col], exact_score(board, piece))
+            self.assertEqual(board.moves, [])
+
+    def test_weak_solver_keeps_outcome(self):
+        rng = random.Random(1)
+        weak = PerfectSolver(weak=True, tt_size_mb=1)
+        for _ in range(10):
+            board, piece = late_position(rng)
+            self.solver.solve(board=board, piece=piece)
+            weak.solve(board=board, piece=piece)
+            self.assertEqual(weak.evaluation.outcome, self.solver.evaluation.outcome)
+            self.assertIsNone(weak.evaluation.plies_to_end)
+            self.assertIn(weak.score, (-1, 0, 1))
+
+    def test_plies_to_end_matches_perfect_play(self):
+        board, piece = late_position(random.Random(2))
+        self.solver.solve(board=board, piece=piece)
+        expected = self.solver.evaluation.plies_to_end
+
+        plies = 0
+        while (move := self.solver.solve(board=board, piece=piece)) is not None:
+            board.make_move(move, piece)
+            plies += 1
+            if board.last_move_wins(move):
+                break
+            piece = PieceEnum(3 - piece.value)
+        self.assertEqual(plies, expected)
+
+    def test_score_to_plies(self):
+        # first player winning with its last stone on an empty board
+        self.assertEqual(score_to_plies(1, 0), 41)
+        self.assertEqual(score_to_plies(-1, 0), 42)
+        self.assertEqual(score_to_plies(0, 10), 32)
+
+    def test_time_budget_still_returns_a_move(self):
+        solver = PerfectSolver(tt_size_mb=1, time_budget_ms=50)
+        self.board.make_move(Move(col=3, row=5), PieceEnum.HUMAN)
+        move = solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertIn(move, self.board.get_possible_moves())
+        self.assertIsNone(solver.evaluation)
+
+    def test_stop_event_ends_a_search_without_a_time_budget(self):
+        solver = PerfectSolver(tt_size_mb=1)
+        solver.stop_event = threading.Event()
+        solver.stop_event.set()
+        self.board.make_move(Move(col=3, row=5), PieceEnum.HUMAN)
+        move = solver.solve(board=self.board, piece=PieceEnum.CPU)
+        self.assertIn(move, self.board.get_possible_moves())
+        self.assertIsNone(solver.evaluation)
+
+    def test_first_move_is_center(self):
+        self.assertEqual(self.solver.first_move(), Move(col=3, row=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from src.solver.transposition_table import Bound, TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(size_mb=0.01)
+
+    def test_size_follows_memory_budget(self):
+        small = TranspositionTable(size_mb=1)
+        large = TranspositionTable(size_mb=4)
+        self.assertEqual(large.buckets, 4 * small.buckets)
+        self.assertLessEqual(
+            2 * small.buckets * TranspositionTable.ENTRY_BYTES, 1024 * 1024
+        )
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            TranspositionTable(size_mb=0)
+
+    def test_store_and_probe(self):
+        self.table.store(key=42, value=12.5, depth=3, bound=Bound.LOWER, move=4)
+        slot = self.table.probe(42)
+        self.assertGreaterEqual(slot, 0)
+        self.assertEqual(self.table.values[slot], 12.5)
+        self.assertEqual(self.table.depths[slot], 3)
+        self.assertEqual(self.table.bounds[slot], Bound.LOWER)
+        self.assertEqual(self.table.moves[slot], 4)
+        self.assertEqual(self.table.hits, 1)
+
+    def test_probe_miss_and_collision(self):
+        self.assertEqual(self.table.probe(7), -1)
+        self.assertEqual((self.table.misses, self.table.collisions), (1, 0))
+
+        self.table.store(key=7, value=0, depth=1, bound=Bound.EXACT, move=0)
+        self.assertEqual(self.table.probe(7 + self.table.buckets), -1)
+        self.assertEqual((self.table.misses, self.table.collisions), (2, 1))
+
+    def test_depth_preferred_replacement(self):
+        buckets = self.table.buckets
+        self.table.store(key=1, value=1, depth=6, bound=Bound.EXACT, move=0)
+        # shallower entries for the same bucket go to the always-replace slot
+        self.table.store(key=1 + buckets, value=2, depth=2, bound=Bound.EXACT, move=1)
+        self.table.store(
+            key=1 + 2 * buckets, value=3, depth=2, bound=Bound.EXACT, move=2
+        )
+        self.assertGreaterEqual(self.table.probe(1), 0)
+        self.assertEqual(self.table.probe(1 + buckets), -1)
+        self.assertGreaterEqual(self.table.probe(1 + 2 * buckets), 0)
+
+        # a deeper entry takes over the depth-preferred slot
+        self.table.store(key=1 + buckets, value=4, depth=8, bound=Bound.EXACT, move=3)
+        self.assertEqual(self.table.probe(1), -1)
+        self.assertEqual(self.table.values[self.table.probe(1 + buckets)], 4)
+
+    def test_clear(self):
+        self.table.store(key=5, value=1, depth=1, bound=Bound.EXACT, move=0)
+        self.table.clear()
+        self.assertEqual(self.table.probe(5), -1)
+        self.assertEqual(self.table.stats()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,7 +16,11 @@ export type Piece = ObjectValues<typeof PIECE>;
 
 export type Board = Piece[][];
 
-export type HeuristicName = "pieces" | "positions";
+export type HeuristicName = "pieces" | "positions" | "ntuple";
+
+export type PerfectSolverName = "weak" | "strong";
+
+export type MCTSSolverName = "random" | "tactical";
 
 export type ModelProviderName = "mistral";
 
@@ -32,12 +36,27 @@ export interface HeuristicSolver {
     name: HeuristicName;
 }
 
+export interface NegamaxSolver {
+    type: "negamax";
+    name: HeuristicName;
+}
+
+export interface PerfectSolver {
+    type: "perfect";
+    name: PerfectSolverName;
+}
+
+export interface MCTSSolver {
+    type: "mcts";
+    name: MCTSSolverName;
+}
+
 export interface LLMSolver {
     type: ModelProviderName;
     name: string;
 }
 
-export type SolverType = HeuristicSolver | LLMSolver;
+export type SolverType = HeuristicSolver | NegamaxSolver | PerfectSolver | MCTSSolver | LLMSolver;
 
 export type MoveRequest = {
     board: Board,
@@ -46,8 +65,21 @@ export type MoveRequest = {
     solver: SolverType,
 };
 
+export type Evaluation = {
+    outcome: "win" | "draw" | "loss",
+    plies_to_end: number | null,
+};
+
+export type SearchInfo = {
+    mode: "book" | "heuristic" | "exact" | "mcts",
+    depth: number | null,
+    nodes: number,
+};
+
 export type MoveResponse = {
     state: GameState,
     solver_move: Move | null,
     winning_sequence: Move[] | null,
+    evaluation: Evaluation | null,
+    search: SearchInfo | null,
 }
\ No newline at end of file